@@ -0,0 +1,48 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def generation_key(namespace):
+	return f"responses:{namespace}:generation"
+
+
+def get_generations(namespaces):
+	keys = [generation_key(namespace) for namespace in namespaces]
+	generations = cache.get_many(keys)
+
+	# Thế hệ ban đầu lấy theo thời gian để không trùng với các entry cũ còn sót khi khóa thế hệ bị xóa
+	missing = {key: time.time_ns() for key in keys if key not in generations}
+	for key, value in missing.items():
+		cache.add(key, value, timeout=None)
+		generations[key] = cache.get(key, value)
+
+	return [generations[key] for key in keys]
+
+
+def response_key(namespaces, *parts):
+	generations = get_generations(namespaces)
+	digest = hashlib.md5(json.dumps([generations, *parts], sort_keys=True, default=str).encode()).hexdigest()
+
+	return f"responses:{'-'.join(namespaces)}:{digest}"
+
+
+def invalidate(*namespaces):
+	for namespace in namespaces:
+		try:
+			cache.incr(generation_key(namespace))
+		except ValueError:
+			cache.set(generation_key(namespace), time.time_ns(), timeout=None)
+
+
+def invalidate_on_commit(*namespaces):
+	# Chỉ làm mới cache sau khi transaction commit để request khác không cache lại dữ liệu cũ
+	transaction.on_commit(lambda: invalidate(*namespaces))
+
+
+def get_response_timeout():
+	return getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300)
@@ -0,0 +1,146 @@
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Ký tự điều khiển không hợp lệ trong XML của file xlsx
+ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+XLSX_STATIC_PARTS = {
+	"[Content_Types].xml": (
+		'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+		'<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+		'<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+		'<Default Extension="xml" ContentType="application/xml"/>'
+		'<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+		'<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+		'</Types>'
+	),
+	"_rels/.rels": (
+		'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+		'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+		'<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+		'</Relationships>'
+	),
+	"xl/workbook.xml": (
+		'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+		'<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+		'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+		'<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+		'</workbook>'
+	),
+	"xl/_rels/workbook.xml.rels": (
+		'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+		'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+		'<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+		'</Relationships>'
+	),
+}
+
+
+class StreamBuffer:
+	# Bộ đệm chỉ ghi (không seek được): dữ liệu được lấy ra sau mỗi lần ghi để bộ nhớ không tăng theo số dòng
+	def __init__(self):
+		self.chunks = []
+
+	def write(self, data):
+		self.chunks.append(bytes(data))
+		return len(data)
+
+	def flush(self):
+		pass
+
+	def drain(self):
+		data = b"".join(self.chunks)
+		self.chunks.clear()
+		return data
+
+
+class _TextWriter:
+	def __init__(self, buffer):
+		self.buffer = buffer
+
+	def write(self, text):
+		return self.buffer.write(text.encode("utf-8"))
+
+
+def format_value(value):
+	if value is None:
+		return ""
+	if isinstance(value, datetime):
+		return timezone.localtime(value).strftime("%d-%m-%Y %H:%M:%S") if timezone.is_aware(value) else value.strftime("%d-%m-%Y %H:%M:%S")
+	if isinstance(value, date):
+		return value.strftime("%d-%m-%Y")
+	if isinstance(value, (bool, int, float)):
+		return value
+
+	return str(value)
+
+
+def stream_csv(columns, rows):
+	buffer = StreamBuffer()
+	writer = csv.writer(_TextWriter(buffer))
+
+	# BOM để Excel nhận đúng tiếng Việt
+	yield "\ufeff".encode("utf-8")
+	writer.writerow([header for _, header in columns])
+	yield buffer.drain()
+
+	for row in rows:
+		writer.writerow([format_value(row[key]) for key, _ in columns])
+		yield buffer.drain()
+
+
+def _xlsx_cell(value):
+	value = format_value(value)
+	if isinstance(value, bool):
+		return f'<c t="b"><v>{int(value)}</v></c>'
+	if isinstance(value, (int, float)):
+		return f"<c><v>{value}</v></c>"
+
+	return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(ILLEGAL_XML_CHARS.sub("", value))}</t></is></c>'
+
+
+def stream_xlsx(columns, rows):
+	# Ghi file xlsx tối giản (chuỗi inline, không style) qua zipfile lên luồng không seek được
+	buffer = StreamBuffer()
+
+	with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+		for name, content in XLSX_STATIC_PARTS.items():
+			archive.writestr(name, content)
+		yield buffer.drain()
+
+		with archive.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+			sheet.write(
+				b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+				b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+			)
+			sheet.write(("<row>" + "".join(_xlsx_cell(header) for _, header in columns) + "</row>").encode("utf-8"))
+
+			for row in rows:
+				sheet.write(("<row>" + "".join(_xlsx_cell(row[key]) for key, _ in columns) + "</row>").encode("utf-8"))
+				yield buffer.drain()
+
+			sheet.write(b"</sheetData></worksheet>")
+
+	yield buffer.drain()
+
+
+def export_response(filename, columns, rows, file_format="csv"):
+	# columns: [(tên cột trong .values(), tiêu đề cột)], rows: iterator các dict
+	if file_format == "xlsx":
+		response = StreamingHttpResponse(stream_xlsx(columns, rows), content_type=XLSX_CONTENT_TYPE)
+	else:
+		file_format = "csv"
+		response = StreamingHttpResponse(stream_csv(columns, rows), content_type=CSV_CONTENT_TYPE)
+
+	response["Content-Disposition"] = f'attachment; filename="{filename}-{timezone.localdate():%Y%m%d}.{file_format}"'
+
+	return response
@@ -0,0 +1,89 @@
+import io
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Các kích thước ảnh (cạnh dài tối đa, px) và định dạng được tạo cho mỗi ảnh tải lên
+RENDITION_SIZES = {"thumb": 160, "card": 480, "full": 1600}
+RENDITION_FORMATS = {
+	"webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+	"jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+RENDITION_DIRECTORY = "renditions"
+
+
+def _prepare(image, pil_format):
+	# JPEG không có kênh alpha: nền trong suốt được phủ màu trắng
+	if pil_format == "JPEG":
+		if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+			image = image.convert("RGBA")
+			background = Image.new("RGB", image.size, (255, 255, 255))
+			background.paste(image, mask=image.getchannel("A"))
+			return background
+		return image.convert("RGB")
+
+	return image if image.mode in ("RGB", "RGBA") else image.convert("RGBA")
+
+
+def generate_renditions(field_file):
+	# Tạo các bản thu nhỏ của ảnh và lưu vào cùng storage của ảnh gốc.
+	# Trả về {"source": tên ảnh gốc, "sizes": {kích thước: {"width", "height", định dạng: tên file}}}
+	with field_file.open("rb"):
+		image = Image.open(field_file)
+		image.load()
+	image = ImageOps.exif_transpose(image)
+
+	storage = field_file.storage
+	stem = os.path.splitext(os.path.basename(field_file.name))[0]
+	sizes = {}
+
+	for size, max_side in RENDITION_SIZES.items():
+		resized = image.copy()
+		resized.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+		sizes[size] = {"width": resized.width, "height": resized.height}
+
+		for name, (pil_format, extension, options) in RENDITION_FORMATS.items():
+			content = io.BytesIO()
+			_prepare(resized, pil_format).save(content, pil_format, **options)
+			sizes[size][name] = storage.save(f"{RENDITION_DIRECTORY}/{stem}-{size}.{extension}",
+											 ContentFile(content.getvalue()))
+
+	return {"source": field_file.name, "sizes": sizes}
+
+
+def rendition_names(renditions):
+	return [value for size in (renditions or {}).get("sizes", {}).values()
+			for key, value in size.items() if key in RENDITION_FORMATS]
+
+
+def delete_renditions(storage, renditions):
+	for name in rendition_names(renditions):
+		storage.delete(name)
+
+
+def has_current_renditions(instance, field_name="image"):
+	field_file = getattr(instance, field_name)
+	return bool(field_file) and (instance.renditions or {}).get("source") == field_file.name
+
+
+def rendition_urls(instance, field_name="image"):
+	# Bản đồ URL các bản thu nhỏ, rỗng khi chưa tạo xong hoặc ảnh gốc đã thay đổi
+	if not has_current_renditions(instance, field_name):
+		return {}
+
+	storage = getattr(instance, field_name).storage
+	return {
+		size: {key: storage.url(value) if key in RENDITION_FORMATS else value for key, value in formats.items()}
+		for size, formats in instance.renditions["sizes"].items()
+	}
+
+
+def image_url(instance, field_name="image", size=None, image_format="webp"):
+	field_file = getattr(instance, field_name)
+	if size and has_current_renditions(instance, field_name):
+		name = instance.renditions["sizes"].get(size, {}).get(image_format)
+		if name:
+			return field_file.storage.url(name)
+
+	return field_file.url
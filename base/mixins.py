@@ -0,0 +1,158 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from rest_framework import parsers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from base import caches, exports, uploads
+from base.serializers import UploadConfirmSerializer, UploadRequestSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+	pass
+
+
+class QueryBudgetMixin:
+	# Số câu SQL tối đa cho mỗi action, ví dụ {"list": 3, "retrieve": 2}
+	query_budget = {}
+
+	def initial(self, request, *args, **kwargs):
+		super().initial(request, *args, **kwargs)
+
+		self._query_count = 0
+		self._query_budget_stack = ExitStack()
+		if self.query_budget.get(self.action) is not None:
+			self._query_budget_stack.enter_context(connection.execute_wrapper(self._count_query))
+
+	def finalize_response(self, request, response, *args, **kwargs):
+		response = super().finalize_response(request, response, *args, **kwargs)
+
+		stack = getattr(self, "_query_budget_stack", None)
+		budget = self.query_budget.get(self.action)
+		if stack is None or budget is None:
+			return response
+
+		stack.close()
+		response["X-Query-Count"] = self._query_count
+
+		if self._query_count > budget:
+			message = f"{self.__class__.__name__}.{self.action} ran {self._query_count} queries (budget {budget})"
+			if getattr(settings, "QUERY_BUDGET_STRICT", False):
+				raise QueryBudgetExceeded(message)
+			logger.warning(message)
+
+		return response
+
+	def _count_query(self, execute, sql, params, many, context):
+		self._query_count += 1
+
+		return execute(sql, params, many, context)
+
+
+class UserFlagsMixin:
+	# Ánh xạ tên key trong serializer context -> tên method trả về các id được đánh dấu của người dùng hiện tại,
+	# ví dụ {"liked_post_ids": "get_liked_post_ids"}; mỗi cờ chỉ tốn một câu SQL cho cả trang
+	user_flags = {}
+
+	def get_serializer(self, *args, **kwargs):
+		instances = args[0] if args else kwargs.get("instance")
+
+		if instances is not None and self.user_flags:
+			instances = instances if kwargs.get("many") else [instances]
+			context = kwargs.get("context") or self.get_serializer_context()
+			kwargs["context"] = {**context, **self.get_user_flags(instances)}
+
+		return super().get_serializer(*args, **kwargs)
+
+	def get_user_flags(self, instances):
+		user = self.request.user
+		if not user.is_authenticated:
+			return {}
+
+		ids = [instance.pk for instance in instances]
+
+		return {key: set(getattr(self, method)(user, ids)) for key, method in self.user_flags.items()}
+
+
+class ResponseCacheMixin:
+	# Cache kết quả list/retrieve; cache_namespaces là các nhóm dữ liệu mà response phụ thuộc vào,
+	# rental.signals tăng thế hệ của nhóm tương ứng mỗi khi dữ liệu thay đổi
+	cache_namespaces = ()
+	cache_query_params = ("name", "type", "page", "pagination", "cursor")
+	cache_anonymous_only = False
+
+	def list(self, request, *args, **kwargs):
+		return self.get_cached_response(super().list, request, *args, **kwargs)
+
+	def retrieve(self, request, *args, **kwargs):
+		return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+	def get_cached_response(self, handler, request, *args, **kwargs):
+		if self.cache_anonymous_only and request.user.is_authenticated:
+			return handler(request, *args, **kwargs)
+
+		params = {param: request.query_params.get(param) for param in self.cache_query_params
+				  if param in request.query_params}
+		key = caches.response_key(self.cache_namespaces, request.get_host(), self.action, kwargs, params)
+
+		data = cache.get(key)
+		if data is not None:
+			return Response(data=data, status=status.HTTP_200_OK, headers={"X-Cache": "HIT"})
+
+		response = handler(request, *args, **kwargs)
+		if response.status_code == status.HTTP_200_OK:
+			cache.set(key, response.data, timeout=caches.get_response_timeout())
+		response["X-Cache"] = "MISS"
+
+		return response
+
+
+class ExportMixin:
+	# Xuất danh sách đã lọc theo get_queryset() ra CSV/XLSX dạng stream (?file_format=csv|xlsx).
+	# Dữ liệu đọc bằng .values() qua server-side cursor nên bộ nhớ không phụ thuộc số dòng
+	# export_columns: [(tên cột trong .values(), tiêu đề cột)]
+	export_columns = []
+	export_filename = "export"
+	export_chunk_size = 2000
+
+	@action(methods=["get"], detail=False, url_path="export")
+	def export(self, request):
+		file_format = request.query_params.get("file_format", "csv").lower()
+		if file_format not in ["csv", "xlsx"]:
+			return Response(data={"message": "Định dạng file phải là csv hoặc xlsx."}, status=status.HTTP_400_BAD_REQUEST)
+
+		rows = self.get_queryset().values(*[key for key, _ in self.export_columns]).iterator(
+			chunk_size=self.export_chunk_size)
+
+		return exports.export_response(self.export_filename, self.export_columns, rows, file_format)
+
+
+class DirectUploadMixin:
+	# Client tải ảnh thẳng lên storage thay vì gửi multipart qua API:
+	# upload-url cấp URL ký sẵn cho upload_field, upload-confirm gắn blob đã tải lên vào đối tượng
+	upload_field = "image"
+
+	@action(methods=["post"], detail=True, url_path="upload-url", parser_classes=[parsers.JSONParser])
+	def upload_url(self, request, pk=None):
+		serializer = UploadRequestSerializer(data=request.data)
+		serializer.is_valid(raise_exception=True)
+
+		data = uploads.issue_upload(request, self.get_object(), self.upload_field, **serializer.validated_data)
+
+		return Response(data=data, status=status.HTTP_201_CREATED)
+
+	@action(methods=["post"], detail=True, url_path="upload-confirm", parser_classes=[parsers.JSONParser])
+	def upload_confirm(self, request, pk=None):
+		serializer = UploadConfirmSerializer(data=request.data)
+		serializer.is_valid(raise_exception=True)
+
+		instance = uploads.attach_upload(request, self.get_object(), self.upload_field,
+										 serializer.validated_data["token"])
+
+		return Response(data=self.get_serializer(instance).data, status=status.HTTP_200_OK)
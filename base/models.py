@@ -8,3 +8,15 @@ class BaseModel(models.Model):
 	is_active = models.BooleanField(default=True)
 	updated_date = models.DateTimeField(auto_now=True)
 	created_date = models.DateTimeField(auto_now_add=True)
+
+	# Các cột bộ đếm chỉ được cập nhật bằng F(), save() không ghi đè chúng bằng giá trị cũ trong bộ nhớ
+	counter_fields = ()
+	# Tương tự cho các cột do task nền ghi (ví dụ bản đồ ảnh thu nhỏ)
+	background_fields = ()
+
+	def save(self, *args, **kwargs):
+		excluded = (*self.counter_fields, *self.background_fields)
+		if excluded and not self._state.adding and kwargs.get("update_fields") is None:
+			kwargs["update_fields"] = [field.name for field in self._meta.concrete_fields
+									   if not field.primary_key and field.name not in excluded]
+		super().save(*args, **kwargs)
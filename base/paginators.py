@@ -1,37 +1,91 @@
 from rest_framework import pagination
 
 
-class UserPagination(pagination.PageNumberPagination):
+class BasePagination(pagination.PageNumberPagination):
+	# Mặc định phân trang theo số trang; gửi ?pagination=cursor (hoặc ?cursor=...) để chuyển sang phân trang keyset,
+	# không cần COUNT(*) và OFFSET nên trang sâu tốn chi phí như trang đầu. Cursor đi theo thứ tự đang có của queryset
+	# (ví dụ -rank, -id của kết quả tìm kiếm), queryset chưa sắp xếp thì theo -id
+	pagination_mode_query_param = "pagination"
+	cursor_query_param = "cursor"
+	cursor_ordering = "-id"
+
+	cursor_paginator = None
+
+	def paginate_queryset(self, queryset, request, view=None):
+		if not self.use_cursor(request):
+			self.cursor_paginator = None
+			return super().paginate_queryset(queryset, request, view)
+
+		self.cursor_paginator = self.get_cursor_paginator(queryset)
+		return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+	def get_paginated_response(self, data):
+		if self.cursor_paginator is not None:
+			return self.cursor_paginator.get_paginated_response(data)
+
+		return super().get_paginated_response(data)
+
+	def use_cursor(self, request):
+		return (request.query_params.get(self.pagination_mode_query_param) == "cursor"
+				or self.cursor_query_param in request.query_params)
+
+	def get_cursor_ordering(self, queryset):
+		ordering = tuple(queryset.query.order_by) if queryset.query.order_by else (self.cursor_ordering,)
+
+		# Thêm id vào cuối để thứ tự là duy nhất khi cột đầu có giá trị trùng
+		if not any(field.lstrip("-") in ("id", "pk") for field in ordering):
+			ordering += (self.cursor_ordering,)
+
+		return ordering
+
+	def get_cursor_paginator(self, queryset):
+		paginator = pagination.CursorPagination()
+		paginator.page_size = self.page_size
+		paginator.ordering = self.get_cursor_ordering(queryset)
+		paginator.cursor_query_param = self.cursor_query_param
+
+		return paginator
+
+
+class UserPagination(BasePagination):
 	page_size = 20
 
 
-class RoomPaginators(pagination.PageNumberPagination):
+class RoomPaginators(BasePagination):
+	page_size = 10
+
+
+class PostPaginators(BasePagination):
 	page_size = 10
 
 
-class PostPaginators(pagination.PageNumberPagination):
+class BedPaginators(BasePagination):
 	page_size = 10
 
 
-class BedPaginators(pagination.PageNumberPagination):
+class CommentPaginators(BasePagination):
 	page_size = 10
 
 
-class CommentPaginators(pagination.PageNumberPagination):
+class RentalContactPaginators(BasePagination):
 	page_size = 10
 
 
-class RentalContactPaginators(pagination.PageNumberPagination):
+class BillRentalContactPaginators(BasePagination):
 	page_size = 10
 
 
-class BillRentalContactPaginators(pagination.PageNumberPagination):
+class ViolateNoticePaginators(BasePagination):
 	page_size = 10
 
 
-class ViolateNoticePaginators(pagination.PageNumberPagination):
+class ElectricityAndWaterBillsPaginators(BasePagination):
 	page_size = 10
 
 
-class ElectricityAndWaterBillsPaginators(pagination.PageNumberPagination):
-	page_size = 10
\ No newline at end of file
+class UtilityChargePaginators(BasePagination):
+	page_size = 10
+
+
+class SearchPaginators(BasePagination):
+	page_size = 10
@@ -0,0 +1,78 @@
+import io
+import os
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from unidecode import unidecode
+
+# Module này chỉ phụ thuộc reportlab để chạy được trong process của ProcessPoolExecutor mà không cần khởi tạo Django.
+# Font chuẩn của PDF không có đủ dấu tiếng Việt: nếu có font TTF (font_path) thì dùng font đó, nếu không thì bỏ dấu
+FONT_NAME = "DocumentFont"
+
+
+def _font(font_path):
+	if font_path and os.path.exists(font_path):
+		if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+			pdfmetrics.registerFont(TTFont(FONT_NAME, font_path))
+		return FONT_NAME, str
+
+	return "Helvetica", unidecode
+
+
+def setup_worker(font_path):
+	# Khởi tạo của từng process render: đăng ký font một lần thay vì ở tài liệu đầu tiên
+	_font(font_path)
+
+
+def render_pdf(document):
+	# document: {"title", "number", "rows": [[nhãn, giá trị]], "signatures": [chức danh], "footer", "font_path"}
+	font_name, text = _font(document.get("font_path"))
+
+	styles = getSampleStyleSheet()
+	for style in styles.byName.values():
+		style.fontName = font_name
+
+	content = io.BytesIO()
+	pdf = SimpleDocTemplate(content, pagesize=A4, title=text(document["title"]),
+							leftMargin=20 * mm, rightMargin=20 * mm, topMargin=20 * mm, bottomMargin=20 * mm)
+
+	story = [
+		Paragraph(text(document["title"]), styles["Title"]),
+		Paragraph(text(document["number"]), styles["Normal"]),
+		Spacer(1, 8 * mm),
+	]
+
+	table = Table([[text(label), text(value)] for label, value in document["rows"]], colWidths=[60 * mm, 110 * mm])
+	table.setStyle(TableStyle([
+		("FONTNAME", (0, 0), (-1, -1), font_name),
+		("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+		("BACKGROUND", (0, 0), (0, -1), colors.whitesmoke),
+		("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+		("TOPPADDING", (0, 0), (-1, -1), 4),
+		("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+	]))
+	story.append(table)
+
+	signatures = document.get("signatures") or []
+	if signatures:
+		story.append(Spacer(1, 15 * mm))
+		signature_table = Table([[text(title) for title in signatures], ["" for _ in signatures]],
+								rowHeights=[8 * mm, 25 * mm])
+		signature_table.setStyle(TableStyle([
+			("FONTNAME", (0, 0), (-1, -1), font_name),
+			("ALIGN", (0, 0), (-1, -1), "CENTER"),
+		]))
+		story.append(signature_table)
+
+	if document.get("footer"):
+		story.append(Spacer(1, 10 * mm))
+		story.append(Paragraph(text(document["footer"]), styles["Italic"]))
+
+	pdf.build(story)
+
+	return content.getvalue()
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from base import images, uploads
+
 
 class BaseSerializer(serializers.ModelSerializer):
 	def __init__(self, *args, **kwargs):
@@ -18,6 +20,17 @@ class BaseSerializer(serializers.ModelSerializer):
 			for field_name in excludes:
 				self.fields.pop(field_name)
 
+	# Trường ảnh dùng cho bản đồ ảnh thu nhỏ (renditions)
+	image_field = "image"
+
+	@property
+	def image_size(self):
+		# Danh sách mặc định trả về ảnh thumbnail, chi tiết trả về ảnh gốc
+		return "thumb" if self.context.get("action") == "list" else None
+
+	def get_renditions(self, instance):
+		return images.rendition_urls(instance, self.image_field)
+
 	def to_representation(self, instance):
 		data = super().to_representation(instance)
 
@@ -27,3 +40,12 @@ class BaseSerializer(serializers.ModelSerializer):
 			data["updated_date"] = instance.updated_date.strftime("%d-%m-%Y %H:%M:%S")
 
 		return data
+
+
+class UploadRequestSerializer(serializers.Serializer):
+	content_type = serializers.ChoiceField(choices=list(uploads.UPLOAD_CONTENT_TYPES))
+	size = serializers.IntegerField(min_value=1)
+
+
+class UploadConfirmSerializer(serializers.Serializer):
+	token = serializers.CharField()
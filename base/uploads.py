@@ -0,0 +1,197 @@
+import datetime
+import hashlib
+import uuid
+
+from azure.storage.blob import BlobSasPermissions, generate_blob_sas
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import exceptions
+from storages.backends.azure_storage import AzureStorage
+
+# Ảnh được client tải thẳng lên storage bằng URL ký sẵn, API chỉ cấp URL và gắn tên blob vào model sau khi tải xong
+UPLOAD_DIRECTORY = "uploads"
+UPLOAD_CONTENT_TYPES = {
+	"image/jpeg": ".jpg",
+	"image/png": ".png",
+	"image/webp": ".webp",
+	"image/gif": ".gif",
+}
+# Vài byte đầu của từng loại ảnh: nội dung đã tải lên được kiểm tra thay vì tin Content-Type client gửi
+UPLOAD_SIGNATURES = {
+	"image/jpeg": (b"\xff\xd8\xff",),
+	"image/png": (b"\x89PNG\r\n\x1a\n",),
+	"image/gif": (b"GIF87a", b"GIF89a"),
+	"image/webp": (b"RIFF",),
+}
+UPLOAD_SALT = "base.uploads"
+
+
+def get_expiry():
+	return getattr(settings, "UPLOAD_URL_EXPIRY", 600)
+
+
+def get_max_size():
+	return getattr(settings, "UPLOAD_MAX_SIZE", 10 * 1024 * 1024)
+
+
+def get_backend(storage):
+	# Storage thật phía sau lớp bọc lưu theo nội dung (files.storage.ContentAddressedStorage)
+	return getattr(storage, "backend", storage)
+
+
+def matches_signature(header, content_type):
+	if content_type == "image/webp":
+		return header[:4] == b"RIFF" and header[8:12] == b"WEBP"
+
+	return header.startswith(UPLOAD_SIGNATURES[content_type])
+
+
+def target_label(instance, field_name):
+	return f"{instance._meta.label_lower}:{instance.pk}:{field_name}"
+
+
+def load_token(token, max_age=None):
+	try:
+		return signing.loads(token, salt=UPLOAD_SALT, max_age=max_age or get_expiry())
+	except signing.SignatureExpired:
+		raise exceptions.ValidationError({"message": "Phiên tải ảnh đã hết hạn, vui lòng thử lại."})
+	except signing.BadSignature:
+		raise exceptions.ValidationError({"message": "Mã tải ảnh không hợp lệ."})
+
+
+def _azure_upload_url(storage, name, expiry):
+	blob_client = storage.client.get_blob_client(storage._get_valid_path(name))
+	# Khi cấu hình bằng connection string (ví dụ Azurite) khóa tài khoản nằm trong credential của client
+	account_key = storage.account_key or getattr(storage.service_client.credential, "account_key", None)
+	expires_at = timezone.now() + datetime.timedelta(seconds=expiry)
+	sas_token = generate_blob_sas(blob_client.account_name, blob_client.container_name, blob_client.blob_name,
+								  account_key=account_key,
+								  user_delegation_key=None if account_key else storage.get_user_delegation_key(
+									  expires_at),
+								  permission=BlobSasPermissions(create=True, write=True), expiry=expires_at)
+
+	return f"{blob_client.url}?{sas_token}", {"x-ms-blob-type": "BlockBlob"}
+
+
+def issue_upload(request, instance, field_name, content_type, size):
+	# Cấp URL tải lên ngắn hạn cho một trường ảnh của instance.
+	# Azure: SAS chỉ cho phép tạo/ghi đúng một blob; storage khác: endpoint cục bộ nhận PUT kèm mã đã ký.
+	# Tên blob được ghi nhận trước (ref_count=0) nên upload không bao giờ được xác nhận vẫn được collect_orphan_blobs dọn
+	extension = UPLOAD_CONTENT_TYPES.get(content_type)
+	if extension is None:
+		raise exceptions.ValidationError({"message": "Chỉ hỗ trợ ảnh JPEG, PNG, WEBP hoặc GIF."})
+	if size > get_max_size():
+		raise exceptions.ValidationError({"message": f"Ảnh không được vượt quá {get_max_size() // (1024 * 1024)}MB."})
+
+	storage = instance._meta.get_field(field_name).storage
+	name = f"{UPLOAD_DIRECTORY}/{uuid.uuid4().hex}{extension}"
+	if hasattr(storage, "reserve"):
+		storage.reserve(name)
+
+	expiry = get_expiry()
+	token = signing.dumps({"name": name, "user": request.user.pk, "target": target_label(instance, field_name),
+						   "content_type": content_type, "size": size}, salt=UPLOAD_SALT)
+
+	if isinstance(get_backend(storage), AzureStorage):
+		upload_url, headers = _azure_upload_url(get_backend(storage), name, expiry)
+	else:
+		upload_url, headers = request.build_absolute_uri(reverse("local-upload", kwargs={"token": token})), {}
+
+	return {
+		"upload_url": upload_url,
+		"method": "PUT",
+		"headers": {"Content-Type": content_type, **headers},
+		"token": token,
+		"name": name,
+		"expires_at": (timezone.now() + datetime.timedelta(seconds=expiry)).strftime("%d-%m-%Y %H:%M:%S"),
+	}
+
+
+def save_local_upload(token, content_type, stream):
+	# Thay thế SAS khi không dùng Azure (phát triển, test): ghi nội dung PUT thẳng vào storage thật với đúng tên đã cấp.
+	# Tên được ghi nhận trước khi ghi file để file không bao giờ nằm trong storage mà collect_orphan_blobs không biết
+	payload = load_token(token)
+	if content_type != payload["content_type"]:
+		raise exceptions.ValidationError({"message": "Content-Type không khớp với yêu cầu tải ảnh."})
+
+	content = stream.read(payload["size"] + 1)
+	if len(content) != payload["size"]:
+		raise exceptions.ValidationError({"message": "Kích thước ảnh không khớp với yêu cầu tải ảnh."})
+
+	backend = get_backend(default_storage)
+	if backend.exists(payload["name"]):
+		raise exceptions.ValidationError({"message": "Ảnh đã được tải lên."})
+
+	if hasattr(default_storage, "reserve"):
+		default_storage.reserve(payload["name"])
+
+	return backend.save(payload["name"], ContentFile(content))
+
+
+def _azure_content_type(storage, name):
+	properties = storage.client.get_blob_client(storage._get_valid_path(name)).get_blob_properties()
+	return properties.content_settings.content_type
+
+
+def _read_upload(storage, name):
+	# Một lượt đọc: băm sha256 phía server và lấy vài byte đầu để kiểm tra loại ảnh
+	digest = hashlib.sha256()
+	header = b""
+	with storage.open(name, "rb") as content:
+		for chunk in content.chunks():
+			if len(header) < 12:
+				header += chunk[:12 - len(header)]
+			digest.update(chunk)
+
+	return digest.hexdigest(), header
+
+
+def _reject(storage, name, message):
+	# Bỏ blob không đạt yêu cầu (kể cả bản ghi đang chờ) rồi báo lỗi
+	if hasattr(storage, "discard"):
+		storage.discard(name)
+	else:
+		storage.delete(name)
+
+	raise exceptions.ValidationError({"message": message})
+
+
+def attach_upload(request, instance, field_name, token):
+	# Kiểm tra blob đã được tải lên đúng như yêu cầu (kích thước, Content-Type đã lưu và nội dung thật sự là ảnh
+	# loại đó) rồi gắn tên blob vào trường ảnh; mã được chấp nhận thêm một khoảng bằng thời hạn URL để client kịp tải xong
+	payload = load_token(token, max_age=get_expiry() * 2)
+	if payload["user"] != request.user.pk or payload["target"] != target_label(instance, field_name):
+		raise exceptions.PermissionDenied({"message": "Mã tải ảnh không thuộc về đối tượng này."})
+
+	name = payload["name"]
+	storage = instance._meta.get_field(field_name).storage
+	if not storage.exists(name):
+		raise exceptions.ValidationError({"message": "Chưa tìm thấy ảnh đã tải lên."})
+
+	size = storage.size(name)
+	if size != payload["size"]:
+		_reject(storage, name, "Kích thước ảnh không khớp với yêu cầu tải ảnh.")
+
+	backend = get_backend(storage)
+	if isinstance(backend, AzureStorage) and _azure_content_type(backend, name) != payload["content_type"]:
+		_reject(storage, name, "Content-Type không khớp với yêu cầu tải ảnh.")
+
+	sha256, header = _read_upload(storage, name)
+	if not matches_signature(header, payload["content_type"]):
+		_reject(storage, name, "Nội dung tải lên không phải ảnh đúng định dạng đã khai báo.")
+
+	if hasattr(storage, "adopt"):
+		# Có thể trả về tên blob cũ cùng nội dung, khi đó bản vừa tải lên bị bỏ
+		name = storage.adopt(name, size, sha256)
+
+	if getattr(instance, field_name).name == name:
+		return instance
+
+	setattr(instance, field_name, name)
+	instance.save()
+
+	return instance
@@ -0,0 +1,25 @@
+import io
+
+from django.core.files.storage import default_storage
+from rest_framework import exceptions, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from storages.backends.azure_storage import AzureStorage
+
+from base import uploads
+
+
+class LocalUploadView(APIView):
+	# Thay thế URL SAS của Azure khi dùng storage cục bộ (phát triển, test); mã đã ký trong URL thay cho xác thực
+	authentication_classes = []
+	permission_classes = [permissions.AllowAny]
+	parser_classes = []
+
+	def put(self, request, token):
+		if isinstance(uploads.get_backend(default_storage), AzureStorage):
+			raise exceptions.NotFound()
+
+		content_type = request.content_type.split(";")[0].strip()
+		name = uploads.save_local_upload(token, content_type, request.stream or io.BytesIO())
+
+		return Response(data={"name": name}, status=status.HTTP_201_CREATED)
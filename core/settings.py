@@ -63,6 +63,8 @@ INSTALLED_APPS = [
     "users.apps.UsersConfig",
     "interacts.apps.InteractsConfig",
     "rental.apps.RentalConfig",
+    "tasks.apps.TasksConfig",
+    "files.apps.FilesConfig",
 ]
 
 MIDDLEWARE = [
@@ -158,6 +160,55 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
 }
 
+# Cache: dùng Redis khi có REDIS_URL, nếu không (ví dụ khi chạy test) dùng bộ nhớ cục bộ
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Thời gian (giây) cache response của các endpoint công khai: phòng, giường, bài đăng
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+
+# Hàng đợi đăng ký giường: khi bật, POST /beds/{id}/rent/ chỉ xếp hàng và trả về mã vé để theo dõi kết quả.
+# Cần REDIS_URL và lệnh run_admission_workers; không có Redis thì chỉ chạy được khi DEBUG (hàng đợi trong tiến trình)
+RENTAL_ADMISSION_QUEUE = os.getenv("RENTAL_ADMISSION_QUEUE", "False") == "True"
+ADMISSION_QUEUE_MAX_LENGTH = int(os.getenv("ADMISSION_QUEUE_MAX_LENGTH", 5000))
+ADMISSION_WORKERS = int(os.getenv("ADMISSION_WORKERS", 4))
+ADMISSION_TICKET_TTL = int(os.getenv("ADMISSION_TICKET_TTL", 3600))
+
+# Ghi log (hoặc báo lỗi khi bật chế độ nghiêm ngặt) khi một endpoint vượt quá số câu SQL cho phép
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "False") == "True"
+
+# Số giây tối đa trước khi số liệu thống kê của tháng hiện tại được tính lại khi có request đọc
+STATISTICS_MAX_AGE = int(os.getenv("STATISTICS_MAX_AGE", 300))
+
+# Xuất PDF hóa đơn/hợp đồng: số process render, số yêu cầu chờ tối đa, thời gian chờ (giây) và thời gian cache (giây).
+# PDF_FONT_PATH trỏ tới font TTF có dấu tiếng Việt (ví dụ DejaVuSans.ttf), để trống thì PDF được bỏ dấu
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", 2))
+PDF_RENDER_QUEUE_SIZE = int(os.getenv("PDF_RENDER_QUEUE_SIZE", 16))
+PDF_RENDER_TIMEOUT = int(os.getenv("PDF_RENDER_TIMEOUT", 30))
+PDF_CACHE_TIMEOUT = int(os.getenv("PDF_CACHE_TIMEOUT", 86400))
+PDF_FONT_PATH = os.getenv("PDF_FONT_PATH")
+
+# Hàng đợi task nền: dùng Redis khi có REDIS_URL, nếu không thì lưu trong DB (bảng tasks_task).
+# TASK_ALWAYS_EAGER chạy task ngay sau khi transaction commit, không cần worker (môi trường dev)
+TASK_ALWAYS_EAGER = os.getenv("TASK_ALWAYS_EAGER", "False") == "True"
+TASK_MAX_RETRIES = int(os.getenv("TASK_MAX_RETRIES", 3))
+TASK_RETRY_BACKOFF = int(os.getenv("TASK_RETRY_BACKOFF", 5))
+# Task đang chạy quá số giây này mà chưa xong được coi là worker đã chết và được chạy lại
+TASK_VISIBILITY_TIMEOUT = int(os.getenv("TASK_VISIBILITY_TIMEOUT", 300))
+
 OAUTH2_PROVIDER = {"OAUTH2_BACKEND_CLASS": "oauth2_provider.oauth2_backends.JSONOAuthLibCore"}
 
 # Swagger settings
@@ -193,8 +244,17 @@ AZURE_CONTAINER = os.getenv('AZURE_CONTAINER')
 MEDIA_URL = f"https://{AZURE_ACCOUNT_NAME}.blob.core.windows.net/{AZURE_CONTAINER}/"
 MEDIA_ROOT = None
 
-# Azure Storage settings
-DEFAULT_FILE_STORAGE = "storages.backends.azure_storage.AzureStorage"
+# Azure Storage settings: file được lưu theo sha256 nội dung qua lớp bọc, storage thật là Azure
+DEFAULT_FILE_STORAGE = "files.storage.ContentAddressedStorage"
+CONTENT_ADDRESSED_BACKEND = "storages.backends.azure_storage.AzureStorage"
+# Ảnh chèn trong nội dung CKEditor không được đếm tham chiếu nên ghi thẳng vào storage thật
+CKEDITOR_5_FILE_STORAGE = CONTENT_ADDRESSED_BACKEND
+# Blob không còn tham chiếu được giữ thêm bao lâu (giây) trước khi collect_orphan_blobs xóa
+BLOB_GC_GRACE = int(os.getenv("BLOB_GC_GRACE", 86400))
+
+# Tải ảnh trực tiếp lên storage: thời hạn URL ký sẵn (giây) và dung lượng tối đa (byte)
+UPLOAD_URL_EXPIRY = int(os.getenv("UPLOAD_URL_EXPIRY", 600))
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", 10 * 1024 * 1024))
 
 # CKEditor 5 configurations
 customColorPalette = [
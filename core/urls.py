@@ -23,6 +23,7 @@ from rest_framework import permissions
 from rest_framework import routers
 
 from base.admin import my_admin_site
+from base.views import LocalUploadView
 from core import settings
 from interacts.urls import router as interacts_router
 from rental.urls import router as rental_router
@@ -47,6 +48,7 @@ router.registry.extend(rental_router.registry)
 
 urlpatterns = [
 	path('admin/', my_admin_site.urls),
+	path("api/v1/uploads/local/<str:token>/", LocalUploadView.as_view(), name="local-upload"),
 	path("api/v1/", include(router.urls)),
 	path("ckeditor5/", include("django_ckeditor_5.urls"), name="ck_editor_5_upload_file"),
 	path("__debug__/", include(debug_toolbar.urls)),
@@ -0,0 +1,11 @@
+from base.admin import BaseAdmin, my_admin_site
+from files.models import Blob
+
+
+class BlobAdmin(BaseAdmin):
+	list_display = ["id", "name", "size", "ref_count", "created_date", "updated_date"]
+	search_fields = ["name", "sha256"]
+	readonly_fields = ["name", "sha256", "size"]
+
+
+my_admin_site.register(Blob, BlobAdmin)
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class FilesConfig(AppConfig):
+	default_auto_field = 'django.db.models.BigAutoField'
+	name = 'files'
+
+	def ready(self):
+		from files import signals
+
+		signals.connect_tracked_models()
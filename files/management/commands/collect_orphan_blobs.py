@@ -0,0 +1,72 @@
+import datetime
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from files.models import Blob
+from files.references import collect_references
+
+
+class Command(BaseCommand):
+	help = "Đếm lại tham chiếu của các blob và xóa các blob không còn được dùng"
+
+	def add_arguments(self, parser):
+		parser.add_argument("--grace", type=int, default=settings.BLOB_GC_GRACE,
+							help="Chỉ xóa blob không còn tham chiếu lâu hơn số giây này")
+		parser.add_argument("--batch-size", type=int, default=500)
+		parser.add_argument("--dry-run", action="store_true", help="Chỉ đếm lại và liệt kê, không xóa")
+
+	def handle(self, *args, **options):
+		batch_size = options["batch_size"]
+
+		fixed = self.recount(collect_references(), batch_size)
+		self.stdout.write(f"Đã cập nhật số tham chiếu của {fixed} blob.")
+
+		# Blob vừa tải lên chưa kịp gắn vào model, hoặc vừa bị bỏ tham chiếu, được giữ lại trong thời gian chờ
+		cutoff = timezone.now() - datetime.timedelta(seconds=options["grace"])
+		orphans = Blob.objects.filter(ref_count=0, updated_date__lt=cutoff)
+
+		if options["dry_run"]:
+			for name in orphans.values_list("name", flat=True).iterator(chunk_size=batch_size):
+				self.stdout.write(name)
+			self.stdout.write(self.style.SUCCESS(f"Có {orphans.count()} blob có thể xóa."))
+			return
+
+		deleted = 0
+		while True:
+			with transaction.atomic():
+				batch = list(orphans.select_for_update(skip_locked=True).values_list("id", "name")[:batch_size])
+				if not batch:
+					break
+				Blob.objects.filter(id__in=[blob_id for blob_id, _ in batch]).delete()
+
+			# Xóa bản ghi trước rồi mới xóa file: upload trùng nội dung đến sau sẽ được ghi sang tên mới
+			backend = getattr(default_storage, "backend", default_storage)
+			for _, name in batch:
+				backend.delete(name)
+			deleted += len(batch)
+
+		self.stdout.write(self.style.SUCCESS(f"Đã xóa {deleted} blob."))
+
+	def recount(self, counts, batch_size):
+		fixed = 0
+		groups = {}
+		for name, count in counts.items():
+			groups.setdefault(count, []).append(name)
+
+		for count, names in groups.items():
+			for start in range(0, len(names), batch_size):
+				fixed += Blob.objects.filter(name__in=names[start:start + batch_size]).exclude(
+					ref_count=count).update(ref_count=count)
+
+		# Blob đang có tham chiếu theo bộ đếm nhưng thực tế không còn ai dùng
+		stale = [blob_id for blob_id, name in Blob.objects.filter(ref_count__gt=0).values_list("id", "name").iterator(
+			chunk_size=batch_size) if name not in counts]
+		for start in range(0, len(stale), batch_size):
+			fixed += Blob.objects.filter(id__in=stale[start:start + batch_size]).update(ref_count=0,
+																						  updated_date=timezone.now())
+
+		return fixed
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.13 on 2026-10-18 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(blank=True, db_index=True, max_length=64, null=True)),
+                ('size', models.BigIntegerField(default=0)),
+                ('ref_count', models.IntegerField(default=0, editable=False)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ref_count', 'updated_date'], name='files_blob_ref_count_updated')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from base.models import BaseModel
+
+
+class Blob(BaseModel):
+	# Mỗi file trong storage định danh theo nội dung (sha256); ref_count là số trường ảnh/bản thu nhỏ đang trỏ tới.
+	# sha256 rỗng với blob đang chờ client tải thẳng lên (chưa được API băm) nên không dùng để khử trùng lặp
+	class Meta:
+		indexes = [models.Index(fields=["ref_count", "updated_date"], name="files_blob_ref_count_updated")]
+
+	name = models.CharField(max_length=255, null=False, blank=False, unique=True)
+	sha256 = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+	size = models.BigIntegerField(default=0)
+	ref_count = models.IntegerField(default=0, editable=False)
+
+	counter_fields = ("ref_count",)
+
+	def __str__(self):
+		return self.name
+
+	@classmethod
+	def shift_references(cls, names, delta):
+		if names and delta:
+			cls.objects.filter(name__in=names).update(ref_count=Greatest(F("ref_count") + delta, 0),
+													  updated_date=timezone.now())
+
+	@classmethod
+	def apply_reference_changes(cls, old, new):
+		# old, new: Counter tên blob -> số lần được tham chiếu; gom các blob có cùng độ lệch vào một câu UPDATE
+		changes = {}
+		for name in old.keys() | new.keys():
+			delta = new[name] - old[name]
+			if delta:
+				changes.setdefault(delta, []).append(name)
+
+		for delta, names in changes.items():
+			cls.shift_references(names, delta)
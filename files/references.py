@@ -0,0 +1,43 @@
+from collections import Counter
+
+from django.apps import apps
+from django.db.models import FileField
+
+from base import images
+from files.storage import ContentAddressedStorage
+
+
+def tracked_fields(model):
+	# Các trường file của model dùng storage theo nội dung, kèm "renditions" nếu model có bản thu nhỏ
+	fields = [field.name for field in model._meta.concrete_fields
+			  if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage)]
+	if fields and any(field.name == "renditions" for field in model._meta.concrete_fields):
+		fields.append("renditions")
+
+	return fields
+
+
+def tracked_models():
+	return {model: fields for model in apps.get_models() if (fields := tracked_fields(model))}
+
+
+def references(values):
+	# values: {tên trường: giá trị trong DB hoặc FieldFile} -> Counter tên blob được tham chiếu
+	names = Counter()
+	for field_name, value in values.items():
+		if field_name == "renditions":
+			names.update(images.rendition_names(value))
+		elif value:
+			names[getattr(value, "name", value)] += 1
+
+	return names
+
+
+def collect_references(chunk_size=2000):
+	# Quét toàn bộ các bảng có trường file (kể cả bản ghi đã ẩn) để đếm lại số tham chiếu của mỗi blob
+	names = Counter()
+	for model, fields in tracked_models().items():
+		for values in model._base_manager.values(*fields).iterator(chunk_size=chunk_size):
+			names.update(references(values))
+
+	return names
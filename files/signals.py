@@ -0,0 +1,41 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from files.models import Blob
+from files.references import references, tracked_models
+
+
+def get_written_fields(fields, update_fields):
+	# Chỉ so sánh các trường thực sự được ghi: BaseModel.save() bỏ qua "renditions" (do task nền ghi)
+	return [field for field in fields if update_fields is None or field in update_fields]
+
+
+def make_receivers(fields):
+	def capture_references(sender, instance, update_fields=None, **kwargs):
+		written = get_written_fields(fields, update_fields)
+		if instance._state.adding or instance.pk is None or not written:
+			instance._blob_references = (written, Counter())
+			return
+
+		old = sender._base_manager.filter(pk=instance.pk).values(*written).first() or {}
+		instance._blob_references = (written, references(old))
+
+	def update_references(sender, instance, **kwargs):
+		written, old = getattr(instance, "_blob_references", ((), Counter()))
+		new = references({field: getattr(instance, field) for field in written})
+		Blob.apply_reference_changes(old, new)
+
+	def release_references(sender, instance, **kwargs):
+		Blob.apply_reference_changes(references({field: getattr(instance, field) for field in fields}), Counter())
+
+	return capture_references, update_references, release_references
+
+
+def connect_tracked_models():
+	for model, fields in tracked_models().items():
+		capture_references, update_references, release_references = make_receivers(fields)
+		uid = f"files:{model._meta.label_lower}"
+		pre_save.connect(capture_references, sender=model, weak=False, dispatch_uid=uid)
+		post_save.connect(update_references, sender=model, weak=False, dispatch_uid=uid)
+		post_delete.connect(release_references, sender=model, weak=False, dispatch_uid=uid)
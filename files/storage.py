@@ -0,0 +1,131 @@
+import hashlib
+import posixpath
+
+from django.conf import settings
+from django.core.files.storage import Storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+	# Bọc storage thật (CONTENT_ADDRESSED_BACKEND, mặc định Azure): file được đặt tên theo sha256 nội dung,
+	# nội dung đã có thì trả về tên cũ mà không tải lên lại. File đang được theo dõi (có Blob) chỉ bị xóa
+	# bởi lệnh collect_orphan_blobs khi không còn tham chiếu nào
+	def __init__(self, backend=None, **kwargs):
+		self.backend = import_string(backend or settings.CONTENT_ADDRESSED_BACKEND)(**kwargs)
+
+	def _hash(self, content):
+		digest = hashlib.sha256()
+		size = 0
+		for chunk in content.chunks():
+			chunk = chunk.encode() if isinstance(chunk, str) else chunk
+			digest.update(chunk)
+			size += len(chunk)
+
+		return digest.hexdigest(), size
+
+	def _save(self, name, content):
+		from files.models import Blob
+
+		digest, size = self._hash(content)
+		existing = self.find(digest)
+		if existing:
+			return existing
+
+		# Nếu file cùng tên vẫn còn (blob mồ côi đang chờ dọn) storage thật sẽ chọn tên khác nên không bị xóa nhầm
+		directory, filename = posixpath.split(name)
+		extension = posixpath.splitext(filename)[1].lower()
+		name = self.backend.save(posixpath.join(directory, f"{digest}{extension}"), content)
+		Blob.objects.get_or_create(name=name, defaults={"sha256": digest, "size": size})
+
+		return name
+
+	def get_available_name(self, name, max_length=None):
+		# Tên cuối cùng do _save quyết định theo nội dung
+		return name
+
+	def find(self, sha256):
+		# Blob cùng nội dung có thể đang không còn tham chiếu và sắp bị collect_orphan_blobs xóa: khóa dòng để kiểm tra lại
+		# sau khi lệnh dọn (nếu đang chạy) commit, rồi làm mới updated_date để thời gian chờ tính lại từ đầu,
+		# đủ cho model vừa dùng lại blob kịp lưu và tăng ref_count
+		from files.models import Blob
+
+		with transaction.atomic():
+			blob = Blob.objects.select_for_update().filter(sha256=sha256).order_by("id").only("name", "ref_count").first()
+			if blob is None:
+				return None
+
+			if blob.ref_count == 0:
+				Blob.objects.filter(pk=blob.pk).update(updated_date=timezone.now())
+
+		return blob.name
+
+	def reserve(self, name):
+		# Ghi nhận tên blob sắp được client tải thẳng lên storage thật (URL ký sẵn) trước khi file tồn tại:
+		# upload không bao giờ được xác nhận vẫn có bản ghi ref_count=0 để collect_orphan_blobs dọn
+		from files.models import Blob
+
+		Blob.objects.get_or_create(name=name)
+
+	def adopt(self, name, size, sha256):
+		# Nhận blob client đã tải lên sau khi API tự băm nội dung (sha256 không bao giờ lấy từ client).
+		# Nội dung đã có thì dùng blob cũ và bỏ bản vừa tải lên
+		from files.models import Blob
+
+		existing = self.find(sha256)
+		if existing and existing != name:
+			self.discard(name)
+			return existing
+
+		Blob.objects.update_or_create(name=name, defaults={"sha256": sha256, "size": size})
+
+		return name
+
+	def discard(self, name):
+		# Xóa blob chưa từng được dùng (upload bị từ chối hoặc trùng nội dung) cùng bản ghi đang chờ của nó
+		from files.models import Blob
+
+		if Blob.objects.filter(name=name, ref_count__gt=0).exists():
+			return
+
+		Blob.objects.filter(name=name).delete()
+		self.backend.delete(name)
+
+	def delete(self, name):
+		from files.models import Blob
+
+		if name and not Blob.objects.filter(name=name).exists():
+			self.backend.delete(name)
+
+	def _open(self, name, mode="rb"):
+		return self.backend.open(name, mode)
+
+	def exists(self, name):
+		return self.backend.exists(name)
+
+	def size(self, name):
+		return self.backend.size(name)
+
+	def url(self, name):
+		return self.backend.url(name)
+
+	def path(self, name):
+		return self.backend.path(name)
+
+	def listdir(self, path):
+		return self.backend.listdir(path)
+
+	def get_valid_name(self, name):
+		return self.backend.get_valid_name(name)
+
+	def get_modified_time(self, name):
+		return self.backend.get_modified_time(name)
+
+	def get_created_time(self, name):
+		return self.backend.get_created_time(name)
+
+	def get_accessed_time(self, name):
+		return self.backend.get_accessed_time(name)
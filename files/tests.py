@@ -0,0 +1,91 @@
+import datetime
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from files.models import Blob
+from files.storage import ContentAddressedStorage
+
+CONTENT = b"noi dung anh"
+
+
+class StorageTestMixin:
+	# Storage thật được thay bằng FileSystemStorage trong thư mục tạm
+	def setUp(self):
+		super().setUp()
+		directory = tempfile.TemporaryDirectory()
+		self.addCleanup(directory.cleanup)
+		self.storage = ContentAddressedStorage(backend="django.core.files.storage.FileSystemStorage",
+											   location=directory.name)
+		patcher = mock.patch.object(default_storage, "_wrapped", self.storage)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def orphan(self, name):
+		# Blob không còn tham chiếu từ lâu, đủ điều kiện để collect_orphan_blobs xóa
+		Blob.objects.filter(name=name).update(ref_count=0, updated_date=timezone.now() - datetime.timedelta(days=2))
+
+	def collect(self):
+		with open(os.devnull, "w") as devnull:
+			call_command("collect_orphan_blobs", grace=3600, stdout=devnull)
+
+
+class ContentAddressedStorageTests(StorageTestMixin, TestCase):
+	def test_identical_content_is_saved_once(self):
+		name = self.storage.save("room.jpg", ContentFile(CONTENT))
+
+		self.assertEqual(self.storage.save("other.jpg", ContentFile(CONTENT)), name)
+		self.assertEqual(Blob.objects.get().sha256, hashlib.sha256(CONTENT).hexdigest())
+
+	def test_reused_orphan_survives_collection(self):
+		name = self.storage.save("room.jpg", ContentFile(CONTENT))
+		self.orphan(name)
+
+		# Lần lưu trùng nội dung dùng lại blob mồ côi và làm mới thời gian chờ trước khi model kịp tăng ref_count
+		self.assertEqual(self.storage.save("again.jpg", ContentFile(CONTENT)), name)
+		self.collect()
+
+		self.assertTrue(Blob.objects.filter(name=name).exists())
+		self.assertTrue(self.storage.exists(name))
+
+	def test_unused_orphan_is_collected(self):
+		name = self.storage.save("room.jpg", ContentFile(CONTENT))
+		self.orphan(name)
+
+		self.collect()
+		self.assertFalse(Blob.objects.filter(name=name).exists())
+		self.assertFalse(self.storage.exists(name))
+
+
+class FindDuringCollectionTests(StorageTestMixin, TransactionTestCase):
+	def test_find_waits_for_collection_and_rechecks(self):
+		name = self.storage.save("room.jpg", ContentFile(CONTENT))
+		self.orphan(name)
+		found = []
+
+		def find():
+			try:
+				found.append(self.storage.find(hashlib.sha256(CONTENT).hexdigest()))
+			finally:
+				connection.close()
+
+		# Lệnh dọn đã khóa và xóa dòng của blob nhưng chưa commit: find phải chờ rồi thấy blob không còn
+		with transaction.atomic():
+			Blob.objects.select_for_update().filter(name=name).delete()
+			thread = threading.Thread(target=find)
+			thread.start()
+			time.sleep(0.5)
+			self.assertEqual(found, [])
+		thread.join()
+
+		self.assertEqual(found, [None])
@@ -1,19 +1,33 @@
+from django.contrib import admin, messages
 from django.utils.safestring import mark_safe
+from rest_framework.exceptions import ValidationError
 
 from base.admin import BaseAdmin, my_admin_site
+from rental import provisioning
 from rental.models import *
 
 
 class RoomAdmin(BaseAdmin):
-	list_display = ["name", "number_of_bed", "type", "room_for"]
+	list_display = ["name", "number_of_bed", "total_beds", "vacant_beds", "occupied_beds", "type", "room_for"]
 	list_filter = ["number_of_bed", "type", "room_for"]
 	search_fields = ["name"]
 	readonly_fields = ["room_image"]
+	actions = ["fill_beds"]
 
 	def room_image(self, instance):
 		if instance:
 			return mark_safe(f"<img width='512' src='{instance.image.url}' />")
 
+	@admin.action(description="Tạo đủ giường cho các phòng đã chọn")
+	def fill_beds(self, request, queryset):
+		try:
+			created = provisioning.create_beds({room_id: None for room_id in queryset.values_list("id", flat=True)})
+		except ValidationError as exc:
+			self.message_user(request, exc.detail.get("message"), level=messages.ERROR)
+			return
+
+		self.message_user(request, f"Đã tạo {sum(created.values())} giường cho {len(created)} phòng.")
+
 
 class PostAdmin(BaseAdmin):
 	list_display = ["id", "name"]
@@ -58,6 +72,23 @@ class ElectricityAndWaterBillsAdmin(BaseAdmin):
 	list_filter = ["total_cubic_meters_water", "total_electricity", "total_amount", "status"]
 
 
+class UtilityChargeAdmin(BaseAdmin):
+	list_display = ["student", "bill", "amount", "status"]
+	list_filter = ["status"]
+	search_fields = ["student__student_id", "student__user__email"]
+
+
+class MeterReadingAdmin(BaseAdmin):
+	list_display = ["room", "period", "electricity_index", "water_index", "bill"]
+	list_filter = ["period"]
+	search_fields = ["room__name"]
+
+
+class MonthlyStatisticAdmin(BaseAdmin):
+	list_display = ["month", "successful_rentals", "cancelled_rentals", "rental_revenue", "utility_revenue", "is_closed"]
+	list_filter = ["is_closed"]
+
+
 my_admin_site.register(Room, RoomAdmin)
 my_admin_site.register(Post, PostAdmin)
 my_admin_site.register(Bed, BedAdmin)
@@ -65,3 +96,6 @@ my_admin_site.register(RentalContact, RentalContactAdmin)
 my_admin_site.register(BillRentalContact, BillRentalAdmin)
 my_admin_site.register(ViolateNotice, ViolateNoticeAdmin)
 my_admin_site.register(ElectricityAndWaterBills, ElectricityAndWaterBillsAdmin)
+my_admin_site.register(MeterReading, MeterReadingAdmin)
+my_admin_site.register(UtilityCharge, UtilityChargeAdmin)
+my_admin_site.register(MonthlyStatistic, MonthlyStatisticAdmin)
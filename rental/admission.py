@@ -0,0 +1,172 @@
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+from rest_framework import exceptions
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+# Hàng đợi đăng ký giường: request thuê giường chỉ được xếp vào hàng đợi và nhận mã vé, một nhóm worker cố định
+# xử lý lần lượt theo thứ tự đến nên số kết nối DB không tăng theo lưu lượng lúc mở đăng ký
+
+QUEUED = "QUEUED"
+SUCCESS = "SUCCESS"
+REJECTED = "REJECTED"
+FAILED = "FAILED"
+
+
+class QueueFull(Exception):
+	pass
+
+
+class RedisAdmissionQueue:
+	queue_key = "admission:queue"
+	ticket_key = "admission:ticket:{}"
+
+	def __init__(self, url):
+		import redis
+
+		self.client = redis.Redis.from_url(url)
+
+	def enqueue(self, job):
+		if self.client.llen(self.queue_key) >= settings.ADMISSION_QUEUE_MAX_LENGTH:
+			raise QueueFull()
+
+		pipeline = self.client.pipeline()
+		pipeline.set(self.ticket_key.format(job["ticket"]), json.dumps({**job, "status": QUEUED}),
+					 ex=settings.ADMISSION_TICKET_TTL)
+		pipeline.rpush(self.queue_key, json.dumps(job))
+		pipeline.execute()
+
+	def pop(self, timeout=5):
+		item = self.client.blpop([self.queue_key], timeout=timeout)
+
+		return json.loads(item[1]) if item else None
+
+	def set_result(self, job, result):
+		self.client.set(self.ticket_key.format(job["ticket"]), json.dumps({**job, **result}),
+						ex=settings.ADMISSION_TICKET_TTL)
+
+	def get(self, ticket):
+		value = self.client.get(self.ticket_key.format(ticket))
+
+		return json.loads(value) if value else None
+
+
+class LocalAdmissionQueue:
+	# Chỉ dùng khi phát triển (DEBUG, runserver một tiến trình): hàng đợi và vé nằm trong bộ nhớ tiến trình,
+	# worker được khởi động cùng request đầu tiên. Khi chạy nhiều tiến trình WSGI mỗi tiến trình sẽ có hàng đợi,
+	# worker và vé riêng nên môi trường thật phải cấu hình REDIS_URL và chạy lệnh run_admission_workers
+
+	def __init__(self):
+		self.jobs = queue.Queue(maxsize=settings.ADMISSION_QUEUE_MAX_LENGTH)
+		self.tickets = {}
+		self.lock = threading.Lock()
+		self.workers_started = False
+
+	def enqueue(self, job):
+		with self.lock:
+			if not self.workers_started:
+				start_workers(self, settings.ADMISSION_WORKERS)
+				self.workers_started = True
+
+			self.tickets[job["ticket"]] = {**job, "status": QUEUED}
+
+		try:
+			self.jobs.put_nowait(job)
+		except queue.Full:
+			self.tickets.pop(job["ticket"], None)
+			raise QueueFull()
+
+	def pop(self, timeout=5):
+		try:
+			return self.jobs.get(timeout=timeout)
+		except queue.Empty:
+			return None
+
+	def set_result(self, job, result):
+		self.tickets[job["ticket"]] = {**job, **result}
+
+	def get(self, ticket):
+		return self.tickets.get(ticket)
+
+
+_admission_queue = None
+
+
+def get_admission_queue():
+	global _admission_queue
+
+	if _admission_queue is None:
+		if settings.REDIS_URL:
+			_admission_queue = RedisAdmissionQueue(settings.REDIS_URL)
+		elif settings.DEBUG:
+			_admission_queue = LocalAdmissionQueue()
+		else:
+			raise ImproperlyConfigured("RENTAL_ADMISSION_QUEUE cần REDIS_URL khi không chạy ở chế độ DEBUG.")
+
+	return _admission_queue
+
+
+def enqueue_rent(student, bed_id, time_rental):
+	# pk lấy thẳng từ URL, kiểm tra trước khi xếp hàng để không tạo vé cho giường không thể tồn tại
+	try:
+		bed_id = int(bed_id)
+	except (TypeError, ValueError):
+		raise exceptions.NotFound({"message": "Không tìm thấy giường."})
+
+	job = {"ticket": uuid.uuid4().hex, "student_id": student.id, "bed_id": bed_id, "time_rental": time_rental}
+	get_admission_queue().enqueue(job)
+
+	return job["ticket"]
+
+
+def process_job(admission_queue, job):
+	from rental.booking import book_bed
+	from rental.serializers import RentalContactSerializer
+	from users.models import Student
+
+	close_old_connections()
+	try:
+		student = Student.objects.select_related("user").get(pk=job["student_id"])
+		rental_contact = book_bed(student=student, bed_id=job["bed_id"], time_rental=job["time_rental"])
+		result = {"status": SUCCESS, "rental_contact": RentalContactSerializer(rental_contact).data}
+	except APIException as exc:
+		result = {"status": REJECTED, "status_code": exc.status_code, "detail": exc.detail}
+	except Exception as exc:
+		# Lỗi ngoài dự kiến chỉ làm hỏng vé này, worker vẫn tiếp tục với các vé sau
+		logger.exception("Xử lý vé đăng ký giường %s thất bại", job["ticket"])
+		result = {"status": FAILED, "detail": {"message": "Không thể xử lý yêu cầu thuê giường, vui lòng thử lại."},
+				  "reason": f"{type(exc).__name__}: {exc}"}
+	finally:
+		close_old_connections()
+
+	admission_queue.set_result(job, json.loads(json.dumps(result, default=str)))
+
+
+def run_worker(admission_queue, stop_event=None):
+	while stop_event is None or not stop_event.is_set():
+		try:
+			job = admission_queue.pop()
+			if job is not None:
+				process_job(admission_queue, job)
+		except Exception:
+			# Ví dụ mất kết nối Redis: ghi log, chờ một chút rồi thử lại thay vì để thread worker chết
+			logger.exception("Worker hàng đợi đăng ký giường gặp lỗi")
+			time.sleep(1)
+
+
+def start_workers(admission_queue, workers, stop_event=None):
+	threads = [threading.Thread(target=run_worker, args=(admission_queue, stop_event), daemon=True,
+								name=f"admission-worker-{index}") for index in range(workers)]
+	for thread in threads:
+		thread.start()
+
+	return threads
@@ -0,0 +1,284 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from rental.models import BillRentalContact, ElectricityAndWaterBills, MeterReading, RentalContact, Room, UtilityCharge
+from utils.constants import ELECTRICITY_TARIFF_TIERS, PRICE_OF_ELECTRICITY, PRICE_OF_WATER, WATER_TARIFF_TIERS
+
+BILL_FIELDS = ("room_id", "electricity", "water")
+READING_FIELDS = ("room_id", "electricity_index", "water_index")
+# Chỉ số đầu kỳ, chỉ cần cho lần ghi đầu tiên của phòng (chưa có kỳ trước) để lập được hóa đơn kỳ đó
+OPENING_FIELDS = ("opening_electricity_index", "opening_water_index")
+
+
+def parse_readings(stream, file_format):
+	# Đọc chỉ số điện nước từ file CSV (có dòng tiêu đề) hoặc JSON (danh sách object)
+	content = stream.read()
+	if isinstance(content, bytes):
+		content = content.decode("utf-8-sig")
+
+	if file_format == "csv":
+		return list(csv.DictReader(io.StringIO(content)))
+
+	readings = json.loads(content)
+	if isinstance(readings, dict):
+		readings = readings.get("readings", [])
+
+	return readings
+
+
+def parse_period(value):
+	# Kỳ chỉ số dạng YYYY-MM, lưu bằng ngày đầu tháng
+	if isinstance(value, date):
+		return value.replace(day=1)
+
+	return datetime.strptime(str(value), "%Y-%m").date()
+
+
+def tiered_amount(consumption, tiers):
+	amount, lower = 0, 0
+	for upper, price in tiers:
+		if upper is None or consumption <= upper:
+			return amount + (consumption - lower) * price
+
+		amount += (upper - lower) * price
+		lower = upper
+
+	return amount
+
+
+def _parse_number(value):
+	number = float(value)
+	if number < 0 or number != number:
+		raise ValueError
+
+	return number
+
+
+def _validate_rows(readings, fields, excluded_room_ids=None, optional_fields=()):
+	# Kiểm tra các dòng (room_id + 2 chỉ số) trong một lượt, phòng được lấy bằng một truy vấn.
+	# Trả về các dòng hợp lệ (room_id, chỉ số điện, chỉ số nước, các trường tùy chọn hoặc None) và lỗi theo từng dòng
+	room_field, electricity_field, water_field = fields
+	errors = []
+	rows = []
+
+	room_ids = set()
+	for row in readings:
+		try:
+			room_ids.add(int(row.get(room_field)))
+		except (AttributeError, TypeError, ValueError):
+			pass
+	rooms = Room.objects.filter(is_active=True).in_bulk(room_ids)
+	excluded_room_ids = excluded_room_ids(room_ids) if excluded_room_ids else set()
+
+	seen_room_ids = set()
+	for index, row in enumerate(readings, start=1):
+		if not isinstance(row, dict) or any(row.get(field) in (None, "") for field in fields):
+			errors.append({"row": index, "message": f"Thiếu {', '.join(fields)}."})
+			continue
+
+		try:
+			room_id = int(row[room_field])
+			electricity = _parse_number(row[electricity_field])
+			water = _parse_number(row[water_field])
+			optional = tuple(None if row.get(field) in (None, "") else _parse_number(row[field])
+							 for field in optional_fields)
+		except (TypeError, ValueError):
+			errors.append({"row": index, "message": "Vui lòng nhập đúng định dạng."})
+			continue
+
+		if room_id not in rooms:
+			errors.append({"row": index, "message": f"Không tìm thấy phòng {room_id}."})
+			continue
+
+		if room_id in seen_room_ids:
+			errors.append({"row": index, "message": f"Phòng {room_id} bị trùng trong file."})
+			continue
+
+		if room_id in excluded_room_ids:
+			errors.append({"row": index, "message": f"Chỉ số kỳ này của phòng {room_id} đã được lập hóa đơn."})
+			continue
+
+		seen_room_ids.add(room_id)
+		rows.append((room_id, electricity, water, *optional))
+
+	return rows, errors
+
+
+def create_utility_bills(readings, manager=None):
+	# Các dòng hợp lệ được tạo hóa đơn bằng một lần bulk_create trong cùng transaction
+	rows, errors = _validate_rows(readings, BILL_FIELDS)
+
+	with transaction.atomic():
+		bills = ElectricityAndWaterBills.objects.bulk_create([
+			ElectricityAndWaterBills(
+				room_id=room_id,
+				manager=manager,
+				total_electricity=electricity,
+				total_cubic_meters_water=water,
+				total_amount=electricity * PRICE_OF_ELECTRICITY + water * PRICE_OF_WATER,
+			)
+			for room_id, electricity, water in rows
+		], batch_size=500)
+		split_utility_bills(bill_ids=[bill.id for bill in bills])
+
+	return {
+		"total": len(readings),
+		"created": len(bills),
+		"total_amount": sum(bill.total_amount for bill in bills),
+		"errors": errors,
+	}
+
+
+def record_meter_readings(readings, period, manager=None):
+	# Ghi chỉ số công tơ của kỳ, nhập lại chỉ số chưa lập hóa đơn sẽ ghi đè chỉ số cũ.
+	# Chỉ số của kỳ được khóa trước khi kiểm tra nên không ghi đè được chỉ số vừa được lập hóa đơn song song
+	def billed_room_ids(room_ids):
+		return {room_id for room_id, bill_id in MeterReading.objects.select_for_update().filter(
+			period=period, room_id__in=room_ids
+		).values_list("room_id", "bill_id") if bill_id is not None}
+
+	with transaction.atomic():
+		rows, errors = _validate_rows(readings, READING_FIELDS, excluded_room_ids=billed_room_ids,
+									  optional_fields=OPENING_FIELDS)
+		meter_readings = MeterReading.objects.bulk_create([
+			MeterReading(room_id=room_id, period=period, electricity_index=electricity, water_index=water,
+						 opening_electricity_index=opening_electricity, opening_water_index=opening_water, manager=manager)
+			for room_id, electricity, water, opening_electricity, opening_water in rows
+		], batch_size=500, update_conflicts=True, unique_fields=["room", "period"],
+			update_fields=["electricity_index", "water_index", "opening_electricity_index", "opening_water_index",
+						   "manager", "updated_date"])
+
+	return {
+		"total": len(readings),
+		"recorded": len(meter_readings),
+		"errors": errors,
+	}
+
+
+def generate_bills_from_readings(period, manager=None):
+	# Lượng tiêu thụ của tất cả các phòng được tính trong một truy vấn (chỉ số kỳ này - chỉ số kỳ gần nhất trước đó,
+	# kỳ đầu tiên của phòng dùng chỉ số đầu kỳ), sau đó áp dụng biểu giá bậc thang và tạo hóa đơn bằng một lần bulk_create
+	previous = MeterReading.objects.filter(
+		room=OuterRef("room"), period__lt=OuterRef("period"), is_active=True
+	).order_by("-period")
+
+	with transaction.atomic():
+		meter_readings = list(MeterReading.objects.select_for_update().filter(
+			period=period, bill__isnull=True, is_active=True
+		).annotate(
+			previous_electricity_index=Coalesce(Subquery(previous.values("electricity_index")[:1]),
+												F("opening_electricity_index")),
+			previous_water_index=Coalesce(Subquery(previous.values("water_index")[:1]), F("opening_water_index")),
+		).order_by("room_id"))
+
+		errors = []
+		billed_readings = []
+		for meter_reading in meter_readings:
+			if meter_reading.previous_electricity_index is None or meter_reading.previous_water_index is None:
+				errors.append({"room_id": meter_reading.room_id,
+							   "message": "Chưa có chỉ số kỳ trước, vui lòng nhập chỉ số đầu kỳ cho lần ghi đầu tiên."})
+				continue
+
+			electricity = meter_reading.electricity_index - meter_reading.previous_electricity_index
+			water = meter_reading.water_index - meter_reading.previous_water_index
+			if electricity < 0 or water < 0:
+				errors.append({"room_id": meter_reading.room_id, "message": "Chỉ số kỳ này nhỏ hơn chỉ số kỳ trước."})
+				continue
+
+			meter_reading.bill = ElectricityAndWaterBills(
+				room_id=meter_reading.room_id,
+				manager=manager,
+				total_electricity=electricity,
+				total_cubic_meters_water=water,
+				total_amount=tiered_amount(electricity, ELECTRICITY_TARIFF_TIERS) + tiered_amount(water, WATER_TARIFF_TIERS),
+			)
+			billed_readings.append(meter_reading)
+
+		bills = ElectricityAndWaterBills.objects.bulk_create([meter_reading.bill for meter_reading in billed_readings], batch_size=500)
+		MeterReading.objects.bulk_update(billed_readings, ["bill"], batch_size=500)
+		split_utility_bills(bill_ids=[bill.id for bill in bills])
+
+	return {
+		"period": period.strftime("%m-%Y"),
+		"created": len(bills),
+		"total_amount": sum(bill.total_amount for bill in bills),
+		"errors": errors,
+	}
+
+
+def split_utility_bills(bill_ids=None):
+	# Chia hóa đơn điện nước cho các sinh viên có hợp đồng SUCCESS trên giường thuộc phòng của hóa đơn.
+	# Một truy vấn lấy (và khóa) hóa đơn chưa chia, một truy vấn lấy toàn bộ người ở, một lần bulk_create
+	# và một lần đánh dấu is_split, kể cả hóa đơn của phòng trống để lần chạy sau không quét lại
+	with transaction.atomic():
+		bills = ElectricityAndWaterBills.objects.select_for_update(skip_locked=True).filter(is_active=True, is_split=False)
+		if bill_ids is not None:
+			bills = bills.filter(id__in=bill_ids)
+		bills = list(bills.values_list("id", "room_id", "total_amount", "status"))
+		if not bills:
+			return 0
+
+		occupants = {}
+		for rental_contact_id, room_id, student_id in RentalContact.objects.filter(
+			status=RentalContact.Status.SUCCESS, is_active=True,
+			room_id__in={room_id for _, room_id, _, _ in bills}, bed__room_id=F("room_id"),
+		).order_by("room_id", "id").values_list("id", "room_id", "student_id"):
+			occupants.setdefault(room_id, []).append((rental_contact_id, student_id))
+
+		charges = []
+		for bill_id, room_id, total_amount, bill_status in bills:
+			room_occupants = occupants.get(room_id, [])
+			if not room_occupants:
+				continue
+
+			share = round(total_amount / len(room_occupants))
+			for index, (rental_contact_id, student_id) in enumerate(room_occupants):
+				# Phần lẻ do làm tròn được cộng vào người đầu tiên để tổng bằng đúng hóa đơn
+				amount = total_amount - share * (len(room_occupants) - 1) if index == 0 else share
+				charges.append(UtilityCharge(bill_id=bill_id, student_id=student_id, rental_contact_id=rental_contact_id,
+											 amount=amount, status=bill_status))
+
+		created = UtilityCharge.objects.bulk_create(charges, batch_size=1000, ignore_conflicts=True)
+		ElectricityAndWaterBills.objects.filter(id__in=[bill_id for bill_id, _, _, _ in bills]).update(is_split=True)
+
+	return len(created)
+
+
+def sync_charge_status(bill_ids):
+	# Cập nhật status của các phần tiền theo hóa đơn của chúng trong một câu UPDATE,
+	# dùng sau khi đổi trạng thái hóa đơn bằng queryset.update() (save() đã được signal xử lý);
+	# khi đó cũng cần gọi stats.reopen_months cho các hóa đơn đó
+	bill_status = ElectricityAndWaterBills.objects.filter(pk=OuterRef("bill_id")).values("status")[:1]
+
+	return UtilityCharge.objects.filter(bill_id__in=bill_ids).exclude(status=Subquery(bill_status)).update(
+		status=Subquery(bill_status))
+
+
+def generate_rental_bills(specialist):
+	# Lập hóa đơn tiền giường cho mọi hợp đồng SUCCESS chưa có hóa đơn: một truy vấn anti-join và một lần bulk_create.
+	# Chạy lại nhiều lần không tạo trùng vì rental_contact là OneToOne và bulk_create bỏ qua xung đột
+	contracts = RentalContact.objects.filter(status=RentalContact.Status.SUCCESS, is_active=True)
+
+	with transaction.atomic():
+		# Đếm trước khi ghi: hợp đồng được một lần chạy song song lập hóa đơn trong lúc này chỉ bị tính là bỏ qua một lần
+		total = contracts.count()
+		pending = list(contracts.filter(bill_rental_contact__isnull=True).values_list("id", "student_id", "bed__price"))
+		bills = BillRentalContact.objects.bulk_create([
+			BillRentalContact(rental_contact_id=rental_contact_id, student_id=student_id, specialist=specialist, total=price)
+			for rental_contact_id, student_id, price in pending
+		], batch_size=1000, ignore_conflicts=True)
+
+		# bill_number được sinh sẵn ở phía ứng dụng nên đếm lại được số hóa đơn thực sự được tạo
+		created = BillRentalContact.objects.filter(bill_number__in=[bill.bill_number for bill in bills]).count()
+
+	return {
+		"created": created,
+		"skipped": total - created,
+		"total": total,
+	}
@@ -0,0 +1,136 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import exceptions, status
+
+from base.caches import invalidate_on_commit
+from rental import stats
+from rental.models import Bed, RentalContact, Room
+from users.models import User
+
+
+class BookingConflict(exceptions.APIException):
+	status_code = status.HTTP_409_CONFLICT
+	default_detail = {"message": "Giường đang được sinh viên khác đăng ký, vui lòng thử lại sau."}
+
+
+# Thông báo tương ứng với từng ràng buộc unique từng phần của RentalContact
+CONSTRAINT_MESSAGES = {
+	"rental_contact_one_active_per_student": "Bạn đã có hồ sơ thuê giường đang xử lý hoặc đã được duyệt.",
+	"rental_contact_one_active_per_bed": "Giường đã có hồ sơ đăng ký.",
+}
+
+
+def get_violated_constraint(exc):
+	diag = getattr(exc.__cause__, "diag", None)
+	return getattr(diag, "constraint_name", None)
+
+
+def book_bed(student, bed_id, time_rental=12):
+	# Giữ khóa dòng của giường trong suốt transaction; request đến sau bỏ qua dòng đang bị khóa (skip_locked)
+	# và nhận ngay 409 thay vì xếp hàng chờ khóa
+	if student.user.gender == User.Gender.UNKNOWN:
+		raise exceptions.ValidationError({"message": "Vui lòng cập nhật giới tính!"})
+
+	try:
+		with transaction.atomic():
+			bed = Bed.objects.select_for_update(skip_locked=True, of=("self",)).select_related("room").filter(
+				pk=bed_id, is_active=True).first()
+
+			if bed is None:
+				if not Bed.objects.filter(pk=bed_id, is_active=True).exists():
+					raise exceptions.NotFound({"message": "Không tìm thấy giường."})
+				raise BookingConflict()
+
+			if student.user.gender != bed.room.room_for:
+				raise exceptions.ValidationError({"message": "Giường không phù hợp với giới tính của bạn!"})
+
+			if bed.status != Bed.Status.VACUITY:
+				raise BookingConflict({"message": "Giường đã được thuê."})
+
+			active_contacts = RentalContact.objects.filter(status__in=RentalContact.ACTIVE_STATUSES, is_active=True)
+			if active_contacts.filter(student=student).exists():
+				raise BookingConflict({"message": CONSTRAINT_MESSAGES["rental_contact_one_active_per_student"]})
+
+			if active_contacts.filter(bed=bed).exists():
+				raise BookingConflict({"message": CONSTRAINT_MESSAGES["rental_contact_one_active_per_bed"]})
+
+			return RentalContact.objects.create(bed=bed, room_id=bed.room_id, student=student, time_rental=time_rental)
+	except IntegrityError as exc:
+		# Ràng buộc unique từng phần là chốt chặn cuối khi nhiều request cùng vượt qua các bước kiểm tra ở trên
+		constraint = get_violated_constraint(exc)
+		if constraint not in CONSTRAINT_MESSAGES:
+			raise
+		raise BookingConflict({"message": CONSTRAINT_MESSAGES[constraint]})
+
+
+def confirm_rental_contact(rental_contact_id):
+	with transaction.atomic():
+		rental_contact = RentalContact.objects.select_for_update().get(pk=rental_contact_id)
+
+		if rental_contact.status != RentalContact.Status.PROCESSING:
+			raise exceptions.ValidationError({"message": "Hồ sơ không trong trạng thái xử lý."})
+
+		bed = Bed.objects.select_for_update().filter(pk=rental_contact.bed_id).first()
+		if bed is None or bed.status != Bed.Status.VACUITY:
+			raise BookingConflict({"message": "Giường đã được thuê."})
+
+		rental_contact.status = RentalContact.Status.SUCCESS
+		rental_contact.save()
+
+		bed.status = Bed.Status.NONVACUITY
+		bed.save()
+
+	return rental_contact
+
+
+def bulk_transition_rental_contacts(new_status, rental_contact_ids=None, filters=None):
+	# Duyệt/từ chối nhiều hồ sơ: khóa và kiểm tra trạng thái hồ sơ bằng một truy vấn (khóa thêm giường khi duyệt),
+	# sau đó cập nhật hồ sơ và giường bằng các câu UPDATE theo tập trong cùng transaction.
+	# Trả về kết quả của từng hồ sơ
+	results = {}
+
+	with transaction.atomic():
+		rental_contacts = RentalContact.objects.select_for_update().filter(is_active=True)
+		if rental_contact_ids is not None:
+			rental_contacts = rental_contacts.filter(pk__in=rental_contact_ids)
+			results = {pk: {"id": pk, "success": False, "message": "Không tìm thấy hồ sơ."} for pk in rental_contact_ids}
+		else:
+			rental_contacts = rental_contacts.filter(status=RentalContact.Status.PROCESSING, **(filters or {}))
+
+		rental_contacts = list(rental_contacts.order_by("id"))
+		beds = {}
+		if new_status == RentalContact.Status.SUCCESS:
+			beds = Bed.objects.select_for_update().in_bulk({rental_contact.bed_id for rental_contact in rental_contacts})
+
+		accepted = []
+		for rental_contact in rental_contacts:
+			if rental_contact.status != RentalContact.Status.PROCESSING:
+				results[rental_contact.id] = {"id": rental_contact.id, "success": False, "message": "Hồ sơ đã được xử lý."}
+				continue
+
+			bed = beds.get(rental_contact.bed_id)
+			if new_status == RentalContact.Status.SUCCESS and (bed is None or bed.status != Bed.Status.VACUITY):
+				results[rental_contact.id] = {"id": rental_contact.id, "success": False, "message": "Giường đã được thuê."}
+				continue
+
+			results[rental_contact.id] = {"id": rental_contact.id, "success": True, "message": None}
+			accepted.append(rental_contact)
+
+		now = timezone.now()
+		accepted_contacts = RentalContact.objects.filter(pk__in=[rental_contact.id for rental_contact in accepted])
+		accepted_contacts.update(status=new_status, updated_date=now)
+		# UPDATE theo tập không chạy signal nên tự mở lại tháng thống kê của các hồ sơ đã đóng
+		stats.reopen_months(accepted_contacts)
+
+		if new_status == RentalContact.Status.SUCCESS and accepted:
+			# UPDATE theo tập không chạy signal của Bed nên phải tự tính lại bộ đếm phòng và xóa cache
+			Bed.objects.filter(pk__in=[rental_contact.bed_id for rental_contact in accepted]).update(
+				status=Bed.Status.NONVACUITY, updated_date=now)
+			Room.recount_beds(Room.objects.filter(pk__in={beds[rental_contact.bed_id].room_id for rental_contact in accepted}))
+			invalidate_on_commit("beds")
+
+	return {
+		"succeeded": len(accepted),
+		"failed": len(results) - len(accepted),
+		"results": list(results.values()),
+	}
@@ -0,0 +1,218 @@
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, TimeoutError, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import FileResponse, HttpResponse
+from django.utils import timezone
+from rest_framework import exceptions, status
+
+from base.pdf import render_pdf, setup_worker
+
+# Tăng khi thay đổi bố cục PDF để các bản đã cache không còn được dùng
+TEMPLATE_VERSION = 1
+
+
+class RendererBusy(exceptions.APIException):
+	status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+	default_detail = {"message": "Hệ thống đang xuất nhiều tài liệu, vui lòng thử lại sau."}
+
+
+_executor = None
+_slots = None
+_pid = None
+_lock = threading.Lock()
+
+
+def get_executor():
+	# Process pool dùng chung cho cả process Django, số process và số yêu cầu chờ đều có giới hạn.
+	# Pool được tạo lần đầu dùng trong từng process: process web được fork (ví dụ gunicorn --preload) tạo pool riêng
+	# thay vì dùng pool kế thừa từ process cha. Process render được tạo bằng forkserver để không sao chép các thread
+	# và khóa đang giữ của process Django, mỗi process nạp font một lần khi khởi động
+	global _executor, _slots, _pid
+
+	with _lock:
+		if _executor is None or _pid != os.getpid():
+			_executor = ProcessPoolExecutor(max_workers=settings.PDF_RENDER_WORKERS,
+											mp_context=multiprocessing.get_context("forkserver"),
+											initializer=setup_worker, initargs=(settings.PDF_FONT_PATH,))
+			_slots = threading.BoundedSemaphore(settings.PDF_RENDER_QUEUE_SIZE)
+			_pid = os.getpid()
+
+	return _executor, _slots
+
+
+def shutdown_executor():
+	global _executor
+
+	with _lock:
+		if _executor is not None and _pid == os.getpid():
+			_executor.shutdown(cancel_futures=True)
+		_executor = None
+
+
+atexit.register(shutdown_executor)
+
+
+def submit(executor, slots, document):
+	# Mỗi tài liệu đang chờ hoặc đang render giữ một chỗ trong slots, trả lại khi render xong
+	if not slots.acquire(timeout=settings.PDF_RENDER_TIMEOUT):
+		raise RendererBusy()
+
+	future = executor.submit(render_pdf, document)
+	future.add_done_callback(lambda _: slots.release())
+
+	return future
+
+
+def cache_key(document):
+	content = json.dumps({**document, "version": TEMPLATE_VERSION}, sort_keys=True, ensure_ascii=False, default=str)
+	return f"pdf:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+
+
+def render(document):
+	# Kết quả được cache theo hash nội dung tài liệu: hóa đơn/hợp đồng không đổi thì không render lại
+	key = cache_key(document)
+	content = cache.get(key)
+	if content is not None:
+		return content
+
+	future = submit(*get_executor(), document)
+	try:
+		content = future.result(timeout=settings.PDF_RENDER_TIMEOUT)
+	except TimeoutError:
+		raise RendererBusy()
+
+	cache.set(key, content, settings.PDF_CACHE_TIMEOUT)
+
+	return content
+
+
+def render_archive(documents):
+	# Render nhiều tài liệu vào một file zip, số tài liệu đang render cùng lúc được giới hạn để bộ nhớ không tăng theo số hóa đơn.
+	# Mỗi tài liệu cũng giữ một chỗ trong slots chung với render() nên file zip lớn không chiếm hết process render.
+	# PDF đã được nén sẵn nên file zip chỉ lưu (ZIP_STORED), không tốn CPU nén lại trong thread của request
+	executor, slots = get_executor()
+	window = min(settings.PDF_RENDER_WORKERS * 4, settings.PDF_RENDER_QUEUE_SIZE)
+
+	archive_file = tempfile.SpooledTemporaryFile(max_size=20 * 1024 * 1024)
+	with zipfile.ZipFile(archive_file, mode="w", compression=zipfile.ZIP_STORED) as archive:
+		pending = {}
+
+		def collect(futures):
+			for future in futures:
+				filename, key = pending.pop(future)
+				content = future.result()
+				cache.set(key, content, settings.PDF_CACHE_TIMEOUT)
+				archive.writestr(filename, content)
+
+		for filename, document in documents:
+			key = cache_key(document)
+			content = cache.get(key)
+			if content is not None:
+				archive.writestr(filename, content)
+				continue
+
+			pending[submit(executor, slots, document)] = (filename, key)
+			if len(pending) >= window:
+				done, _ = wait(pending, timeout=settings.PDF_RENDER_TIMEOUT, return_when=FIRST_COMPLETED)
+				if not done:
+					raise RendererBusy()
+				collect(done)
+
+		done, not_done = wait(pending, timeout=settings.PDF_RENDER_TIMEOUT)
+		if not_done:
+			raise RendererBusy()
+		collect(done)
+
+	archive_file.seek(0)
+
+	return archive_file
+
+
+def pdf_response(filename, document):
+	response = HttpResponse(render(document), content_type="application/pdf")
+	response["Content-Disposition"] = f'inline; filename="{filename}"'
+
+	return response
+
+
+def archive_response(filename, documents):
+	return FileResponse(render_archive(documents), as_attachment=True, filename=f"{filename}-{timezone.localdate():%Y%m%d}.zip",
+						content_type="application/zip")
+
+
+def _money(value):
+	return f"{value or 0:,.0f} VNĐ".replace(",", ".")
+
+
+def _datetime(value):
+	return timezone.localtime(value).strftime("%d-%m-%Y %H:%M:%S")
+
+
+def _document(title, number, rows, signatures=None, footer=None):
+	return {
+		"title": title,
+		"number": number,
+		"rows": [[label, str(value)] for label, value in rows],
+		"signatures": signatures or [],
+		"footer": footer,
+		"font_path": settings.PDF_FONT_PATH,
+	}
+
+
+def bill_rental_document(bill):
+	rental_contact = bill.rental_contact
+	document = _document("HÓA ĐƠN TIỀN THUÊ GIƯỜNG", f"Số: {bill.bill_number}", [
+		("Sinh viên", bill.student.user.full_name),
+		("MSSV", bill.student.student_id),
+		("Mã hồ sơ", rental_contact.rental_number),
+		("Phòng", rental_contact.room.name if rental_contact.room else ""),
+		("Giường", rental_contact.bed.name if rental_contact.bed else ""),
+		("Thời gian thuê", f"{rental_contact.time_rental} tháng"),
+		("Tổng tiền", _money(bill.total)),
+		("Trạng thái", bill.get_status_display()),
+		("Ngày lập", _datetime(bill.created_date)),
+		("Chuyên viên", bill.specialist.user.full_name),
+	], signatures=["Sinh viên", "Chuyên viên"])
+
+	return f"hoa-don-{bill.bill_number}.pdf", document
+
+
+def utility_bill_document(bill):
+	document = _document("HÓA ĐƠN ĐIỆN NƯỚC", f"Số: {bill.id}", [
+		("Phòng", bill.room.name),
+		("Điện tiêu thụ", f"{bill.total_electricity:g} kWh"),
+		("Nước tiêu thụ", f"{bill.total_cubic_meters_water:g} m3"),
+		("Tổng tiền", _money(bill.total_amount)),
+		("Trạng thái", bill.get_status_display()),
+		("Ngày lập", _datetime(bill.created_date)),
+		("Quản lý", bill.manager.user.full_name if bill.manager else ""),
+	], signatures=["Đại diện phòng", "Quản lý"])
+
+	return f"hoa-don-dien-nuoc-{bill.id}.pdf", document
+
+
+def rental_contact_document(rental_contact):
+	student = rental_contact.student
+	document = _document("HỢP ĐỒNG THUÊ GIƯỜNG KÝ TÚC XÁ", f"Số: {rental_contact.rental_number}", [
+		("Sinh viên", student.user.full_name),
+		("MSSV", student.student_id),
+		("Trường", student.university),
+		("Khoa / Ngành", f"{student.faculty} / {student.major}"),
+		("Phòng", rental_contact.room.name if rental_contact.room else ""),
+		("Giường", rental_contact.bed.name if rental_contact.bed else ""),
+		("Giá thuê", _money(rental_contact.bed.price if rental_contact.bed else 0)),
+		("Thời gian thuê", f"{rental_contact.time_rental} tháng"),
+		("Ngày đăng ký", _datetime(rental_contact.created_date)),
+	], signatures=["Sinh viên", "Đại diện ký túc xá"],
+		footer="Sinh viên cam kết tuân thủ nội quy ký túc xá trong suốt thời gian thuê.")
+
+	return f"hop-dong-{rental_contact.rental_number}.pdf", document
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rental.billing import create_utility_bills, parse_readings
+from users.models import Manager
+
+
+class Command(BaseCommand):
+	help = "Tạo hóa đơn điện nước hàng loạt từ file chỉ số CSV (room_id,electricity,water) hoặc JSON"
+
+	def add_arguments(self, parser):
+		parser.add_argument("path", help="Đường dẫn file chỉ số, dùng - để đọc từ stdin")
+		parser.add_argument("--format", dest="file_format", choices=["csv", "json"], default=None)
+		parser.add_argument("--manager-email", default=None)
+
+	def handle(self, *args, **options):
+		path = options["path"]
+		file_format = options["file_format"] or ("json" if path.endswith(".json") else "csv")
+
+		manager = None
+		if options["manager_email"]:
+			manager = Manager.objects.filter(user__email=options["manager_email"]).first()
+			if manager is None:
+				raise CommandError(f"Không tìm thấy quản lý {options['manager_email']}.")
+
+		try:
+			if path == "-":
+				readings = parse_readings(sys.stdin, file_format)
+			else:
+				with open(path, encoding="utf-8-sig") as stream:
+					readings = parse_readings(stream, file_format)
+		except (OSError, ValueError) as exc:
+			raise CommandError(f"Không đọc được file chỉ số: {exc}")
+
+		report = create_utility_bills(readings, manager=manager)
+
+		for error in report["errors"]:
+			self.stderr.write(f"Dòng {error['row']}: {error['message']}")
+		self.stdout.write(self.style.SUCCESS(
+			f"Đã tạo {report['created']}/{report['total']} hóa đơn, tổng tiền {report['total_amount']:,.0f}."))
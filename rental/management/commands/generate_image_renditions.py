@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from base import images
+from rental.models import Bed, Post, Room
+from rental.tasks import generate_image_renditions
+from users.models import User
+
+
+class Command(BaseCommand):
+	help = "Tạo ảnh thu nhỏ cho các ảnh phòng, giường, bài đăng và avatar chưa có"
+
+	def add_arguments(self, parser):
+		parser.add_argument("--async", dest="run_async", action="store_true", help="Đưa vào hàng đợi task nền thay vì chạy ngay")
+
+	def handle(self, *args, **options):
+		count = 0
+		for model, field_name in [(Room, "image"), (Post, "image"), (Bed, "image"), (User, "avatar")]:
+			queryset = model.objects.exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True})
+			for instance in queryset.only("pk", field_name, "renditions").iterator(chunk_size=500):
+				if images.has_current_renditions(instance, field_name):
+					continue
+
+				if options["run_async"]:
+					generate_image_renditions.delay(model._meta.label, instance.pk, field_name)
+				else:
+					generate_image_renditions(model._meta.label, instance.pk, field_name)
+				count += 1
+
+		self.stdout.write(self.style.SUCCESS(f"Đã xử lý {count} ảnh."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rental.billing import generate_rental_bills
+from users.models import Specialist
+
+
+class Command(BaseCommand):
+	help = "Lập hóa đơn tiền giường cho tất cả hợp đồng đã xác nhận nhưng chưa có hóa đơn"
+
+	def add_arguments(self, parser):
+		parser.add_argument("--specialist-email", required=True, help="Email chuyên viên đứng tên trên hóa đơn")
+
+	def handle(self, *args, **options):
+		specialist = Specialist.objects.filter(user__email=options["specialist_email"]).first()
+		if specialist is None:
+			raise CommandError(f"Không tìm thấy chuyên viên {options['specialist_email']}.")
+
+		report = generate_rental_bills(specialist=specialist)
+		self.stdout.write(self.style.SUCCESS(
+			f"Đã tạo {report['created']} hóa đơn, bỏ qua {report['skipped']}/{report['total']} hợp đồng đã có hóa đơn."))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rental.billing import generate_bills_from_readings, parse_period, parse_readings, record_meter_readings
+from users.models import Manager
+
+
+class Command(BaseCommand):
+	help = "Lập hóa đơn điện nước của một kỳ từ chỉ số công tơ theo biểu giá bậc thang"
+
+	def add_arguments(self, parser):
+		parser.add_argument("--period", required=True, help="Kỳ chỉ số dạng YYYY-MM")
+		parser.add_argument("--readings", default=None,
+							help="File chỉ số công tơ CSV/JSON (room_id,electricity_index,water_index) ghi trước khi lập hóa đơn; "
+								 "lần ghi đầu tiên của phòng thêm opening_electricity_index,opening_water_index")
+		parser.add_argument("--manager-email", default=None)
+
+	def handle(self, *args, **options):
+		try:
+			period = parse_period(options["period"])
+		except ValueError:
+			raise CommandError("Kỳ chỉ số phải có dạng YYYY-MM.")
+
+		manager = None
+		if options["manager_email"]:
+			manager = Manager.objects.filter(user__email=options["manager_email"]).first()
+			if manager is None:
+				raise CommandError(f"Không tìm thấy quản lý {options['manager_email']}.")
+
+		path = options["readings"]
+		if path:
+			try:
+				with open(path, encoding="utf-8-sig") as stream:
+					readings = parse_readings(stream, "json" if path.endswith(".json") else "csv")
+			except (OSError, ValueError) as exc:
+				raise CommandError(f"Không đọc được file chỉ số: {exc}")
+
+			report = record_meter_readings(readings, period=period, manager=manager)
+			for error in report["errors"]:
+				self.stderr.write(f"Dòng {error['row']}: {error['message']}")
+			self.stdout.write(f"Đã ghi {report['recorded']}/{report['total']} chỉ số công tơ.")
+
+		report = generate_bills_from_readings(period, manager=manager)
+		for error in report["errors"]:
+			self.stderr.write(f"Phòng {error['room_id']}: {error['message']}")
+		self.stdout.write(self.style.SUCCESS(
+			f"Kỳ {report['period']}: đã tạo {report['created']} hóa đơn, tổng tiền {report['total_amount']:,.0f}."))
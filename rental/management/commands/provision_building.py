@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from rental.models import Room
+from rental.provisioning import provision_building
+
+
+class Command(BaseCommand):
+	help = "Tạo toàn bộ phòng, giường và bài đăng của một tòa nhà"
+
+	def add_arguments(self, parser):
+		parser.add_argument("building", help="Ký hiệu tòa nhà, dùng làm tiền tố tên phòng (ví dụ: A)")
+		parser.add_argument("--floors", type=int, required=True)
+		parser.add_argument("--rooms-per-floor", type=int, required=True)
+		parser.add_argument("--type", choices=Room.Type.values, default=Room.Type.NORMAL)
+		parser.add_argument("--room-for", choices=Room.RoomFor.values, default=Room.RoomFor.MALE)
+		parser.add_argument("--no-posts", action="store_true", help="Không tạo bài đăng cho các phòng")
+
+	def handle(self, *args, **options):
+		try:
+			report = provision_building(building=options["building"], floors=options["floors"],
+										rooms_per_floor=options["rooms_per_floor"], room_type=options["type"],
+										room_for=options["room_for"], create_posts=not options["no_posts"])
+		except ValidationError as exc:
+			raise CommandError(exc.detail.get("message"))
+
+		timings = ", ".join(f"{name}: {seconds}s" for name, seconds in report["timings"].items())
+		self.stdout.write(self.style.SUCCESS(
+			f"Đã tạo {report['rooms']} phòng, {report['beds']} giường, {report['posts']} bài đăng ({timings})."))
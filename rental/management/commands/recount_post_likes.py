@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from rental.models import Post
+
+
+class Command(BaseCommand):
+	help = "Tính lại số lượt thích (like_count) của các bài đăng từ bảng Like"
+
+	def add_arguments(self, parser):
+		parser.add_argument("post_ids", nargs="*", type=int, help="Chỉ tính lại cho các bài đăng này")
+
+	def handle(self, *args, **options):
+		queryset = Post.objects.all()
+		if options["post_ids"]:
+			queryset = queryset.filter(id__in=options["post_ids"])
+
+		updated = Post.recount_likes(queryset=queryset)
+
+		self.stdout.write(self.style.SUCCESS(f"Đã cập nhật số lượt thích cho {updated} bài đăng."))
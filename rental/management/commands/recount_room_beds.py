@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from rental.models import Room
+
+
+class Command(BaseCommand):
+	help = "Tính lại số giường (tổng, trống, đã thuê) của các phòng từ bảng Bed"
+
+	def add_arguments(self, parser):
+		parser.add_argument("room_ids", nargs="*", type=int, help="Chỉ tính lại cho các phòng này")
+
+	def handle(self, *args, **options):
+		queryset = Room.objects.all()
+		if options["room_ids"]:
+			queryset = queryset.filter(id__in=options["room_ids"])
+
+		updated = Room.recount_beds(queryset=queryset)
+
+		self.stdout.write(self.style.SUCCESS(f"Đã cập nhật bộ đếm giường cho {updated} phòng."))
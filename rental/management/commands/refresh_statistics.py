@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from rental.stats import refresh_monthly_statistics
+
+
+class Command(BaseCommand):
+	help = "Làm mới bảng thống kê theo tháng (mặc định chỉ tính lại các tháng chưa đóng)"
+
+	def add_arguments(self, parser):
+		parser.add_argument("--full", action="store_true", help="Tính lại toàn bộ lịch sử, kể cả các tháng đã đóng")
+
+	def handle(self, *args, **options):
+		months = refresh_monthly_statistics(full=options["full"])
+		self.stdout.write(self.style.SUCCESS(f"Đã làm mới thống kê của {months} tháng."))
@@ -0,0 +1,31 @@
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from rental.admission import get_admission_queue, start_workers
+
+
+class Command(BaseCommand):
+	help = "Chạy nhóm worker xử lý hàng đợi đăng ký giường"
+
+	def add_arguments(self, parser):
+		parser.add_argument("--workers", type=int, default=settings.ADMISSION_WORKERS,
+							help="Số worker, cũng là số kết nối DB tối đa dùng cho việc đặt giường")
+
+	def handle(self, *args, **options):
+		if not settings.REDIS_URL:
+			# Hàng đợi trong tiến trình không dùng chung được với các tiến trình web
+			raise CommandError("Cần cấu hình REDIS_URL để chạy worker hàng đợi đăng ký giường.")
+
+		stop_event = threading.Event()
+		threads = start_workers(get_admission_queue(), options["workers"], stop_event)
+		self.stdout.write(self.style.SUCCESS(f"Đang chạy {len(threads)} worker xử lý hàng đợi đăng ký giường."))
+
+		try:
+			for thread in threads:
+				thread.join()
+		except KeyboardInterrupt:
+			stop_event.set()
+			for thread in threads:
+				thread.join()
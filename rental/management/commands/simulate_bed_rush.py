@@ -0,0 +1,64 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.exceptions import APIException
+
+from rental.booking import book_bed
+from rental.models import Bed, RentalContact
+from users.models import Student
+
+
+class Command(BaseCommand):
+	help = "Cho nhiều sinh viên cùng lúc đăng ký một giường để kiểm tra engine đặt giường khi tải cao"
+
+	def add_arguments(self, parser):
+		parser.add_argument("bed_id", type=int)
+		parser.add_argument("--students", type=int, default=100, help="Số sinh viên cùng đăng ký")
+		parser.add_argument("--workers", type=int, default=20, help="Số luồng gửi request song song")
+		parser.add_argument("--cleanup", action="store_true", help="Xóa các hồ sơ được tạo sau khi chạy xong")
+
+	def handle(self, *args, **options):
+		bed = Bed.objects.select_related("room").filter(pk=options["bed_id"]).first()
+		if bed is None:
+			raise CommandError("Không tìm thấy giường.")
+
+		students = list(Student.objects.select_related("user").filter(user__gender=bed.room.room_for)[:options["students"]])
+		if not students:
+			raise CommandError("Không có sinh viên phù hợp với giới tính của phòng.")
+
+		started = time.perf_counter()
+		with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+			results = list(executor.map(lambda student: self.attempt(student, bed.id), students))
+		elapsed = time.perf_counter() - started
+
+		outcomes = Counter(outcome for outcome, _ in results)
+		latencies = sorted(latency for _, latency in results)
+		created_ids = list(RentalContact.objects.filter(
+			bed=bed, student__in=students, status__in=RentalContact.ACTIVE_STATUSES).values_list("id", flat=True))
+
+		for outcome, count in sorted(outcomes.items()):
+			self.stdout.write(f"{outcome}: {count}")
+		self.stdout.write(f"Tổng thời gian: {elapsed:.3f}s, p50: {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+						  f"max: {latencies[-1] * 1000:.1f}ms")
+
+		if len(created_ids) > 1:
+			raise CommandError(f"Giường {bed.id} có {len(created_ids)} hồ sơ còn hiệu lực.")
+		self.stdout.write(self.style.SUCCESS(f"Giường {bed.id} có {len(created_ids)} hồ sơ còn hiệu lực."))
+
+		if options["cleanup"]:
+			RentalContact.objects.filter(id__in=created_ids).delete()
+
+	def attempt(self, student, bed_id):
+		started = time.perf_counter()
+		try:
+			book_bed(student=student, bed_id=bed_id)
+			outcome = "created"
+		except APIException as exc:
+			outcome = f"{exc.status_code} {exc.detail.get('message', exc.detail) if isinstance(exc.detail, dict) else exc.detail}"
+		finally:
+			connection.close()
+
+		return outcome, time.perf_counter() - started
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from rental.billing import split_utility_bills
+
+
+class Command(BaseCommand):
+	help = "Chia các hóa đơn điện nước chưa được chia cho sinh viên đang ở trong phòng"
+
+	def handle(self, *args, **options):
+		created = split_utility_bills()
+		self.stdout.write(self.style.SUCCESS(f"Đã tạo {created} khoản điện nước cho sinh viên."))
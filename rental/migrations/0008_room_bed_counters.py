@@ -0,0 +1,46 @@
+# Generated by Django 4.2.13 on 2026-10-18 11:36
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def recount_beds(apps, schema_editor):
+    Room = apps.get_model('rental', 'Room')
+    Bed = apps.get_model('rental', 'Bed')
+
+    def count_beds(**filters):
+        beds = Bed.objects.filter(room=OuterRef('pk'), **filters).order_by().values('room')
+        return Coalesce(Subquery(beds.annotate(count=Count('id')).values('count')), Value(0))
+
+    Room.objects.update(
+        total_beds=count_beds(),
+        vacant_beds=count_beds(status='VACUITY'),
+        occupied_beds=count_beds(status='NONVACUITY'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental', '0007_alter_rentalcontact_bed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='occupied_beds',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='total_beds',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='vacant_beds',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recount_beds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.13 on 2026-10-18 11:37
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def recount_likes(apps, schema_editor):
+    Post = apps.get_model('rental', 'Post')
+    Like = apps.get_model('interacts', 'Like')
+
+    likes = Like.objects.filter(post=OuterRef('pk'), is_active=True).order_by().values('post')
+    Post.objects.update(like_count=Coalesce(Subquery(likes.annotate(count=Count('id')).values('count')), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interacts', '0003_initial'),
+        ('rental', '0008_room_bed_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recount_likes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.13 on 2026-10-18 11:52
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import UnaccentExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import F, Func, OuterRef, Subquery, TextField, Value
+
+
+def refresh_search_vector(apps, schema_editor):
+    Post = apps.get_model('rental', 'Post')
+    Room = apps.get_model('rental', 'Room')
+
+    room_name = Subquery(Room.objects.filter(pk=OuterRef('room_id')).values('name')[:1])
+    description = Func(F('description'), Value('<[^>]+>'), Value(' '), Value('g'), function='regexp_replace', output_field=TextField())
+    Post.objects.update(
+        search_vector=SearchVector('name', weight='A', config='vietnamese_unaccent')
+        + SearchVector(room_name, weight='B', config='vietnamese_unaccent')
+        + SearchVector(description, weight='C', config='vietnamese_unaccent')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental', '0009_post_like_count'),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunSQL(
+            sql=[
+                'CREATE TEXT SEARCH CONFIGURATION vietnamese_unaccent (COPY = simple);',
+                'ALTER TEXT SEARCH CONFIGURATION vietnamese_unaccent '
+                'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;',
+            ],
+            reverse_sql='DROP TEXT SEARCH CONFIGURATION IF EXISTS vietnamese_unaccent;',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='rental_post_search_vector'),
+        ),
+        migrations.RunPython(refresh_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.13 on 2026-10-18 11:42
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental', '0010_post_search_vector'),
+        ('users', '0006_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billrentalcontact',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('bill_number', models.TextField())), name='gin_trgm_ops'), name='rental_bill_number_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='rentalcontact',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('rental_number', models.TextField())), name='gin_trgm_ops'), name='rental_contact_number_trgm'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.13 on 2026-10-18 11:43
+
+from django.db import migrations, models
+
+
+def cancel_duplicate_active_contacts(apps, schema_editor):
+    # Giữ lại một hồ sơ còn hiệu lực cho mỗi sinh viên/giường (ưu tiên hồ sơ đã duyệt, sau đó là hồ sơ mới nhất),
+    # các hồ sơ trùng còn lại chuyển sang CANCEL để tạo được ràng buộc unique
+    RentalContact = apps.get_model('rental', 'RentalContact')
+    active = RentalContact.objects.filter(status__in=['PROCESSING', 'SUCCESS'], is_active=True)
+    ordered = sorted(active.values('id', 'student_id', 'bed_id', 'status'),
+                     key=lambda contact: (contact['status'] != 'SUCCESS', -contact['id']))
+
+    kept_students, kept_beds, duplicate_ids = set(), set(), []
+    for contact in ordered:
+        if contact['student_id'] in kept_students or (contact['bed_id'] and contact['bed_id'] in kept_beds):
+            duplicate_ids.append(contact['id'])
+            continue
+
+        kept_students.add(contact['student_id'])
+        if contact['bed_id']:
+            kept_beds.add(contact['bed_id'])
+
+    RentalContact.objects.filter(id__in=duplicate_ids).update(status='CANCEL')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental', '0011_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicate_active_contacts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='rentalcontact',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True), ('status__in', ['PROCESSING', 'SUCCESS'])), fields=('student',), name='rental_contact_one_active_per_student'),
+        ),
+        migrations.AddConstraint(
+            model_name='rentalcontact',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True), ('status__in', ['PROCESSING', 'SUCCESS'])), fields=('bed',), name='rental_contact_one_active_per_bed'),
+        ),
+    ]
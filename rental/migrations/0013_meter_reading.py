@@ -0,0 +1,34 @@
+# Generated by Django 4.2.13 on 2026-10-18 11:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_trigram_search_indexes'),
+        ('rental', '0012_one_active_rental_contact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeterReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('period', models.DateField()),
+                ('electricity_index', models.FloatField()),
+                ('water_index', models.FloatField()),
+                ('bill', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='meter_reading', to='rental.electricityandwaterbills')),
+                ('manager', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='meter_readings', to='users.manager')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meter_readings', to='rental.room')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='meterreading',
+            constraint=models.UniqueConstraint(fields=('room', 'period'), name='meter_reading_one_per_room_period'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.13 on 2026-10-18 11:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_trigram_search_indexes'),
+        ('rental', '0013_meter_reading'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UtilityCharge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('amount', models.FloatField()),
+                ('status', models.CharField(choices=[('PAID', 'Đã thanh toán'), ('UNPAID', 'Chưa thanh toán')], default='UNPAID', max_length=255)),
+                ('bill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='charges', to='rental.electricityandwaterbills')),
+                ('rental_contact', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='utility_charges', to='rental.rentalcontact')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='utility_charges', to='users.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'status'], name='utility_charge_student_status')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='utilitycharge',
+            constraint=models.UniqueConstraint(fields=('bill', 'student'), name='utility_charge_one_per_bill_student'),
+        ),
+    ]
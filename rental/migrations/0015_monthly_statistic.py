@@ -0,0 +1,31 @@
+# Generated by Django 4.2.13 on 2026-10-18 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental', '0014_utility_charge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('month', models.DateField(unique=True)),
+                ('successful_rentals', models.IntegerField(default=0)),
+                ('cancelled_rentals', models.IntegerField(default=0)),
+                ('rental_revenue', models.FloatField(default=0)),
+                ('utility_revenue', models.FloatField(default=0)),
+                ('is_closed', models.BooleanField(default=False)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
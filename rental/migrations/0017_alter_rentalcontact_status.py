@@ -0,0 +1,18 @@
+# Generated by Django 4.2.13 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental', '0016_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rentalcontact',
+            name='status',
+            field=models.CharField(choices=[('CANCEL', 'Đã Hủy'), ('PROCESSING', 'Đang xử lý'), ('SUCCESS', 'Đạt'), ('FAIL', 'Không đạt')], default='PROCESSING', max_length=255),
+        ),
+    ]
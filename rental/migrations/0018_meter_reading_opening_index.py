@@ -0,0 +1,23 @@
+# Generated by Django 4.2.13 on 2026-10-18 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental', '0017_alter_rentalcontact_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meterreading',
+            name='opening_electricity_index',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meterreading',
+            name='opening_water_index',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
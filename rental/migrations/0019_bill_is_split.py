@@ -0,0 +1,29 @@
+# Generated by Django 4.2.13 on 2026-10-18 12:19
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def mark_split_bills(apps, schema_editor):
+    ElectricityAndWaterBills = apps.get_model('rental', 'ElectricityAndWaterBills')
+    UtilityCharge = apps.get_model('rental', 'UtilityCharge')
+
+    ElectricityAndWaterBills.objects.filter(
+        Exists(UtilityCharge.objects.filter(bill=OuterRef('pk')))
+    ).update(is_split=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental', '0018_meter_reading_opening_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='electricityandwaterbills',
+            name='is_split',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_split_bills, migrations.RunPython.noop),
+    ]
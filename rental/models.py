@@ -1,10 +1,15 @@
 import uuid
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models, transaction
+from django.db.models import Count, F, Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Upper
 from django_ckeditor_5.fields import CKEditor5Field
 
 from base.models import BaseModel
-from utils.constants import NUMBER_OF_BED_NORMAL_ROOM, NUMBER_OF_BED_SERVICE_ROOM, PRICE_OF_BED_NORMAL_ROOM, PRICE_OF_BED_SERVICE_ROOM
+from interacts.models import Like
+from utils.constants import NUMBER_OF_BED_NORMAL_ROOM, NUMBER_OF_BED_SERVICE_ROOM, PRICE_OF_BED_NORMAL_ROOM, PRICE_OF_BED_SERVICE_ROOM, SEARCH_CONFIG
 
 
 class Room(BaseModel):
@@ -18,9 +23,16 @@ class Room(BaseModel):
 
 	name = models.CharField(max_length=255, null=False, blank=False)
 	image = models.ImageField(upload_to='', null=True, blank=True)
+	renditions = models.JSONField(default=dict, blank=True, editable=False)
 	number_of_bed = models.IntegerField(null=True, blank=True)
 	type = models.CharField(max_length=255, null=False, blank=False, choices=Type.choices, default=Type.NORMAL)
 	room_for = models.CharField(max_length=255, null=False, blank=False, choices=RoomFor.choices, default=RoomFor.MALE)
+	total_beds = models.IntegerField(null=False, blank=False, default=0, editable=False)
+	vacant_beds = models.IntegerField(null=False, blank=False, default=0, editable=False)
+	occupied_beds = models.IntegerField(null=False, blank=False, default=0, editable=False)
+
+	counter_fields = ("total_beds", "vacant_beds", "occupied_beds")
+	background_fields = ("renditions",)
 
 	def __str__(self):
 		return self.name
@@ -30,17 +42,85 @@ class Room(BaseModel):
 			self.number_of_bed = NUMBER_OF_BED_NORMAL_ROOM if self.type == self.Type.NORMAL else NUMBER_OF_BED_SERVICE_ROOM
 		super().save(*args, **kwargs)
 
+	@staticmethod
+	def bed_counter_for(status):
+		return "occupied_beds" if status == Bed.Status.NONVACUITY else "vacant_beds"
+
+	@classmethod
+	def shift_bed_counters(cls, room_id, status, delta):
+		# Cộng/trừ bộ đếm bằng F() để các request đồng thời không ghi đè lên nhau
+		counter = cls.bed_counter_for(status)
+		cls.objects.filter(pk=room_id).update(total_beds=F("total_beds") + delta, **{counter: F(counter) + delta})
+
+	@classmethod
+	def move_bed_counters(cls, room_id, old_status, new_status):
+		old_counter = cls.bed_counter_for(old_status)
+		new_counter = cls.bed_counter_for(new_status)
+		if old_counter == new_counter:
+			return
+
+		cls.objects.filter(pk=room_id).update(**{old_counter: F(old_counter) - 1, new_counter: F(new_counter) + 1})
+
+	@classmethod
+	def recount_beds(cls, queryset=None):
+		# Tính lại toàn bộ bộ đếm bằng một câu UPDATE duy nhất
+		queryset = cls.objects.all() if queryset is None else queryset
+
+		def count_beds(**filters):
+			beds = Bed.objects.filter(room=OuterRef("pk"), **filters).order_by().values("room")
+			return Coalesce(Subquery(beds.annotate(count=Count("id")).values("count")), Value(0))
+
+		return queryset.update(
+			total_beds=count_beds(),
+			vacant_beds=count_beds(status=Bed.Status.VACUITY),
+			occupied_beds=count_beds(status=Bed.Status.NONVACUITY),
+		)
+
 
 class Post(BaseModel):
+	class Meta:
+		indexes = [GinIndex(fields=["search_vector"], name="rental_post_search_vector")]
+
 	name = models.CharField(max_length=255, null=False, blank=False)
 	image = models.ImageField(upload_to='', null=True, blank=True)
+	renditions = models.JSONField(default=dict, blank=True, editable=False)
 	description = CKEditor5Field("Text", config_name="extends")
+	like_count = models.IntegerField(null=False, blank=False, default=0, editable=False)
+	search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
 	room = models.OneToOneField(to=Room, null=False, blank=False, on_delete=models.CASCADE, related_name="post")
 
+	counter_fields = ("like_count",)
+	background_fields = ("renditions",)
+
 	def __str__(self):
 		return self.name
 
+	@classmethod
+	def refresh_search_vector(cls, queryset=None):
+		# Tên bài đăng > tên phòng > mô tả (đã bỏ thẻ HTML của CKEditor), tính lại bằng một câu UPDATE
+		queryset = cls.objects.all() if queryset is None else queryset
+		room_name = Subquery(Room.objects.filter(pk=OuterRef("room_id")).values("name")[:1])
+		description = Func(F("description"), Value("<[^>]+>"), Value(" "), Value("g"), function="regexp_replace",
+						   output_field=models.TextField())
+
+		return queryset.update(
+			search_vector=SearchVector("name", weight="A", config=SEARCH_CONFIG)
+			+ SearchVector(room_name, weight="B", config=SEARCH_CONFIG)
+			+ SearchVector(description, weight="C", config=SEARCH_CONFIG)
+		)
+
+	@classmethod
+	def shift_like_count(cls, post_id, delta):
+		cls.objects.filter(pk=post_id).update(like_count=F("like_count") + delta)
+
+	@classmethod
+	def recount_likes(cls, queryset=None):
+		queryset = cls.objects.all() if queryset is None else queryset
+		likes = Like.objects.filter(post=OuterRef("pk"), is_active=True).order_by().values("post")
+
+		return queryset.update(like_count=Coalesce(Subquery(likes.annotate(count=Count("id")).values("count")), Value(0)))
+
 
 class Bed(BaseModel):
 	class Status(models.TextChoices):
@@ -50,18 +130,43 @@ class Bed(BaseModel):
 	name = models.CharField(max_length=255, null=False, blank=False)
 	price = models.FloatField(null=True, blank=True)
 	image = models.ImageField(upload_to='', null=True, blank=True)
+	renditions = models.JSONField(default=dict, blank=True, editable=False)
 	description = CKEditor5Field("Text", config_name="extends")
 	status = models.CharField(max_length=255, null=False, blank=False, choices=Status.choices, default=Status.VACUITY)
 
 	room = models.ForeignKey(to=Room, null=False, blank=False, on_delete=models.CASCADE, related_name="beds")
 
+	background_fields = ("renditions",)
+
+	_loaded_room_id = None
+	_loaded_status = None
+
 	def __str__(self):
 		return self.name
 
+	@classmethod
+	def from_db(cls, db, field_names, values):
+		instance = super().from_db(db, field_names, values)
+		instance.remember_loaded_state()
+
+		return instance
+
+	def remember_loaded_state(self):
+		# Lưu lại phòng và trạng thái đã đọc từ DB để signal biết cần cập nhật bộ đếm nào
+		self._loaded_room_id = self.__dict__.get("room_id")
+		self._loaded_status = self.__dict__.get("status")
+
+	@staticmethod
+	def price_for(room_type):
+		return PRICE_OF_BED_NORMAL_ROOM if room_type == Room.Type.NORMAL else PRICE_OF_BED_SERVICE_ROOM
+
 	def save(self, *args, **kwargs):
 		if self.price is None:
-			self.price = PRICE_OF_BED_NORMAL_ROOM if self.room.type == Room.Type.NORMAL else PRICE_OF_BED_SERVICE_ROOM
-		super().save(*args, **kwargs)
+			self.price = self.price_for(self.room.type)
+
+		# Lưu giường và cập nhật bộ đếm của phòng (trong rental.signals) trong cùng một transaction
+		with transaction.atomic():
+			super().save(*args, **kwargs)
 
 
 class RentalContact(BaseModel):
@@ -73,6 +178,22 @@ class RentalContact(BaseModel):
         SUCCESS = "SUCCESS", "Đạt"
         FAIL = "FAIL", "Không đạt"
 
+    # Hồ sơ đang xử lý hoặc đã duyệt giữ giường; mỗi sinh viên và mỗi giường chỉ có tối đa một hồ sơ như vậy
+    ACTIVE_STATUSES = [Status.PROCESSING, Status.SUCCESS]
+
+    class Meta:
+        # Index trigram trên dạng chữ của UUID để tìm theo một phần mã hồ sơ (icontains) không phải quét cả bảng
+        indexes = [
+            GinIndex(OpClass(Upper(Cast("rental_number", models.TextField())), name="gin_trgm_ops"),
+                     name="rental_contact_number_trgm"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["student"], condition=Q(status__in=["PROCESSING", "SUCCESS"], is_active=True),
+                                    name="rental_contact_one_active_per_student"),
+            models.UniqueConstraint(fields=["bed"], condition=Q(status__in=["PROCESSING", "SUCCESS"], is_active=True),
+                                    name="rental_contact_one_active_per_bed"),
+        ]
+
     rental_number = models.UUIDField(null=False, blank=False, unique=True, db_index=True, editable=False, default=uuid.uuid4)
     time_rental = models.CharField(max_length=255, null=False, blank=False)
     status = models.CharField(max_length=255, null=False, blank=False, choices=Status.choices, default=Status.PROCESSING)
@@ -82,6 +203,12 @@ class RentalContact(BaseModel):
     room = models.ForeignKey(to=Room, null=True, blank=True, on_delete=models.SET_NULL, related_name="rental_contacts")
 
 class BillRentalContact(BaseModel):
+	class Meta:
+		indexes = [
+			GinIndex(OpClass(Upper(Cast("bill_number", models.TextField())), name="gin_trgm_ops"),
+					 name="rental_bill_number_trgm"),
+		]
+
 	class Status(models.TextChoices):
 		PAID = "PAID", "Đã thanh toán"
 		UNPAID = "UNPAID", "Chưa thanh toán"
@@ -108,10 +235,72 @@ class ElectricityAndWaterBills(BaseModel):
 		PAID = "PAID", "Đã thanh toán"
 		UNPAID = "UNPAID", "Chưa thanh toán"
 
+	background_fields = ("is_split",)
+
 	total_cubic_meters_water = models.FloatField(null=False, blank=False)
 	total_electricity = models.FloatField(null=False, blank=False)
 	total_amount = models.FloatField(null=False, blank=False)
 	status = models.CharField(max_length=255, null=False, blank=False, choices=Status.choices, default=Status.UNPAID)
+	# Đã được chia cho người ở (kể cả khi phòng trống, không có phần tiền nào) nên không cần quét lại
+	is_split = models.BooleanField(default=False)
 
 	room = models.ForeignKey(to=Room, null=False, blank=False, on_delete=models.CASCADE, related_name="electricity_and_water_bills")
 	manager = models.ForeignKey(to="users.Manager", null=True, blank=True, on_delete=models.SET_NULL, related_name="electricity_and_water_bills")
+
+
+class UtilityCharge(BaseModel):
+	# Phần tiền điện nước của từng sinh viên đang ở phòng (hợp đồng SUCCESS), chia đều từ hóa đơn của phòng;
+	# status được đồng bộ theo hóa đơn (billing.sync_charge_status) để lọc theo index (student, status)
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["bill", "student"], name="utility_charge_one_per_bill_student"),
+		]
+		indexes = [
+			models.Index(fields=["student", "status"], name="utility_charge_student_status"),
+		]
+
+	amount = models.FloatField(null=False, blank=False)
+	status = models.CharField(max_length=255, null=False, blank=False, choices=ElectricityAndWaterBills.Status.choices,
+							  default=ElectricityAndWaterBills.Status.UNPAID)
+
+	bill = models.ForeignKey(to=ElectricityAndWaterBills, null=False, blank=False, on_delete=models.CASCADE, related_name="charges")
+	student = models.ForeignKey(to="users.Student", null=False, blank=False, on_delete=models.CASCADE, related_name="utility_charges")
+	rental_contact = models.ForeignKey(to=RentalContact, null=True, blank=True, on_delete=models.SET_NULL, related_name="utility_charges")
+
+	def __str__(self):
+		return f"{self.student} - {self.amount}"
+
+
+class MeterReading(BaseModel):
+	# Chỉ số công tơ điện nước cộng dồn của phòng, mỗi phòng một chỉ số cho mỗi kỳ (ngày đầu tháng)
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["room", "period"], name="meter_reading_one_per_room_period"),
+		]
+
+	period = models.DateField(null=False, blank=False)
+	electricity_index = models.FloatField(null=False, blank=False)
+	water_index = models.FloatField(null=False, blank=False)
+	# Chỉ số đầu kỳ, dùng thay cho kỳ trước khi đây là chỉ số đầu tiên của phòng
+	opening_electricity_index = models.FloatField(null=True, blank=True)
+	opening_water_index = models.FloatField(null=True, blank=True)
+
+	room = models.ForeignKey(to=Room, null=False, blank=False, on_delete=models.CASCADE, related_name="meter_readings")
+	manager = models.ForeignKey(to="users.Manager", null=True, blank=True, on_delete=models.SET_NULL, related_name="meter_readings")
+	bill = models.OneToOneField(to=ElectricityAndWaterBills, null=True, blank=True, on_delete=models.SET_NULL, related_name="meter_reading")
+
+	def __str__(self):
+		return f"{self.room} - {self.period:%m/%Y}"
+
+
+class MonthlyStatistic(BaseModel):
+	# Số liệu thống kê tổng hợp theo tháng; tháng đã qua được đóng (is_closed) và không tính lại nữa
+	month = models.DateField(null=False, blank=False, unique=True)
+	successful_rentals = models.IntegerField(null=False, blank=False, default=0)
+	cancelled_rentals = models.IntegerField(null=False, blank=False, default=0)
+	rental_revenue = models.FloatField(null=False, blank=False, default=0)
+	utility_revenue = models.FloatField(null=False, blank=False, default=0)
+	is_closed = models.BooleanField(default=False)
+
+	def __str__(self):
+		return f"{self.month:%m/%Y}"
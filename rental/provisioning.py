@@ -0,0 +1,89 @@
+import time
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from base.caches import invalidate_on_commit
+from rental.models import Bed, Post, Room
+from utils.constants import NUMBER_OF_BED_NORMAL_ROOM, NUMBER_OF_BED_SERVICE_ROOM
+
+
+def create_beds(room_quantities):
+	# room_quantities: {room_id: số giường cần tạo}, None nghĩa là tạo cho đủ số giường của phòng.
+	# Toàn bộ giường được tạo bằng bulk_create trong một transaction, giá giường lấy từ utils.constants theo loại phòng
+	with transaction.atomic():
+		rooms = Room.objects.select_for_update().filter(is_active=True).in_bulk(list(room_quantities))
+
+		missing = [str(room_id) for room_id in room_quantities if room_id not in rooms]
+		if missing:
+			raise ValidationError({"message": f"Không tìm thấy phòng: {', '.join(missing)}."})
+
+		beds, created = [], {}
+		for room_id, quantity in room_quantities.items():
+			room = rooms[room_id]
+			available = room.number_of_bed - room.total_beds
+			quantity = available if quantity is None else quantity
+
+			if quantity > available:
+				raise ValidationError({"message": f"{room.name} chỉ còn chỗ cho {max(available, 0)} giường."})
+
+			price = Bed.price_for(room.type)
+			beds.extend(Bed(name=f"Giường {room.total_beds + index}", price=price, description="", room=room)
+						for index in range(1, quantity + 1))
+			created[room_id] = quantity
+
+		Bed.objects.bulk_create(beds, batch_size=500)
+		Room.recount_beds(queryset=Room.objects.filter(pk__in=list(rooms)))
+		invalidate_on_commit("beds")
+
+	return created
+
+
+def provision_building(building, floors, rooms_per_floor, room_type=Room.Type.NORMAL, room_for=Room.RoomFor.MALE,
+					   create_posts=True):
+	# Tạo toàn bộ phòng, giường và bài đăng của một tòa nhà bằng bulk_create trong một transaction.
+	# Tên phòng theo dạng <tòa><tầng><số phòng>, ví dụ A101
+	timings = {}
+	started = time.perf_counter()
+
+	number_of_bed = NUMBER_OF_BED_NORMAL_ROOM if room_type == Room.Type.NORMAL else NUMBER_OF_BED_SERVICE_ROOM
+	names = [f"{building}{floor}{index:02d}" for floor in range(1, floors + 1) for index in range(1, rooms_per_floor + 1)]
+
+	with transaction.atomic():
+		if Room.objects.filter(name__in=names).exists():
+			raise ValidationError({"message": f"Tòa {building} đã có phòng trùng tên."})
+
+		rooms = Room.objects.bulk_create([
+			Room(name=name, type=room_type, room_for=room_for, number_of_bed=number_of_bed,
+				 total_beds=number_of_bed, vacant_beds=number_of_bed)
+			for name in names
+		], batch_size=500)
+		timings["rooms"] = time.perf_counter() - started
+
+		price = Bed.price_for(room_type)
+		beds = Bed.objects.bulk_create([
+			Bed(name=f"Giường {index}", price=price, description="", room=room)
+			for room in rooms for index in range(1, number_of_bed + 1)
+		], batch_size=1000)
+		timings["beds"] = time.perf_counter() - started - timings["rooms"]
+
+		posts = []
+		if create_posts:
+			description = (f"<p>{Room.Type(room_type).label} dành cho {Room.RoomFor(room_for).label.lower()}, "
+						   f"{number_of_bed} giường.</p>")
+			posts = Post.objects.bulk_create([
+				Post(name=f"Phòng {room.name}", description=description, room=room) for room in rooms
+			], batch_size=500)
+			Post.refresh_search_vector(queryset=Post.objects.filter(room__in=rooms))
+			timings["posts"] = time.perf_counter() - started - timings["rooms"] - timings["beds"]
+
+		invalidate_on_commit("rooms", "beds", "posts")
+
+	timings["total"] = time.perf_counter() - started
+
+	return {
+		"rooms": len(rooms),
+		"beds": len(beds),
+		"posts": len(posts),
+		"timings": {name: round(seconds, 3) for name, seconds in timings.items()},
+	}
@@ -1,24 +1,30 @@
 from rest_framework import serializers
 
+from base import images
 from base.serializers import BaseSerializer
 from interacts.models import Like
-from rental.models import Room, Bed, Post, RentalContact, BillRentalContact, ViolateNotice, ElectricityAndWaterBills
+from rental.models import Room, Bed, Post, RentalContact, BillRentalContact, ViolateNotice, ElectricityAndWaterBills, \
+    UtilityCharge, MonthlyStatistic
 from users import serializers as user_serializers
 
 
 class RoomSerializer(BaseSerializer):
     beds = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
+
+    bed_summary_fields = ["id", "name", "price", "image", "status"]
 
     class Meta:
         model = Room
-        fields = ["id", "name", "image", "number_of_bed", "type", "room_for", "created_date", "updated_date", "beds"]
+        fields = ["id", "name", "image", "renditions", "number_of_bed", "total_beds", "vacant_beds", "occupied_beds",
+                  "type", "room_for", "created_date", "updated_date", "beds"]
 
     def to_representation(self, room):
         data = super().to_representation(room)
         image = data.get("image")
 
         if "image" in self.fields and image:
-            data["image"] = room.image.url
+            data["image"] = images.image_url(room, size=self.image_size)
 
         return data
 
@@ -32,17 +38,24 @@ class RoomSerializer(BaseSerializer):
         return room
 
     def get_beds(self, room):
-        beds = room.beds.all()
+        # RoomViewSet prefetch sẵn các giường đang hoạt động vào room.active_beds
+        beds = getattr(room, "active_beds", None)
+        if beds is None:
+            beds = room.beds.filter(is_active=True).order_by("id")
+
+        if self.context.get("action") == "list":
+            return BedSerializer(beds, many=True, fields=self.bed_summary_fields, context=self.context).data
 
         return BedSerializer(beds, many=True).data
 
 
 class PostSerializer(BaseSerializer):
-    total_likes = serializers.SerializerMethodField()
+    total_likes = serializers.IntegerField(source="like_count", read_only=True)
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
-        fields = ["id", "name", "image", "description", "created_date", "updated_date", "total_likes", "room"]
+        fields = ["id", "name", "image", "renditions", "description", "created_date", "updated_date", "total_likes", "room"]
 
     def to_representation(self, post):
         data = super().to_representation(post)
@@ -57,7 +70,7 @@ class PostSerializer(BaseSerializer):
                     data["bed"] = BedSerializer(post.room.bed).data
 
         if "image" in self.fields and image:
-            data["image"] = post.image.url
+            data["image"] = images.image_url(post, size=self.image_size)
 
         return data
 
@@ -68,9 +81,6 @@ class PostSerializer(BaseSerializer):
 
         return post
 
-    def get_total_likes(self, post):
-        return post.likes.filter(is_active=True).count()
-
 
 class AuthenticatedPostSerializer(PostSerializer):
     liked = serializers.SerializerMethodField()
@@ -80,6 +90,11 @@ class AuthenticatedPostSerializer(PostSerializer):
         fields = PostSerializer.Meta.fields + ["liked"]
 
     def get_liked(self, post):
+        # PostViewSet truyền sẵn tập id bài đăng người dùng đã thích của cả trang qua context
+        liked_post_ids = self.context.get("liked_post_ids")
+        if liked_post_ids is not None:
+            return post.id in liked_post_ids
+
         request = self.context.get("request")
 
         try:
@@ -91,9 +106,12 @@ class AuthenticatedPostSerializer(PostSerializer):
 
 
 class BedSerializer(BaseSerializer):
+    renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = Bed
-        fields = ["id", "name", "price", "image", "description", "status", "created_date", "updated_date", "room"]
+        fields = ["id", "name", "price", "image", "renditions", "description", "status", "created_date", "updated_date",
+                  "room"]
         extra_kwargs = {"room": {"write_only": True}}
 
     def to_representation(self, bed):
@@ -101,7 +119,7 @@ class BedSerializer(BaseSerializer):
         image = data.get("image")
 
         if "image" in self.fields and image:
-            data["image"] = bed.image.url
+            data["image"] = images.image_url(bed, size=self.image_size)
 
         return data
 
@@ -117,15 +135,84 @@ class BedSerializer(BaseSerializer):
     def validate(self, data):
         room = data.get('room')
         if room:
-            existing_beds_count = room.beds.count()
             number_of_beds = room.number_of_bed
 
-            if existing_beds_count >= number_of_beds:
+            if room.total_beds >= number_of_beds:
                 raise serializers.ValidationError({"message": f"{room.name} đã đủ {number_of_beds} giường."})
 
         return data
 
 
+class BulkBedRoomSerializer(serializers.Serializer):
+    room_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, required=False)
+
+
+class BulkBedSerializer(serializers.Serializer):
+    rooms = BulkBedRoomSerializer(many=True, allow_empty=False)
+
+    def validate_rooms(self, rooms):
+        room_ids = [room["room_id"] for room in rooms]
+        if len(room_ids) != len(set(room_ids)):
+            raise serializers.ValidationError({"message": "Mỗi phòng chỉ được khai báo một lần."})
+
+        return rooms
+
+
+class UtilityChargeSerializer(BaseSerializer):
+    class Meta:
+        model = UtilityCharge
+        fields = ["id", "amount", "status", "created_date", "updated_date", "bill", "rental_contact"]
+
+    def to_representation(self, utility_charge):
+        data = super().to_representation(utility_charge)
+        bill = data.get("bill")
+
+        if "bill" in self.fields and bill:
+            data["bill"] = ElectricityAndWaterBillsSerializer(utility_charge.bill, excludes=["manager"]).data
+
+        return data
+
+
+class BulkRentalContactSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False,
+                                max_length=1000)
+    room_id = serializers.IntegerField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if "ids" not in data and "room_id" not in data and "created_before" not in data:
+            raise serializers.ValidationError({"message": "Vui lòng chọn danh sách hồ sơ hoặc điều kiện lọc."})
+
+        return data
+
+    def get_filters(self):
+        filters = {}
+        if "room_id" in self.validated_data:
+            filters["room_id"] = self.validated_data["room_id"]
+        if "created_before" in self.validated_data:
+            filters["created_date__lt"] = self.validated_data["created_before"]
+
+        return filters
+
+
+class MonthlyStatisticSerializer(serializers.ModelSerializer):
+    month = serializers.DateField(format="%d-%m-%Y")
+
+    class Meta:
+        model = MonthlyStatistic
+        fields = ["month", "successful_rentals", "cancelled_rentals", "rental_revenue", "utility_revenue", "is_closed"]
+
+
+class ProvisionBuildingSerializer(serializers.Serializer):
+    building = serializers.CharField(max_length=50)
+    floors = serializers.IntegerField(min_value=1, max_value=50)
+    rooms_per_floor = serializers.IntegerField(min_value=1, max_value=99)
+    type = serializers.ChoiceField(choices=Room.Type.choices, default=Room.Type.NORMAL)
+    room_for = serializers.ChoiceField(choices=Room.RoomFor.choices, default=Room.RoomFor.MALE)
+    create_posts = serializers.BooleanField(default=True)
+
+
 class RentalContactSerializer(BaseSerializer):
     class Meta:
         model = RentalContact
@@ -0,0 +1,89 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from base.caches import invalidate_on_commit
+from interacts.models import Like
+from rental import stats
+from rental.billing import sync_charge_status
+from rental.models import Bed, BillRentalContact, ElectricityAndWaterBills, Post, RentalContact, Room
+from rental.tasks import schedule_renditions
+
+
+@receiver(post_save, sender=Bed)
+def update_room_counters_on_bed_save(sender, instance, created, **kwargs):
+	loaded_room_id = instance._loaded_room_id or instance.room_id
+	loaded_status = instance._loaded_status or instance.status
+
+	if created:
+		Room.shift_bed_counters(room_id=instance.room_id, status=instance.status, delta=1)
+	elif loaded_room_id != instance.room_id:
+		Room.shift_bed_counters(room_id=loaded_room_id, status=loaded_status, delta=-1)
+		Room.shift_bed_counters(room_id=instance.room_id, status=instance.status, delta=1)
+	else:
+		Room.move_bed_counters(room_id=instance.room_id, old_status=loaded_status, new_status=instance.status)
+
+	instance.remember_loaded_state()
+
+
+@receiver(post_delete, sender=Bed)
+def update_room_counters_on_bed_delete(sender, instance, **kwargs):
+	Room.shift_bed_counters(room_id=instance._loaded_room_id or instance.room_id,
+							status=instance._loaded_status or instance.status, delta=-1)
+
+
+@receiver(post_delete, sender=Like)
+def update_like_count_on_like_delete(sender, instance, **kwargs):
+	if instance.is_active:
+		Post.shift_like_count(post_id=instance.post_id, delta=-1)
+
+
+@receiver(post_save, sender=ElectricityAndWaterBills)
+def sync_utility_charge_status(sender, instance, created, **kwargs):
+	if not created:
+		sync_charge_status(bill_ids=[instance.pk])
+
+
+@receiver(post_save, sender=RentalContact)
+@receiver(post_save, sender=BillRentalContact)
+@receiver(post_save, sender=ElectricityAndWaterBills)
+def reopen_statistic_month(sender, instance, created, **kwargs):
+	if not created:
+		stats.reopen_months(sender.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Post)
+def refresh_post_search_vector(sender, instance, **kwargs):
+	Post.refresh_search_vector(queryset=Post.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Room)
+def refresh_room_posts_search_vector(sender, instance, created, **kwargs):
+	if not created:
+		Post.refresh_search_vector(queryset=Post.objects.filter(room_id=instance.pk))
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Bed)
+def schedule_image_renditions(sender, instance, **kwargs):
+	schedule_renditions(instance)
+
+
+@receiver([post_save, post_delete], sender=Room)
+def invalidate_room_responses(sender, **kwargs):
+	invalidate_on_commit("rooms")
+
+
+@receiver([post_save, post_delete], sender=Bed)
+def invalidate_bed_responses(sender, **kwargs):
+	invalidate_on_commit("beds")
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_responses(sender, **kwargs):
+	invalidate_on_commit("posts")
+
+
+@receiver([post_save, post_delete], sender=Like)
+def invalidate_like_responses(sender, **kwargs):
+	invalidate_on_commit("likes")
@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import Trunc, TruncMonth
+from django.utils import timezone
+
+from rental.models import BillRentalContact, ElectricityAndWaterBills, MonthlyStatistic, RentalContact, Room
+
+STATISTIC_FIELDS = ["successful_rentals", "cancelled_rentals", "rental_revenue", "utility_revenue"]
+GRANULARITIES = ["day", "week", "month", "year"]
+
+
+def current_month():
+	return timezone.localdate().replace(day=1)
+
+
+def _aggregate_months(since=None):
+	# Mỗi nguồn dữ liệu được gom theo tháng bằng một truy vấn; since=None nghĩa là toàn bộ lịch sử
+	def by_month(queryset, **aggregates):
+		if since is not None:
+			queryset = queryset.filter(created_date__date__gte=since)
+
+		return queryset.annotate(month=TruncMonth("created_date", output_field=DateField())).values("month").annotate(**aggregates).order_by()
+
+	months = {}
+
+	def add(rows):
+		for row in rows:
+			values = months.setdefault(row.pop("month"), dict.fromkeys(STATISTIC_FIELDS, 0))
+			values.update({field: value or 0 for field, value in row.items()})
+
+	add(by_month(RentalContact.objects.all(),
+				 successful_rentals=Count("id", filter=Q(status=RentalContact.Status.SUCCESS)),
+				 cancelled_rentals=Count("id", filter=Q(status=RentalContact.Status.CANCEL))))
+	# Gom cả hóa đơn chưa thanh toán để tháng có hóa đơn luôn có dòng thống kê, reopen_months mở lại được khi thanh toán sau
+	add(by_month(BillRentalContact.objects.all(),
+				 rental_revenue=Sum("total", filter=Q(status=BillRentalContact.Status.PAID))))
+	add(by_month(ElectricityAndWaterBills.objects.all(),
+				 utility_revenue=Sum("total_amount", filter=Q(status=ElectricityAndWaterBills.Status.PAID))))
+
+	return months
+
+
+def reopen_months(queryset):
+	# Số liệu được gom theo tháng tạo nhưng trạng thái (duyệt, hủy, thanh toán) có thể đổi sau khi tháng đã đóng:
+	# mở lại các tháng chứa các dòng của queryset để lần làm mới sau tính lại chúng
+	months = queryset.annotate(month=TruncMonth("created_date", output_field=DateField())).values("month")
+
+	return MonthlyStatistic.objects.filter(is_closed=True, month__in=months).update(is_closed=False)
+
+
+def refresh_monthly_statistics(full=False):
+	# Chỉ tính lại các tháng chưa đóng (tháng hiện tại, tháng vừa kết thúc kể từ lần làm mới trước và các tháng
+	# được mở lại bởi reopen_months), các tháng đã đóng được giữ nguyên. full=True hoặc bảng còn trống thì tính lại toàn bộ
+	month = current_month()
+
+	with transaction.atomic():
+		open_months = list(MonthlyStatistic.objects.select_for_update().filter(is_closed=False).values_list("month", flat=True))
+		if full or not MonthlyStatistic.objects.exists():
+			since = None
+		else:
+			since = min(open_months + [month])
+
+		months = _aggregate_months(since)
+		months.setdefault(month, dict.fromkeys(STATISTIC_FIELDS, 0))
+		for open_month in open_months:
+			months.setdefault(open_month, dict.fromkeys(STATISTIC_FIELDS, 0))
+
+		MonthlyStatistic.objects.bulk_create([
+			MonthlyStatistic(month=key, is_closed=key < month, **values) for key, values in months.items()
+		], update_conflicts=True, unique_fields=["month"], update_fields=STATISTIC_FIELDS + ["is_closed", "updated_date"])
+
+	return len(months)
+
+
+def ensure_fresh():
+	# Chưa có số liệu tháng hiện tại thì tính ngay, số liệu đã cũ hơn STATISTICS_MAX_AGE thì giao cho task nền tính lại
+	# và trả về số liệu hiện có. Chi phí chỉ phụ thuộc dữ liệu của tháng đang mở
+	from rental.tasks import refresh_monthly_statistics as refresh_task  # rental.tasks import module này
+
+	statistic = MonthlyStatistic.objects.filter(month=current_month()).only("updated_date").first()
+	if statistic is None:
+		refresh_monthly_statistics()
+	elif statistic.updated_date < timezone.now() - timedelta(seconds=settings.STATISTICS_MAX_AGE):
+		refresh_task.delay()
+
+
+def _by_period(queryset, granularity, start_date=None, end_date=None):
+	if start_date:
+		queryset = queryset.filter(created_date__date__gte=start_date)
+	if end_date:
+		queryset = queryset.filter(created_date__date__lte=end_date)
+
+	period = Trunc("created_date", granularity, output_field=DateField())
+	return queryset.annotate(period=period).values("period").order_by("period")
+
+
+def occupancy():
+	# Một truy vấn gom các bộ đếm giường của phòng theo loại phòng và giới tính
+	rows = Room.objects.filter(is_active=True).values("type", "room_for").annotate(
+		rooms=Count("id"),
+		total_beds=Sum("total_beds"),
+		occupied_beds=Sum("occupied_beds"),
+		vacant_beds=Sum("vacant_beds"),
+	).order_by("type", "room_for")
+
+	return [{**row, "occupancy_rate": round(row["occupied_beds"] / row["total_beds"], 4) if row["total_beds"] else 0}
+			for row in rows]
+
+
+def bill_totals(granularity, start_date=None, end_date=None):
+	# Mỗi loại hóa đơn dùng một truy vấn Sum/Count có filter cho cả hai trạng thái đã và chưa thanh toán
+	def totals(model, amount_field):
+		return list(_by_period(model.objects.filter(is_active=True), granularity, start_date, end_date).annotate(
+			paid_count=Count("id", filter=Q(status=model.Status.PAID)),
+			paid_total=Sum(amount_field, filter=Q(status=model.Status.PAID), default=0),
+			unpaid_count=Count("id", filter=Q(status=model.Status.UNPAID)),
+			unpaid_total=Sum(amount_field, filter=Q(status=model.Status.UNPAID), default=0),
+		))
+
+	return {
+		"rental": totals(BillRentalContact, "total"),
+		"utility": totals(ElectricityAndWaterBills, "total_amount"),
+	}
+
+
+def contract_statuses(granularity, start_date=None, end_date=None):
+	return list(_by_period(RentalContact.objects.filter(is_active=True), granularity, start_date, end_date).annotate(
+		total=Count("id"),
+		**{value.lower(): Count("id", filter=Q(status=value)) for value in RentalContact.Status.values},
+	))
@@ -0,0 +1,56 @@
+from collections import Counter
+
+from django.apps import apps
+
+from base import images
+from base.caches import invalidate
+from files.models import Blob
+from rental import stats
+from tasks.registry import task
+
+# Response đã cache có chứa URL ảnh của các model này
+RENDITION_CACHE_NAMESPACES = {
+	"rental.room": ("rooms",),
+	"rental.bed": ("beds",),
+	"rental.post": ("posts",),
+}
+
+
+@task(name="rental.refresh_monthly_statistics", max_retries=2, unique_for=60)
+def refresh_monthly_statistics(full=False):
+	stats.refresh_monthly_statistics(full=full)
+
+
+def schedule_renditions(instance, field_name="image"):
+	# Gọi sau khi lưu: ảnh mới thì giao cho task nền tạo bản thu nhỏ, ảnh bị xóa thì xóa luôn các bản thu nhỏ
+	field_file = getattr(instance, field_name)
+	if field_file and not images.has_current_renditions(instance, field_name):
+		generate_image_renditions.delay(instance._meta.label, instance.pk, field_name)
+	elif not field_file and instance.renditions:
+		images.delete_renditions(field_file.storage, instance.renditions)
+		type(instance).objects.filter(pk=instance.pk).update(renditions={})
+		Blob.shift_references(images.rendition_names(instance.renditions), -1)
+		instance.renditions = {}
+
+
+@task(name="rental.generate_image_renditions")
+def generate_image_renditions(model_label, pk, field_name="image"):
+	# Dùng chung cho ảnh của Room/Post/Bed và avatar của User
+	model = apps.get_model(model_label)
+	instance = model.objects.filter(pk=pk).first()
+	if instance is None or not getattr(instance, field_name) or images.has_current_renditions(instance, field_name):
+		return
+
+	field_file = getattr(instance, field_name)
+	renditions = images.generate_renditions(field_file)
+
+	# Chỉ ghi nếu ảnh chưa bị thay tiếp trong lúc đang xử lý, bản cũ (hoặc bản vừa tạo nếu đã lỗi thời) được xóa
+	updated = model.objects.filter(pk=pk, **{field_name: field_file.name}).update(renditions=renditions)
+	images.delete_renditions(field_file.storage, instance.renditions if updated else renditions)
+	# update() không phát signal nên tự cập nhật số tham chiếu của các bản thu nhỏ
+	if updated:
+		Blob.apply_reference_changes(Counter(images.rendition_names(instance.renditions)),
+									 Counter(images.rendition_names(renditions)))
+
+	if updated and model._meta.label_lower in RENDITION_CACHE_NAMESPACES:
+		invalidate(*RENDITION_CACHE_NAMESPACES[model._meta.label_lower])
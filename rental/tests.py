@@ -1 +1,574 @@
-# Create your tests here.
+import datetime
+import itertools
+import threading
+import time
+import zipfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from base.mixins import QueryBudgetExceeded
+from rental import admission, billing, booking, documents, stats
+from rental.models import Bed, BillRentalContact, ElectricityAndWaterBills, MeterReading, MonthlyStatistic, Post, RentalContact, Room, \
+	UtilityCharge
+from rental.views import BedViewSet, PostViewSet, RoomViewSet
+from users.models import Manager, Specialist, Student, User
+
+_identifications = itertools.count(100000000000)
+
+
+def create_user(email, role=User.Role.STUDENT, gender=User.Gender.MALE):
+	return User.objects.create_user(email=email, password="Abc@12345", full_name=email.split("@")[0],
+									dob=datetime.date(2003, 1, 1), address="TP.HCM", phone="0900000000",
+									identification=str(next(_identifications)), role=role, gender=gender)
+
+
+def create_student(email, gender=User.Gender.MALE):
+	user = create_user(email, gender=gender)
+	return Student.objects.create(user=user, student_id=user.identification[-10:], university="OU",
+								  faculty="IT", major="CS", academic_year=2021)
+
+
+def create_room(name, beds=2, with_post=False):
+	room = Room.objects.create(name=name, number_of_bed=beds)
+	for index in range(beds):
+		Bed.objects.create(name=f"{name}-{index + 1}", room=room, description="")
+	if with_post:
+		Post.objects.create(name=f"Phòng {name}", description="", room=room)
+
+	return room
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+	# Số câu SQL của các trang danh sách không được tăng theo số phòng/giường trên trang;
+	# bật QUERY_BUDGET_STRICT để request vượt query_budget bị lỗi thay vì chỉ ghi log
+	@classmethod
+	def setUpTestData(cls):
+		for index in range(5):
+			create_room(f"A{index}", beds=3, with_post=True)
+		cls.student = create_student("budget@ou.edu.vn")
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+
+	def test_stated_budgets(self):
+		self.assertEqual(RoomViewSet.query_budget["list"], 3)
+		self.assertEqual(PostViewSet.query_budget["list"], 3)
+		self.assertEqual(BedViewSet.query_budget["list"], 2)
+
+	def test_room_list(self):
+		with self.assertNumQueries(3):
+			response = self.client.get("/api/v1/rooms/")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(len(response.data["results"]), 5)
+		self.assertEqual(len(response.data["results"][0]["beds"]), 3)
+
+	def test_post_list(self):
+		# Khách: COUNT + bài đăng kèm phòng; người dùng đã đăng nhập thêm một câu lấy các bài đã thích
+		with self.assertNumQueries(2):
+			response = self.client.get("/api/v1/posts/")
+		self.assertEqual(len(response.data["results"]), 5)
+
+		self.client.force_authenticate(self.student.user)
+		with self.assertNumQueries(3):
+			response = self.client.get("/api/v1/posts/")
+		self.assertEqual(len(response.data["results"]), 5)
+
+	def test_bed_list(self):
+		with self.assertNumQueries(2):
+			response = self.client.get("/api/v1/beds/")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response.data["count"], 15)
+
+	def test_budgets_do_not_grow_with_page_size(self):
+		for index in range(5, 10):
+			create_room(f"A{index}", beds=3)
+
+		with self.assertNumQueries(3):
+			response = self.client.get("/api/v1/rooms/")
+		self.assertEqual(len(response.data["results"]), 10)
+
+	def test_strict_mode_fails_request_over_budget(self):
+		with mock.patch.object(RoomViewSet, "query_budget", {"list": 1}):
+			with self.assertRaises(QueryBudgetExceeded):
+				self.client.get("/api/v1/rooms/")
+
+
+class CursorPaginationTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		# Bài đăng cũ khớp ở tên (trọng số A), bài mới chỉ khớp ở mô tả: thứ tự liên quan ngược với thứ tự id
+		for index in range(6):
+			Post.objects.create(name=f"Ký túc xá {index}", description="", room=create_room(f"N{index}", beds=0))
+		for index in range(6):
+			Post.objects.create(name=f"Bài {index}", description="<p>gần ký túc xá</p>",
+								room=create_room(f"D{index}", beds=0))
+		Post.refresh_search_vector()
+
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+
+	def collect(self, url, **params):
+		names = []
+		while url:
+			response = self.client.get(url, params)
+			params = None
+			self.assertEqual(response.status_code, 200)
+			names += [post["name"] for post in response.data["results"]]
+			url = response.data["next"]
+
+		return names
+
+	def test_cursor_keeps_search_rank_order(self):
+		ranked = self.collect("/api/v1/posts/", q="ký túc xá")
+		self.assertTrue(all(name.startswith("Ký túc xá") for name in ranked[:6]))
+
+		self.assertEqual(self.collect("/api/v1/posts/", q="ký túc xá", pagination="cursor"), ranked)
+
+	def test_cursor_defaults_to_id_order(self):
+		names = self.collect("/api/v1/rooms/", pagination="cursor")
+		self.assertEqual(names, list(Room.objects.filter(is_active=True).order_by("-id").values_list("name", flat=True)))
+
+
+def run_concurrently(functions):
+	# Chạy các hàm cùng lúc trên các thread (mỗi thread một kết nối DB), trả về kết quả hoặc exception của từng hàm
+	barrier = threading.Barrier(len(functions))
+	results = [None] * len(functions)
+
+	def worker(index, function):
+		try:
+			barrier.wait()
+			results[index] = function()
+		except Exception as exc:
+			results[index] = exc
+		finally:
+			connection.close()
+
+	threads = [threading.Thread(target=worker, args=item) for item in enumerate(functions)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	return results
+
+
+class BookingConcurrencyTests(TransactionTestCase):
+	# Nhiều request đặt giường chạy song song thật sự trên các kết nối DB khác nhau
+	workers = 8
+
+	def setUp(self):
+		cache.clear()
+		self.room = create_room("R1", beds=self.workers)
+		self.beds = list(self.room.beds.order_by("id"))
+
+	def assert_one_winner(self, results):
+		contacts = [result for result in results if isinstance(result, RentalContact)]
+		errors = [result for result in results if not isinstance(result, RentalContact)]
+
+		self.assertEqual(len(contacts), 1)
+		self.assertTrue(all(isinstance(error, booking.BookingConflict) for error in errors), errors)
+
+		return errors
+
+	def test_many_students_one_bed(self):
+		students = [create_student(f"bed{index}@ou.edu.vn") for index in range(self.workers)]
+		bed = self.beds[0]
+
+		results = run_concurrently([lambda student=student: booking.book_bed(student, bed.id) for student in students])
+
+		errors = self.assert_one_winner(results)
+		self.assertEqual(RentalContact.objects.filter(bed=bed, status__in=RentalContact.ACTIVE_STATUSES).count(), 1)
+		# Người thua không bao giờ nhận thông báo "đã có hồ sơ" của sinh viên
+		student_message = booking.CONSTRAINT_MESSAGES["rental_contact_one_active_per_student"]
+		self.assertFalse([error for error in errors if error.detail["message"] == student_message])
+
+	def test_one_student_many_beds(self):
+		student = create_student("many@ou.edu.vn")
+
+		results = run_concurrently([lambda bed=bed: booking.book_bed(student, bed.id) for bed in self.beds])
+
+		errors = self.assert_one_winner(results)
+		self.assertEqual(RentalContact.objects.filter(student=student).count(), 1)
+		student_message = booking.CONSTRAINT_MESSAGES["rental_contact_one_active_per_student"]
+		self.assertTrue(all(error.detail["message"] == student_message for error in errors))
+
+
+class BookingConstraintTests(TestCase):
+	# Bỏ qua các bước kiểm tra trước khi ghi để chạm vào ràng buộc unique như khi hai request cùng vượt qua chúng
+	@classmethod
+	def setUpTestData(cls):
+		cls.room = create_room("R2", beds=2)
+		cls.bed, cls.other_bed = cls.room.beds.order_by("id")
+		cls.student = create_student("first@ou.edu.vn")
+		RentalContact.objects.create(bed=cls.bed, room=cls.room, student=cls.student, time_rental=12)
+
+	def book_without_checks(self, student, bed):
+		with mock.patch.object(RentalContact.objects, "filter", return_value=RentalContact.objects.none()):
+			return booking.book_bed(student, bed.id)
+
+	def test_bed_constraint_message(self):
+		other = create_student("second@ou.edu.vn")
+
+		with self.assertRaises(booking.BookingConflict) as context:
+			self.book_without_checks(other, self.bed)
+		self.assertEqual(context.exception.detail["message"],
+						 booking.CONSTRAINT_MESSAGES["rental_contact_one_active_per_bed"])
+
+	def test_student_constraint_message(self):
+		with self.assertRaises(booking.BookingConflict) as context:
+			self.book_without_checks(self.student, self.other_bed)
+		self.assertEqual(context.exception.detail["message"],
+						 booking.CONSTRAINT_MESSAGES["rental_contact_one_active_per_student"])
+
+
+@override_settings(RENTAL_ADMISSION_QUEUE=True, REDIS_URL=None, DEBUG=True)
+class AdmissionQueueTests(TransactionTestCase):
+	def setUp(self):
+		cache.clear()
+		admission._admission_queue = None
+		self.addCleanup(setattr, admission, "_admission_queue", None)
+		self.room = create_room("Q1", beds=1)
+		self.bed = self.room.beds.get()
+		self.student = create_student("queue@ou.edu.vn")
+
+	def start_workers(self, admission_queue):
+		stop_event = threading.Event()
+		admission_queue.workers_started = True
+		threads = admission.start_workers(admission_queue, 1, stop_event)
+
+		def stop():
+			stop_event.set()
+			for thread in threads:
+				thread.join()
+
+		self.addCleanup(stop)
+
+	def wait_for(self, admission_queue, ticket, timeout=10):
+		deadline = time.monotonic() + timeout
+		while time.monotonic() < deadline:
+			job = admission_queue.get(ticket)
+			if job["status"] != admission.QUEUED:
+				return job
+			time.sleep(0.05)
+
+		self.fail(f"Vé {ticket} chưa được xử lý")
+
+	def test_unexpected_error_fails_ticket_and_worker_continues(self):
+		admission_queue = admission.get_admission_queue()
+		self.start_workers(admission_queue)
+
+		# Sinh viên không tồn tại: Student.DoesNotExist không phải APIException
+		broken = {"ticket": "broken", "student_id": 0, "bed_id": self.bed.id, "time_rental": 12}
+		admission_queue.enqueue(broken)
+		ticket = admission.enqueue_rent(self.student, str(self.bed.id), 12)
+
+		with self.assertLogs("rental.admission", "ERROR"):
+			job = self.wait_for(admission_queue, "broken")
+		self.assertEqual(job["status"], admission.FAILED)
+		self.assertIn("DoesNotExist", job["reason"])
+		self.assertEqual(self.wait_for(admission_queue, ticket)["status"], admission.SUCCESS)
+
+	def test_worker_survives_queue_errors(self):
+		admission_queue = admission.LocalAdmissionQueue()
+		stop_event = threading.Event()
+		errors = [ConnectionError("redis")]
+
+		def pop(timeout=5):
+			if errors:
+				raise errors.pop()
+			stop_event.set()
+
+		with mock.patch.object(admission_queue, "pop", side_effect=pop), \
+				mock.patch.object(admission.time, "sleep") as sleep, self.assertLogs("rental.admission", "ERROR"):
+			admission.run_worker(admission_queue, stop_event)
+
+		sleep.assert_called_once()
+
+	def test_non_numeric_bed_returns_404(self):
+		client = APIClient()
+		client.force_authenticate(self.student.user)
+
+		response = client.post("/api/v1/beds/abc/rent/")
+		self.assertEqual(response.status_code, 404)
+
+	def test_local_queue_is_dev_only(self):
+		with override_settings(DEBUG=False):
+			with self.assertRaises(ImproperlyConfigured):
+				admission.get_admission_queue()
+
+
+class MeterBillingTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		cls.room = create_room("M1", beds=0)
+		cls.period = datetime.date(2026, 1, 1)
+		cls.next_period = datetime.date(2026, 2, 1)
+
+	def record(self, period, **values):
+		return billing.record_meter_readings([{"room_id": self.room.id, **values}], period=period)
+
+	def test_first_period_needs_opening_index(self):
+		self.record(self.period, electricity_index=100, water_index=10)
+
+		report = billing.generate_bills_from_readings(self.period)
+		self.assertEqual(report["created"], 0)
+		self.assertEqual(report["errors"][0]["room_id"], self.room.id)
+
+	def test_first_period_billed_from_opening_index(self):
+		self.record(self.period, electricity_index=100, water_index=10, opening_electricity_index=40,
+					opening_water_index=4)
+
+		self.assertEqual(billing.generate_bills_from_readings(self.period)["created"], 1)
+		bill = MeterReading.objects.get(room=self.room, period=self.period).bill
+		self.assertEqual((bill.total_electricity, bill.total_cubic_meters_water), (60, 6))
+
+		# Các kỳ sau dùng chỉ số kỳ trước, chỉ số đầu kỳ bị bỏ qua
+		self.record(self.next_period, electricity_index=130, water_index=13, opening_electricity_index=0,
+					opening_water_index=0)
+		billing.generate_bills_from_readings(self.next_period)
+		bill = MeterReading.objects.get(room=self.room, period=self.next_period).bill
+		self.assertEqual((bill.total_electricity, bill.total_cubic_meters_water), (30, 3))
+
+	def test_billed_reading_is_not_overwritten(self):
+		self.record(self.period, electricity_index=100, water_index=10, opening_electricity_index=0,
+					opening_water_index=0)
+		billing.generate_bills_from_readings(self.period)
+
+		report = self.record(self.period, electricity_index=500, water_index=50)
+		self.assertEqual(report["recorded"], 0)
+		self.assertEqual(len(report["errors"]), 1)
+		self.assertEqual(MeterReading.objects.get(room=self.room, period=self.period).electricity_index, 100)
+
+
+class MeterBillingViewTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		cls.room = create_room("M3", beds=0)
+		cls.manager = Manager.objects.create(user=create_user("manager@ou.edu.vn", role=User.Role.MANAGER),
+											 certificate="QL")
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.manager.user)
+
+	def test_list_body_needs_period_in_query(self):
+		readings = [{"room_id": self.room.id, "electricity_index": 100, "water_index": 10}]
+
+		response = self.client.post("/api/v1/electricity-and-water-bills/readings/", readings, format="json")
+		self.assertEqual(response.status_code, 400)
+		self.assertEqual(response.data["message"], "Kỳ chỉ số phải có dạng YYYY-MM.")
+
+		response = self.client.post("/api/v1/electricity-and-water-bills/readings/?period=2026-01", readings,
+									format="json")
+		self.assertEqual(response.status_code, 201)
+		self.assertEqual(response.data["recorded"], 1)
+
+	def test_generate_without_bills_is_bad_request(self):
+		billing.record_meter_readings([{"room_id": self.room.id, "electricity_index": 100, "water_index": 10}],
+									  period=datetime.date(2026, 1, 1))
+
+		response = self.client.post("/api/v1/electricity-and-water-bills/generate/", {"period": "2026-01"},
+									format="json")
+		self.assertEqual(response.status_code, 400)
+		self.assertEqual(response.data["created"], 0)
+		self.assertEqual(len(response.data["errors"]), 1)
+
+
+class MeterBillingConcurrencyTests(TransactionTestCase):
+	def test_record_waits_for_concurrent_billing(self):
+		room = create_room("M2", beds=0)
+		period = datetime.date(2026, 1, 1)
+		billing.record_meter_readings([{"room_id": room.id, "electricity_index": 100, "water_index": 10,
+										 "opening_electricity_index": 0, "opening_water_index": 0}], period=period)
+		reports = []
+
+		def record():
+			try:
+				reports.append(billing.record_meter_readings(
+					[{"room_id": room.id, "electricity_index": 500, "water_index": 50}], period=period))
+			finally:
+				connection.close()
+
+		# Lập hóa đơn đang giữ khóa chỉ số của kỳ; lần ghi song song phải chờ rồi thấy chỉ số đã được lập hóa đơn
+		with transaction.atomic():
+			MeterReading.objects.select_for_update().get(room=room, period=period)
+			thread = threading.Thread(target=record)
+			thread.start()
+			time.sleep(0.5)
+			billing.generate_bills_from_readings(period)
+		thread.join()
+
+		self.assertEqual(reports[0]["recorded"], 0)
+		reading = MeterReading.objects.get(room=room, period=period)
+		self.assertIsNotNone(reading.bill_id)
+		self.assertEqual(reading.electricity_index, 100)
+
+
+class UtilityChargeTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		cls.room = create_room("U1", beds=2)
+		for index, bed in enumerate(cls.room.beds.order_by("id")):
+			RentalContact.objects.create(bed=bed, room=cls.room, student=create_student(f"charge{index}@ou.edu.vn"),
+										 time_rental=12, status=RentalContact.Status.SUCCESS)
+		cls.empty_room = create_room("U2", beds=1)
+
+	def create_bill(self, room):
+		billing.create_utility_bills([{"room_id": room.id, "electricity": 10, "water": 1}])
+		return ElectricityAndWaterBills.objects.get(room=room)
+
+	def test_charge_status_follows_bill(self):
+		bill = self.create_bill(self.room)
+		self.assertEqual(list(bill.charges.values_list("status", flat=True)), [bill.Status.UNPAID] * 2)
+
+		bill.status = bill.Status.PAID
+		bill.save()
+		self.assertFalse(bill.charges.exclude(status=bill.Status.PAID).exists())
+
+		ElectricityAndWaterBills.objects.filter(pk=bill.pk).update(status=bill.Status.UNPAID)
+		self.assertEqual(billing.sync_charge_status([bill.pk]), 2)
+		self.assertFalse(bill.charges.exclude(status=bill.Status.UNPAID).exists())
+
+	def test_empty_room_bill_is_not_rescanned(self):
+		bill = self.create_bill(self.empty_room)
+		bill.refresh_from_db()
+
+		self.assertTrue(bill.is_split)
+		self.assertFalse(UtilityCharge.objects.filter(bill=bill).exists())
+		self.assertFalse(ElectricityAndWaterBills.objects.filter(is_split=False).exists())
+		self.assertEqual(billing.split_utility_bills(), 0)
+
+
+class RentalBillTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		cls.room = create_room("B1", beds=2)
+		cls.specialist = Specialist.objects.create(user=create_user("specialist@ou.edu.vn", role=User.Role.SPECIALIST),
+												   degree="CN")
+		cls.contracts = [
+			RentalContact.objects.create(bed=bed, room=cls.room, student=create_student(f"bill{index}@ou.edu.vn"),
+										 time_rental=12, status=RentalContact.Status.SUCCESS)
+			for index, bed in enumerate(cls.room.beds.order_by("id"))
+		]
+
+	def test_contract_billed_concurrently_is_counted_once(self):
+		bulk_create = BillRentalContact.objects.bulk_create
+		contract = self.contracts[0]
+
+		def bill_first_then_insert(*args, **kwargs):
+			# Một lần chạy khác lập hóa đơn cho hợp đồng đầu tiên trong lúc lần này đang ghi
+			BillRentalContact.objects.create(rental_contact=contract, student=contract.student,
+											 specialist=self.specialist, total=0)
+			return bulk_create(*args, **kwargs)
+
+		with mock.patch.object(BillRentalContact.objects, "bulk_create", side_effect=bill_first_then_insert):
+			report = billing.generate_rental_bills(self.specialist)
+
+		self.assertEqual(report, {"created": 1, "skipped": 1, "total": 2})
+
+
+class MonthlyStatisticTests(TestCase):
+	# Hồ sơ và hóa đơn được tạo ở tháng trước nhưng chỉ được duyệt/thanh toán sau khi tháng đó đã đóng
+	@classmethod
+	def setUpTestData(cls):
+		cls.room = create_room("S1", beds=2)
+		cls.bed, cls.other_bed = cls.room.beds.order_by("id")
+		cls.last_month = (stats.current_month() - datetime.timedelta(days=1)).replace(day=1)
+
+	def move_to_last_month(self, instance):
+		instance.created_date = timezone.now() - datetime.timedelta(days=timezone.localdate().day + 1)
+		type(instance).objects.filter(pk=instance.pk).update(created_date=instance.created_date)
+
+	def last_month_statistic(self):
+		stats.refresh_monthly_statistics()
+		statistic = MonthlyStatistic.objects.get(month=self.last_month)
+		self.assertTrue(statistic.is_closed)
+
+		return statistic
+
+	def test_contract_confirmed_after_month_closed(self):
+		rental_contact = RentalContact.objects.create(bed=self.bed, room=self.room, time_rental=12,
+													  student=create_student("late@ou.edu.vn"))
+		self.move_to_last_month(rental_contact)
+		self.assertEqual(self.last_month_statistic().successful_rentals, 0)
+
+		booking.confirm_rental_contact(rental_contact.id)
+		self.assertFalse(MonthlyStatistic.objects.get(month=self.last_month).is_closed)
+		self.assertEqual(self.last_month_statistic().successful_rentals, 1)
+
+	def test_bulk_transition_reopens_month(self):
+		rental_contact = RentalContact.objects.create(bed=self.other_bed, room=self.room, time_rental=12,
+													  student=create_student("bulk@ou.edu.vn"))
+		self.move_to_last_month(rental_contact)
+		self.last_month_statistic()
+
+		booking.bulk_transition_rental_contacts(RentalContact.Status.SUCCESS, rental_contact_ids=[rental_contact.id])
+		self.assertEqual(self.last_month_statistic().successful_rentals, 1)
+
+	def test_bill_paid_after_month_closed(self):
+		bill = ElectricityAndWaterBills.objects.create(room=self.room, total_electricity=10, total_cubic_meters_water=1,
+													   total_amount=50000)
+		self.move_to_last_month(bill)
+		self.assertEqual(self.last_month_statistic().utility_revenue, 0)
+
+		bill.status = ElectricityAndWaterBills.Status.PAID
+		bill.save()
+		self.assertEqual(self.last_month_statistic().utility_revenue, 50000)
+
+
+@override_settings(PDF_RENDER_WORKERS=1, PDF_RENDER_QUEUE_SIZE=2)
+class DocumentRenderTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		documents.shutdown_executor()
+		self.addCleanup(documents.shutdown_executor)
+
+	def document(self, index):
+		return f"tai-lieu-{index}.pdf", documents._document("TÀI LIỆU", f"Số: {index}", [("Mục", index)])
+
+	def test_archive_uses_render_slots(self):
+		executor, slots = documents.get_executor()
+		acquired = []
+		original_submit = documents.submit
+
+		def submit(*args):
+			# Số chỗ còn trống trước mỗi lần gửi tài liệu sang process render
+			acquired.append(slots._value)
+			return original_submit(*args)
+
+		with mock.patch.object(documents, "submit", side_effect=submit):
+			archive_file = documents.render_archive(self.document(index) for index in range(5))
+
+		self.assertEqual(len(acquired), 5)
+		with zipfile.ZipFile(archive_file) as archive:
+			self.assertEqual(len(archive.namelist()), 5)
+			self.assertTrue(archive.read("tai-lieu-0.pdf").startswith(b"%PDF"))
+		self.assertEqual(slots._value, 2)
+
+	def test_archive_busy_when_slots_taken(self):
+		_, slots = documents.get_executor()
+		for _ in range(2):
+			slots.acquire()
+		self.addCleanup(lambda: [slots.release() for _ in range(2)])
+
+		with override_settings(PDF_RENDER_TIMEOUT=0), self.assertRaises(documents.RendererBusy):
+			documents.render_archive([self.document(0)])
+
+	def test_executor_is_created_per_process(self):
+		executor, _ = documents.get_executor()
+		self.assertIs(documents.get_executor()[0], executor)
+
+		# Giống process con được fork sau khi pool đã được tạo ở process cha
+		with mock.patch.object(documents, "_pid", -1):
+			forked_executor, _ = documents.get_executor()
+		self.assertIsNot(forked_executor, executor)
+		executor.shutdown()
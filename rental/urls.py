@@ -12,5 +12,6 @@ router.register(prefix="bill-rental-contacts", viewset=views.BillRentalContactVi
 router.register(prefix="violate-notices", viewset=views.ViolateNoticeViewSet, basename="violate-notices")
 router.register(prefix="electricity-and-water-bills", viewset=views.ElectricityAndWaterBillsViewSet, basename="electricity-and-water-bills")
 router.register(prefix="statistics", viewset=views.StatisticsViewSet, basename="statistics")
+router.register(prefix="search", viewset=views.SearchViewSet, basename="search")
 
 urlpatterns = [path("", include(router.urls))]
@@ -1,24 +1,35 @@
-from django.db.models import Count
-from django.db.models.functions import TruncMonth
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import transaction
+from django.db.models import F, FloatField, Prefetch, Q, TextField
+from django.db.models.functions import Cast, Greatest
 from rest_framework import viewsets, generics, parsers, status, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
 from base import perms, paginators
+from base.mixins import DirectUploadMixin, ExportMixin, QueryBudgetMixin, ResponseCacheMixin, UserFlagsMixin
 from interacts import serializers as interacts_serializers
-from rental import serializers as rental_serializers
-from rental.models import Room, Bed, Post, RentalContact, ViolateNotice, ElectricityAndWaterBills, BillRentalContact
-from users.models import User
-from utils.constants import PRICE_OF_ELECTRICITY, PRICE_OF_WATER
-from utils.factory import to_float, update_status
-
-
-class RoomViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
+from interacts.models import Like
+from rental import admission, billing, booking, documents, provisioning, stats, serializers as rental_serializers
+from rental.models import Room, Bed, Post, RentalContact, ViolateNotice, ElectricityAndWaterBills, BillRentalContact, \
+    MonthlyStatistic
+from users import serializers as users_serializers
+from users.models import User, Student
+from utils.constants import PRICE_OF_ELECTRICITY, PRICE_OF_WATER, SEARCH_CONFIG
+from utils.factory import filter_created_date, get_date_range, to_float, update_status
+
+
+class RoomViewSet(DirectUploadMixin, QueryBudgetMixin, ResponseCacheMixin, viewsets.ViewSet,
+                  generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
     queryset = Room.objects.filter(is_active=True).order_by("-id")
     serializer_class = rental_serializers.RoomSerializer
     pagination_class = paginators.RoomPaginators
-    parser_classes = [parsers.MultiPartParser, ]
+    parser_classes = [parsers.MultiPartParser, parsers.JSONParser, ]
+    query_budget = {"list": 3, "retrieve": 2}
+    cache_namespaces = ("rooms", "beds")
 
     def get_queryset(self):
         queryset = self.queryset
@@ -27,6 +38,13 @@ class RoomViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.Retriev
             name = self.request.query_params.get("name")
             queryset = queryset.filter(name__icontains=name) if name else queryset
 
+        if self.action in ["list", "retrieve"]:
+            beds = Bed.objects.filter(is_active=True).order_by("id")
+            if self.action.__eq__("list"):
+                beds = beds.only(*rental_serializers.RoomSerializer.bed_summary_fields, "room_id")
+
+            queryset = queryset.prefetch_related(Prefetch("beds", queryset=beds, to_attr="active_beds"))
+
         return queryset
 
     def get_permissions(self):
@@ -35,6 +53,11 @@ class RoomViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.Retriev
 
         return [perms.IsSpecialist()]
 
+    def get_serializer(self, *args, **kwargs):
+        kwargs['context'] = self.get_serializer_context()
+        kwargs['context']['action'] = self.action
+        return super().get_serializer(*args, **kwargs)
+
     def partial_update(self, request, pk=None):
         serializer = self.serializer_class(instance=self.get_object(), data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
@@ -42,12 +65,31 @@ class RoomViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.Retriev
 
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
+    @action(methods=["post"], detail=False, url_path="provision", parser_classes=[parsers.JSONParser])
+    def provision(self, request):
+        serializer = rental_serializers.ProvisionBuildingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+        report = provisioning.provision_building(building=data["building"], floors=data["floors"],
+                                                 rooms_per_floor=data["rooms_per_floor"], room_type=data["type"],
+                                                 room_for=data["room_for"], create_posts=data["create_posts"])
 
-class PostViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
+        return Response(data=report, status=status.HTTP_201_CREATED)
+
+
+class PostViewSet(DirectUploadMixin, QueryBudgetMixin, ResponseCacheMixin, UserFlagsMixin, viewsets.ViewSet,
+                  generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
     queryset = Post.objects.select_related("room").filter(is_active=True).order_by("-id")
     serializer_class = rental_serializers.PostSerializer
     pagination_class = paginators.PostPaginators
-    parser_classes = [parsers.MultiPartParser, ]
+    parser_classes = [parsers.MultiPartParser, parsers.JSONParser, ]
+    query_budget = {"list": 3, "retrieve": 3}
+    user_flags = {"liked_post_ids": "get_liked_post_ids"}
+    # Response của người dùng đã đăng nhập có trường "liked" riêng nên chỉ cache cho khách
+    cache_namespaces = ("posts", "rooms", "beds", "likes")
+    cache_query_params = ResponseCacheMixin.cache_query_params + ("q",)
+    cache_anonymous_only = True
 
     def get_queryset(self):
         queryset = self.queryset
@@ -59,12 +101,19 @@ class PostViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.Retriev
             room_type = self.request.query_params.get("type")
             queryset = queryset.filter(room__type=room_type.upper()) if room_type else queryset
 
+            q = self.request.query_params.get("q")
+            if q:
+                query = SearchQuery(q, config=SEARCH_CONFIG, search_type="websearch")
+                # Ép kiểu về double precision để giá trị rank trong cursor so sánh lại chính xác
+                queryset = queryset.filter(search_vector=query).annotate(
+                    rank=Cast(SearchRank(F("search_vector"), query), FloatField())).order_by("-rank", "-id")
+
         queryset = queryset.prefetch_related("comments") if self.action.__eq__("comments") else queryset
 
         return queryset
 
     def get_permissions(self):
-        if self.action in ["create", "partial_update", "destroy"]:
+        if self.action in ["create", "partial_update", "destroy", "upload_url", "upload_confirm"]:
             return [perms.IsSpecialist()]
 
         if self.action in ["comments"] and self.request.method.__eq__("POST"):
@@ -83,6 +132,9 @@ class PostViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.Retriev
 
         return self.serializer_class
 
+    def get_liked_post_ids(self, user, post_ids):
+        return Like.objects.filter(user=user, post_id__in=post_ids, is_active=True).values_list("post_id", flat=True)
+
     @action(methods=["get", "post"], detail=True, url_path="comments")
     def comments(self, request, pk=None):
         if request.method.__eq__("POST"):
@@ -104,12 +156,20 @@ class PostViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.Retriev
 
     @action(methods=["post"], detail=True, url_path="like")
     def like_activity(self, request, pk=None):
-        like, created = self.get_object().likes.get_or_create(user=request.user)
-        if not created:
-            like.is_active = not like.is_active
-            like.save()
+        post = self.get_object()
+
+        with transaction.atomic():
+            like, created = Like.objects.select_for_update().get_or_create(user=request.user, post=post)
+            if not created:
+                like.is_active = not like.is_active
+                like.save()
+
+            Post.shift_like_count(post_id=post.id, delta=1 if like.is_active else -1)
 
-        serializer = self.get_serializer_class()(self.get_object(), context={"request": request})
+        post.refresh_from_db(fields=["like_count"])
+
+        context = {"request": request, "liked_post_ids": {post.id} if like.is_active else set()}
+        serializer = self.get_serializer_class()(post, context=context)
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
     def partial_update(self, request, pk=None):
@@ -120,11 +180,14 @@ class PostViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.Retriev
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
-class BedViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
+class BedViewSet(DirectUploadMixin, QueryBudgetMixin, ResponseCacheMixin, viewsets.ViewSet,
+                 generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
     queryset = Bed.objects.filter(is_active=True).order_by("-id")
     serializer_class = rental_serializers.BedSerializer
     pagination_class = paginators.BedPaginators
-    parser_classes = [parsers.MultiPartParser, ]
+    parser_classes = [parsers.MultiPartParser, parsers.JSONParser, ]
+    query_budget = {"list": 2, "retrieve": 1}
+    cache_namespaces = ("beds",)
 
     def get_queryset(self):
         queryset = self.queryset
@@ -136,35 +199,60 @@ class BedViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.Retrieve
         return queryset
 
     def get_permissions(self):
-        if self.action in ["create", "partial_update", "destroy"]:
+        if self.action in ["create", "partial_update", "destroy", "bulk_create", "upload_url", "upload_confirm"]:
             return [perms.IsSpecialist()]
 
-        if self.action in ["rent_bed"]:
+        if self.action in ["rent_bed", "rent_ticket"]:
             return [perms.IsStudent()]
 
         return [permissions.AllowAny()]
 
+    def get_serializer(self, *args, **kwargs):
+        kwargs['context'] = self.get_serializer_context()
+        kwargs['context']['action'] = self.action
+        return super().get_serializer(*args, **kwargs)
+
+    @action(methods=["post"], detail=False, url_path="bulk", parser_classes=[parsers.JSONParser])
+    def bulk_create(self, request):
+        serializer = rental_serializers.BulkBedSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        room_quantities = {room["room_id"]: room.get("quantity") for room in serializer.validated_data["rooms"]}
+        created = provisioning.create_beds(room_quantities)
+
+        return Response(data={
+            "created": sum(created.values()),
+            "rooms": [{"room_id": room_id, "created": quantity} for room_id, quantity in created.items()],
+        }, status=status.HTTP_201_CREATED)
+
     @action(methods=["post"], detail=True, url_path="rent")
     def rent_bed(self, request, pk=None):
         time_rental = 12
-        student = request.user.student
-        bed = self.get_object()
-
-        if request.user.gender == User.Gender.UNKNOWN:
-            return Response(data={"message": "Vui lòng cập nhật giới tính!"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if request.user.gender != bed.room.room_for:
-            return Response(data={"message": "Giường không phù hợp với giới tính của bạn!"},
-                            status=status.HTTP_400_BAD_REQUEST)
+        if settings.RENTAL_ADMISSION_QUEUE:
+            try:
+                ticket = admission.enqueue_rent(student=request.user.student, bed_id=pk, time_rental=time_rental)
+            except admission.QueueFull:
+                return Response(data={"message": "Hệ thống đang quá tải, vui lòng thử lại sau."},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "5"})
 
-        room_id = bed.room.id
+            return Response(data={"ticket": ticket, "status": admission.QUEUED}, status=status.HTTP_202_ACCEPTED)
 
-        rental_contact = RentalContact.objects.create(bed=bed, room_id=room_id, student=student,
-                                                      time_rental=time_rental)
+        rental_contact = booking.book_bed(student=request.user.student, bed_id=pk, time_rental=time_rental)
 
         serializer = rental_serializers.RentalContactSerializer(rental_contact)
         return Response(data=serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(methods=["get"], detail=False, url_path="rent/tickets/(?P<ticket>[^/.]+)")
+    def rent_ticket(self, request, ticket=None):
+        job = admission.get_admission_queue().get(ticket)
+
+        if job is None or job["student_id"] != request.user.student.id:
+            return Response(data={"message": "Không tìm thấy mã vé."}, status=status.HTTP_404_NOT_FOUND)
+
+        data = {key: value for key, value in job.items() if key != "student_id"}
+        return Response(data=data, status=status.HTTP_200_OK)
+
     def partial_update(self, request, pk=None):
         serializer = self.serializer_class(instance=self.get_object(), data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
@@ -173,15 +261,21 @@ class BedViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.Retrieve
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
-class RentalContactViewSet(viewsets.ViewSet, generics.ListAPIView, generics.RetrieveAPIView):
+class RentalContactViewSet(ExportMixin, viewsets.ViewSet, generics.ListAPIView, generics.RetrieveAPIView):
     queryset = RentalContact.objects.select_related("student", "bed__room").filter(is_active=True).order_by("-id")
     serializer_class = rental_serializers.RentalContactSerializer
     pagination_class = paginators.RentalContactPaginators
+    export_filename = "rental-contacts"
+    export_columns = [
+        ("id", "ID"), ("rental_number", "Mã hồ sơ"), ("status", "Trạng thái"), ("time_rental", "Thời gian thuê"),
+        ("student__student_id", "MSSV"), ("student__user__full_name", "Họ tên"), ("room__name", "Phòng"),
+        ("bed__name", "Giường"), ("bed__price", "Giá giường"), ("created_date", "Ngày tạo"),
+    ]
 
     def get_queryset(self):
         queryset = self.queryset
 
-        if self.action.__eq__("list"):
+        if self.action in ["list", "export"]:
             rental_number = self.request.query_params.get("rental_number")
             if rental_number:
                 queryset = queryset.filter(rental_number__icontains=rental_number)
@@ -190,12 +284,21 @@ class RentalContactViewSet(viewsets.ViewSet, generics.ListAPIView, generics.Retr
             if rental_status:
                 queryset = queryset.filter(status=rental_status.upper())
 
+            student_id = self.request.query_params.get("student_id")
+            queryset = queryset.filter(student_id=student_id) if student_id else queryset
+
+            room_id = self.request.query_params.get("room_id")
+            queryset = queryset.filter(room_id=room_id) if room_id else queryset
+
         return queryset
 
     def get_permissions(self):
         if self.action in ["cancel"]:
             return [perms.IsStudent()]
 
+        if self.action in ["pdf"]:
+            return [permissions.IsAuthenticated()]
+
         return [perms.IsSpecialist()]
 
     @action(methods=["post"], detail=True, url_path="cancel")
@@ -206,19 +309,7 @@ class RentalContactViewSet(viewsets.ViewSet, generics.ListAPIView, generics.Retr
 
     @action(methods=["post"], detail=True, url_path="confirm")
     def confirm(self, request, pk=None):
-        rental_contact = self.get_object()
-        specialist = request.user.specialist
-
-        if rental_contact.status != RentalContact.Status.PROCESSING:
-            return Response(data={"message": "Hồ sơ không trong trạng thái xử lý."}, status=status.HTTP_400_BAD_REQUEST)
-
-        rental_contact.status = RentalContact.Status.SUCCESS
-        rental_contact.save()
-
-        bed = rental_contact.bed
-        room = bed.room
-        bed.status = Bed.Status.NONVACUITY
-        bed.save()
+        booking.confirm_rental_contact(rental_contact_id=self.get_object().id)
 
         # Chỉ trả về thông báo thành công
         return Response(data={"message": "Duyệt hồ sơ thành công."}, status=status.HTTP_200_OK)
@@ -232,17 +323,56 @@ class RentalContactViewSet(viewsets.ViewSet, generics.ListAPIView, generics.Retr
         # Chỉ trả về thông báo
         return Response({"message": "Đã từ chối hồ sơ."}, status=status.HTTP_200_OK)
 
-class BillRentalContactViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
+    def bulk_transition(self, request, new_status):
+        serializer = rental_serializers.BulkRentalContactSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        ids = serializer.validated_data.get("ids")
+        report = booking.bulk_transition_rental_contacts(
+            new_status=new_status,
+            rental_contact_ids=list(dict.fromkeys(ids)) if ids else None,
+            filters=serializer.get_filters(),
+        )
+
+        return Response(data=report, status=status.HTTP_200_OK)
+
+    @action(methods=["post"], detail=False, url_path="bulk/confirm", parser_classes=[parsers.JSONParser])
+    def bulk_confirm(self, request):
+        return self.bulk_transition(request, new_status=RentalContact.Status.SUCCESS)
+
+    @action(methods=["post"], detail=False, url_path="bulk/reject", parser_classes=[parsers.JSONParser])
+    def bulk_reject(self, request):
+        return self.bulk_transition(request, new_status=RentalContact.Status.FAIL)
+
+    @action(methods=["get"], detail=True, url_path="pdf")
+    def pdf(self, request, pk=None):
+        rental_contact = get_object_or_404(self.queryset.select_related("student__user", "room"), pk=pk)
+
+        if request.user.role == User.Role.STUDENT and rental_contact.student.user_id != request.user.id:
+            return Response(data={"message": "Bạn không có quyền xem hợp đồng này."}, status=status.HTTP_403_FORBIDDEN)
+
+        if rental_contact.status != RentalContact.Status.SUCCESS:
+            return Response(data={"message": "Hồ sơ chưa được duyệt."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return documents.pdf_response(*documents.rental_contact_document(rental_contact))
+
+class BillRentalContactViewSet(ExportMixin, viewsets.ViewSet, generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
     queryset = BillRentalContact.objects.select_related("student", "specialist", "rental_contact").filter(
         is_active=True).order_by("-id")
     serializer_class = rental_serializers.BillRentalContactSerializer
     pagination_class = paginators.BillRentalContactPaginators
-    permission_classes = [perms.IsSpecialist]
+    export_filename = "bill-rental-contacts"
+    export_columns = [
+        ("id", "ID"), ("bill_number", "Mã hóa đơn"), ("total", "Tổng tiền"), ("status", "Trạng thái"),
+        ("student__student_id", "MSSV"), ("student__user__full_name", "Họ tên"),
+        ("rental_contact__rental_number", "Mã hồ sơ"), ("specialist__user__full_name", "Chuyên viên"),
+        ("created_date", "Ngày tạo"),
+    ]
 
     def get_queryset(self):
         queryset = self.queryset
 
-        if self.action.__eq__("list"):
+        if self.action in ["list", "export", "pdf_archive"]:
             bill_number = self.request.query_params.get("bill_number")
             queryset = queryset.filter(bill_number=bill_number) if bill_number else queryset
 
@@ -260,10 +390,17 @@ class BillRentalContactViewSet(viewsets.ViewSet, generics.ListCreateAPIView, gen
 
         return queryset
 
+    def get_permissions(self):
+        if self.action in ["pdf"]:
+            return [permissions.IsAuthenticated()]
+
+        return [perms.IsSpecialist()]
+
     def create(self, request, *args, **kwargs):
         rental_number = request.data.get("rental_number")
 
-        rental_contact = get_object_or_404(queryset=RentalContact, rental_number=rental_number)
+        rental_contact = get_object_or_404(RentalContact.objects.select_related("student", "bed"),
+                                           rental_number=rental_number)
 
         if rental_contact.status != RentalContact.Status.SUCCESS:
             return Response(data={"message": "Hồ sơ chưa được xác nhận."}, status=status.HTTP_400_BAD_REQUEST)
@@ -291,6 +428,30 @@ class BillRentalContactViewSet(viewsets.ViewSet, generics.ListCreateAPIView, gen
 
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
+    @action(methods=["post"], detail=False, url_path="generate")
+    def generate(self, request):
+        report = billing.generate_rental_bills(specialist=request.user.specialist)
+
+        return Response(data=report, status=status.HTTP_201_CREATED if report["created"] else status.HTTP_200_OK)
+
+    @action(methods=["get"], detail=True, url_path="pdf")
+    def pdf(self, request, pk=None):
+        bill = get_object_or_404(self.queryset.select_related(
+            "student__user", "specialist__user", "rental_contact__room", "rental_contact__bed"), pk=pk)
+
+        if request.user.role == User.Role.STUDENT and bill.student.user_id != request.user.id:
+            return Response(data={"message": "Bạn không có quyền xem hóa đơn này."}, status=status.HTTP_403_FORBIDDEN)
+
+        return documents.pdf_response(*documents.bill_rental_document(bill))
+
+    @action(methods=["get"], detail=False, url_path="pdf-archive")
+    def pdf_archive(self, request):
+        bills = filter_created_date(self.get_queryset(), request).select_related(
+            "student__user", "specialist__user", "rental_contact__room", "rental_contact__bed")
+
+        return documents.archive_response("hoa-don-tien-giuong",
+                                          (documents.bill_rental_document(bill) for bill in bills.iterator(chunk_size=500)))
+
 
 class ViolateNoticeViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
     queryset = ViolateNotice.objects.select_related("room", "manager").filter(is_active=True).order_by("-id")
@@ -333,15 +494,21 @@ class ViolateNoticeViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generic
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
-class ElectricityAndWaterBillsViewSet(viewsets.ViewSet, generics.ListCreateAPIView, generics.RetrieveAPIView):
+class ElectricityAndWaterBillsViewSet(ExportMixin, viewsets.ViewSet, generics.ListCreateAPIView, generics.RetrieveAPIView):
     queryset = ElectricityAndWaterBills.objects.select_related("room", "manager").filter(is_active=True).order_by("-id")
     serializer_class = rental_serializers.ElectricityAndWaterBillsSerializer
     pagination_class = paginators.ElectricityAndWaterBillsPaginators
+    export_filename = "electricity-and-water-bills"
+    export_columns = [
+        ("id", "ID"), ("room__name", "Phòng"), ("total_electricity", "Điện (kWh)"),
+        ("total_cubic_meters_water", "Nước (m3)"), ("total_amount", "Tổng tiền"), ("status", "Trạng thái"),
+        ("manager__user__full_name", "Quản lý"), ("created_date", "Ngày tạo"),
+    ]
 
     def get_queryset(self):
         queryset = self.queryset
 
-        if self.action.__eq__("list"):
+        if self.action in ["list", "export", "pdf_archive"]:
             room_id = self.request.query_params.get("room_id")
             queryset = queryset.filter(room_id=room_id) if room_id else queryset
 
@@ -351,9 +518,15 @@ class ElectricityAndWaterBillsViewSet(viewsets.ViewSet, generics.ListCreateAPIVi
         return queryset
 
     def get_permissions(self):
-        if self.action in ["create"]:
+        if self.action in ["create", "batch", "readings", "generate"]:
             return [perms.IsManager()]
 
+        if self.action in ["export", "pdf_archive"]:
+            return [(perms.IsManager | perms.IsSpecialist)()]
+
+        if self.action in ["pdf"]:
+            return [permissions.IsAuthenticated()]
+
         return [permissions.AllowAny()]
 
     def create(self, request, *args, **kwargs):
@@ -372,32 +545,199 @@ class ElectricityAndWaterBillsViewSet(viewsets.ViewSet, generics.ListCreateAPIVi
             total_amount=total_amount,
             manager=request.user.manager
         )
+        billing.split_utility_bills(bill_ids=[electricity_and_water_bills.id])
         serializer = self.serializer_class(electricity_and_water_bills)
 
         return Response(data=serializer.data, status=status.HTTP_201_CREATED)
 
+    def get_readings(self, request):
+        upload = request.FILES.get("file")
+        try:
+            if upload:
+                file_format = "csv" if upload.name.lower().endswith(".csv") else "json"
+                readings = billing.parse_readings(upload, file_format)
+            else:
+                readings = request.data if isinstance(request.data, list) else request.data.get("readings")
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({"message": "File chỉ số điện nước không hợp lệ."})
+
+        if not isinstance(readings, list):
+            raise ValidationError({"message": "Vui lòng gửi danh sách chỉ số điện nước."})
+
+        return readings
+
+    def get_period(self, request):
+        # Body dạng danh sách (chỉ gồm các chỉ số) thì kỳ chỉ có thể nằm trong ?period=
+        period = request.query_params.get("period")
+        if not period and isinstance(request.data, dict):
+            period = request.data.get("period")
+
+        try:
+            return billing.parse_period(period)
+        except ValueError:
+            raise ValidationError({"message": "Kỳ chỉ số phải có dạng YYYY-MM."})
+
+    @action(methods=["post"], detail=False, url_path="batch",
+            parser_classes=[parsers.JSONParser, parsers.MultiPartParser])
+    def batch(self, request):
+        report = billing.create_utility_bills(self.get_readings(request), manager=request.user.manager)
+
+        return Response(data=report, status=status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST)
+
+    @action(methods=["post"], detail=False, url_path="readings",
+            parser_classes=[parsers.JSONParser, parsers.MultiPartParser])
+    def readings(self, request):
+        period = self.get_period(request)
+        report = billing.record_meter_readings(self.get_readings(request), period=period, manager=request.user.manager)
+
+        return Response(data=report, status=status.HTTP_201_CREATED if report["recorded"] else status.HTTP_400_BAD_REQUEST)
+
+    @action(methods=["post"], detail=False, url_path="generate")
+    def generate(self, request):
+        report = billing.generate_bills_from_readings(self.get_period(request), manager=request.user.manager)
+
+        return Response(data=report, status=status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST)
+
+    @action(methods=["get"], detail=True, url_path="pdf")
+    def pdf(self, request, pk=None):
+        bill = get_object_or_404(self.queryset.select_related("manager__user"), pk=pk)
+
+        # Sinh viên chỉ xem được hóa đơn của phòng mình (có phần tiền điện nước được chia)
+        if request.user.role == User.Role.STUDENT and not bill.charges.filter(student__user=request.user).exists():
+            return Response(data={"message": "Bạn không có quyền xem hóa đơn này."}, status=status.HTTP_403_FORBIDDEN)
+
+        return documents.pdf_response(*documents.utility_bill_document(bill))
+
+    @action(methods=["get"], detail=False, url_path="pdf-archive")
+    def pdf_archive(self, request):
+        bills = filter_created_date(self.get_queryset(), request).select_related("manager__user")
+
+        return documents.archive_response("hoa-don-dien-nuoc",
+                                          (documents.utility_bill_document(bill) for bill in bills.iterator(chunk_size=500)))
+
 
 class StatisticsViewSet(viewsets.ViewSet):
     permission_classes = [perms.IsSpecialist]
 
-    @action(detail=False, methods=['get'], url_path='rentals')
-    def get_successful_rentals_by_month(self, request):
+    def get_statistics(self, request):
+        # Đọc từ bảng thống kê tổng hợp theo tháng, chỉ tháng hiện tại được tính lại khi đã cũ
+        stats.ensure_fresh()
+        statistics = MonthlyStatistic.objects.filter(is_active=True).order_by("month")
+
         year = request.query_params.get("year")
         month = request.query_params.get("month")
-        rentals = RentalContact.objects.filter(status=RentalContact.Status.SUCCESS)
-
         if year and month:
-            rentals = rentals.filter(created_date__year=year, created_date__month=month)
+            statistics = statistics.filter(month__year=year, month__month=month)
+        elif year:
+            statistics = statistics.filter(month__year=year)
 
-        rentals = rentals.annotate(month=TruncMonth("created_date")).values("month").annotate(
-            count=Count("id")).order_by("month")
+        return statistics
+
+    @action(detail=False, methods=['get'], url_path='rentals')
+    def get_successful_rentals_by_month(self, request):
+        rentals = self.get_statistics(request).filter(successful_rentals__gt=0)
 
         formatted_rentals = []
         for rental in rentals:
-            formatted_month = rental["month"].strftime("%d-%m-%Y")
+            formatted_month = rental.month.strftime("%d-%m-%Y")
             formatted_rentals.append({
                 "date": formatted_month,
-                "count": rental["count"]
+                "count": rental.successful_rentals
             })
 
         return Response(data=formatted_rentals, status=status.HTTP_200_OK)
+
+    def get_period_params(self, request):
+        granularity = request.query_params.get("granularity", "month")
+        if granularity not in stats.GRANULARITIES:
+            raise ValidationError({"message": f"granularity phải là một trong {', '.join(stats.GRANULARITIES)}."})
+
+        start_date, end_date = get_date_range(request)
+
+        return {"granularity": granularity, "start_date": start_date, "end_date": end_date}
+
+    def format_periods(self, rows):
+        return [{**row, "period": row["period"].strftime("%d-%m-%Y")} for row in rows]
+
+    @action(detail=False, methods=['get'], url_path='occupancy')
+    def get_occupancy(self, request):
+        return Response(data=stats.occupancy(), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='bills')
+    def get_bill_totals(self, request):
+        totals = stats.bill_totals(**self.get_period_params(request))
+
+        return Response(data={key: self.format_periods(rows) for key, rows in totals.items()}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='contracts')
+    def get_contract_statuses(self, request):
+        rows = stats.contract_statuses(**self.get_period_params(request))
+
+        return Response(data=self.format_periods(rows), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='monthly')
+    def get_monthly_statistics(self, request):
+        serializer = rental_serializers.MonthlyStatisticSerializer(self.get_statistics(request), many=True)
+
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
+
+
+class SearchViewSet(viewsets.ViewSet):
+    permission_classes = [perms.IsSpecialist | perms.IsManager]
+    search_types = {
+        "student": "search_students",
+        "rental_contact": "search_rental_contacts",
+        "bill_rental_contact": "search_bill_rental_contacts",
+    }
+
+    def list(self, request):
+        q = request.query_params.get("q", "").strip()
+        search_type = request.query_params.get("type", "student")
+
+        if len(q) < 2:
+            return Response(data={"message": "Vui lòng nhập ít nhất 2 ký tự."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if search_type not in self.search_types:
+            return Response(data={"message": "Loại tìm kiếm không hợp lệ."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset, serializer_class = getattr(self, self.search_types[search_type])(q)
+
+        paginator = paginators.SearchPaginators()
+        page = paginator.paginate_queryset(queryset=queryset, request=request)
+        serializer = serializer_class(page, many=True)
+        data = [{"type": search_type, **item} for item in serializer.data]
+
+        return paginator.get_paginated_response(data)
+
+    # Các điều kiện icontains dưới đây khớp với các index trigram trên UPPER(...) của từng cột;
+    # độ tương đồng được ép về double precision để cursor (?pagination=cursor) giữ đúng thứ tự liên quan
+    def search_students(self, q):
+        users = User.objects.filter(Q(full_name__icontains=q) | Q(email__icontains=q)).values("id")
+        queryset = Student.objects.select_related("user").filter(
+            Q(user_id__in=users) | Q(student_id__icontains=q), user__is_active=True
+        ).annotate(
+            similarity=Cast(Greatest(TrigramSimilarity("user__full_name", q), TrigramSimilarity("user__email", q),
+                                     TrigramSimilarity("student_id", q)), FloatField())
+        ).order_by("-similarity", "-id")
+
+        return queryset, users_serializers.StudentSearchSerializer
+
+    def search_rental_contacts(self, q):
+        queryset = RentalContact.objects.select_related("student", "bed", "room").filter(
+            rental_number__icontains=q, is_active=True
+        ).annotate(
+            similarity=Cast(TrigramSimilarity(Cast("rental_number", TextField()), q.lower()), FloatField())
+        ).order_by("-similarity", "-id")
+
+        return queryset, rental_serializers.RentalContactSerializer
+
+    def search_bill_rental_contacts(self, q):
+        queryset = BillRentalContact.objects.select_related(
+            "student", "specialist__user", "rental_contact__bed", "rental_contact__student", "rental_contact__room"
+        ).filter(
+            bill_number__icontains=q, is_active=True
+        ).annotate(
+            similarity=Cast(TrigramSimilarity(Cast("bill_number", TextField()), q.lower()), FloatField())
+        ).order_by("-similarity", "-id")
+
+        return queryset, rental_serializers.BillRentalContactSerializer
@@ -0,0 +1,17 @@
+from base.admin import BaseAdmin, my_admin_site
+from tasks.models import Task, TaskMetric
+
+
+class TaskAdmin(BaseAdmin):
+	list_display = ["id", "name", "status", "attempts", "run_at", "locked_until", "duration"]
+	list_filter = ["status", "name"]
+	search_fields = ["name", "last_error"]
+
+
+class TaskMetricAdmin(BaseAdmin):
+	list_display = ["name", "runs", "failures", "retries", "average_duration", "max_duration", "last_run"]
+	search_fields = ["name"]
+
+
+my_admin_site.register(Task, TaskAdmin)
+my_admin_site.register(TaskMetric, TaskMetricAdmin)
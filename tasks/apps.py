@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TasksConfig(AppConfig):
+	default_auto_field = 'django.db.models.BigAutoField'
+	name = 'tasks'
+
+	def ready(self):
+		# Nạp module tasks.py của các app để đăng ký task
+		autodiscover_modules("tasks")
@@ -0,0 +1,164 @@
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+# Worker chết giữa chừng (bị kill, mất điện) không trả lại task: task đang chạy có hạn thuê (visibility timeout),
+# quá hạn thì requeue_expired đưa lại vào hàng đợi và tính là một lần thử, hết số lần thử thì đánh dấu thất bại
+LEASE_EXPIRED_ERROR = "Worker không hoàn thành task trước khi hết hạn thuê."
+
+
+class RedisBackend:
+	# Task sẵn sàng nằm trong list, task chờ thử lại nằm trong sorted set với score là thời điểm được chạy.
+	# Task được worker nhận chuyển nguyên tử (BLMOVE) sang list đang xử lý kèm hạn thuê trong hash leases
+	queue_key = "tasks:queue"
+	scheduled_key = "tasks:scheduled"
+	processing_key = "tasks:processing"
+	leases_key = "tasks:leases"
+
+	def __init__(self, url):
+		import redis
+
+		self.client = redis.Redis.from_url(url)
+
+	def enqueue(self, job, run_at=None):
+		job.setdefault("id", uuid.uuid4().hex)
+		data = json.dumps(job)
+
+		if run_at and run_at > time.time():
+			self.client.zadd(self.scheduled_key, {data: run_at})
+		else:
+			self.client.lpush(self.queue_key, data)
+
+	def dequeue(self, timeout):
+		for data in self.client.zrangebyscore(self.scheduled_key, 0, time.time(), start=0, num=100):
+			# Chỉ worker xóa được phần tử khỏi sorted set mới đưa task về hàng đợi, tránh chạy trùng
+			if self.client.zrem(self.scheduled_key, data):
+				self.client.lpush(self.queue_key, data)
+
+		data = self.client.blmove(self.queue_key, self.processing_key, timeout, "RIGHT", "LEFT")
+		if data is None:
+			return None
+
+		job = json.loads(data)
+		self.client.hset(self.leases_key, job["id"], time.time() + settings.TASK_VISIBILITY_TIMEOUT)
+		# Giữ nguyên chuỗi đã nhận để xóa đúng phần tử khỏi list đang xử lý khi task kết thúc
+		job["_data"] = data
+
+		return job
+
+	def _acknowledge(self, job):
+		pipeline = self.client.pipeline()
+		pipeline.lrem(self.processing_key, 1, job.pop("_data"))
+		pipeline.hdel(self.leases_key, job["id"])
+		pipeline.execute()
+
+	def complete(self, job, duration):
+		self._acknowledge(job)
+
+	def retry(self, job, error, run_at):
+		self._acknowledge(job)
+		self.enqueue(job, run_at=run_at)
+
+	def fail(self, job, error, duration):
+		self._acknowledge(job)
+
+	def requeue_expired(self):
+		now = time.time()
+		requeued = 0
+
+		for data in self.client.lrange(self.processing_key, 0, -1):
+			job = json.loads(data)
+			deadline = self.client.hget(self.leases_key, job["id"])
+			if deadline is None:
+				# Worker vừa BLMOVE nhưng chưa kịp ghi hạn thuê (hoặc chết ngay sau đó): tính hạn từ lúc thấy task
+				self.client.hsetnx(self.leases_key, job["id"], now + settings.TASK_VISIBILITY_TIMEOUT)
+				continue
+
+			# Chỉ worker xóa được task khỏi list đang xử lý mới đưa nó lại hàng đợi
+			if float(deadline) >= now or not self.client.lrem(self.processing_key, 1, data):
+				continue
+
+			self.client.hdel(self.leases_key, job["id"])
+			job["attempts"] += 1
+			if job["attempts"] <= job["max_retries"]:
+				self.client.lpush(self.queue_key, json.dumps(job))
+				requeued += 1
+
+		return requeued
+
+
+class DatabaseBackend:
+	def enqueue(self, job, run_at=None):
+		from tasks.models import Task
+
+		task = Task.objects.create(name=job["name"], args=job["args"], kwargs=job["kwargs"], max_retries=job["max_retries"])
+		job["id"] = task.id
+
+	def dequeue(self, timeout):
+		from tasks.models import Task
+
+		with transaction.atomic():
+			task = Task.objects.select_for_update(skip_locked=True).filter(
+				status=Task.Status.PENDING, run_at__lte=timezone.now(), is_active=True
+			).order_by("run_at", "id").first()
+
+			if task is not None:
+				task.status = Task.Status.RUNNING
+				task.locked_until = timezone.now() + timedelta(seconds=settings.TASK_VISIBILITY_TIMEOUT)
+				task.save(update_fields=["status", "locked_until", "updated_date"])
+
+		if task is None:
+			time.sleep(timeout)
+			return None
+
+		return {"id": task.id, "name": task.name, "args": task.args, "kwargs": task.kwargs, "attempts": task.attempts,
+				"max_retries": task.max_retries}
+
+	def complete(self, job, duration):
+		from tasks.models import Task
+
+		Task.objects.filter(pk=job["id"]).update(status=Task.Status.SUCCESS, attempts=job["attempts"], duration=duration,
+												 locked_until=None, updated_date=timezone.now())
+
+	def retry(self, job, error, run_at):
+		from tasks.models import Task
+
+		Task.objects.filter(pk=job["id"]).update(status=Task.Status.PENDING, attempts=job["attempts"], last_error=error,
+												 run_at=datetime.fromtimestamp(run_at, tz=dt_timezone.utc),
+												 locked_until=None, updated_date=timezone.now())
+
+	def fail(self, job, error, duration):
+		from tasks.models import Task
+
+		Task.objects.filter(pk=job["id"]).update(status=Task.Status.FAILED, attempts=job["attempts"], last_error=error,
+												 duration=duration, locked_until=None, updated_date=timezone.now())
+
+	def requeue_expired(self):
+		from tasks.models import Task
+
+		now = timezone.now()
+		expired = Task.objects.filter(status=Task.Status.RUNNING, locked_until__lt=now)
+		changes = {"attempts": F("attempts") + 1, "last_error": LEASE_EXPIRED_ERROR, "locked_until": None,
+				   "updated_date": now}
+
+		with transaction.atomic():
+			expired.filter(attempts__gte=F("max_retries")).update(status=Task.Status.FAILED, **changes)
+			return expired.update(status=Task.Status.PENDING, run_at=now, **changes)
+
+
+_backend = None
+
+
+def get_backend():
+	global _backend
+
+	if _backend is None:
+		_backend = RedisBackend(settings.REDIS_URL) if settings.REDIS_URL else DatabaseBackend()
+
+	return _backend
@@ -0,0 +1,36 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from tasks.worker import run_worker
+
+
+class Command(BaseCommand):
+	help = "Chạy worker xử lý hàng đợi task nền"
+
+	def add_arguments(self, parser):
+		parser.add_argument("--concurrency", type=int, default=1, help="Số thread worker")
+		parser.add_argument("--burst", action="store_true", help="Dừng khi hàng đợi rỗng")
+
+	def handle(self, *args, **options):
+		stop_event = threading.Event()
+		results = []
+
+		def worker():
+			results.append(run_worker(burst=options["burst"], stop_event=stop_event))
+
+		threads = [threading.Thread(target=worker, daemon=True) for _ in range(options["concurrency"])]
+		for thread in threads:
+			thread.start()
+
+		self.stdout.write(f"Đang chạy {len(threads)} worker...")
+		try:
+			for thread in threads:
+				while thread.is_alive():
+					thread.join(timeout=1)
+		except KeyboardInterrupt:
+			stop_event.set()
+			for thread in threads:
+				thread.join()
+
+		self.stdout.write(self.style.SUCCESS(f"Đã xử lý {sum(results)} task."))
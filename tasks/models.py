@@ -0,0 +1,65 @@
+from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from base.models import BaseModel
+
+
+class Task(BaseModel):
+	# Hàng đợi task lưu trong DB, dùng khi không cấu hình Redis
+	class Meta:
+		indexes = [models.Index(fields=["status", "run_at"], name="tasks_task_status_run_at")]
+
+	class Status(models.TextChoices):
+		PENDING = "PENDING", "Đang chờ"
+		RUNNING = "RUNNING", "Đang chạy"
+		SUCCESS = "SUCCESS", "Thành công"
+		FAILED = "FAILED", "Thất bại"
+
+	name = models.CharField(max_length=255, null=False, blank=False)
+	args = models.JSONField(default=list, blank=True)
+	kwargs = models.JSONField(default=dict, blank=True)
+	status = models.CharField(max_length=20, null=False, blank=False, choices=Status.choices, default=Status.PENDING)
+	attempts = models.IntegerField(default=0)
+	max_retries = models.IntegerField(default=3)
+	run_at = models.DateTimeField(default=timezone.now)
+	# Hạn thuê của task đang chạy, quá hạn thì worker khác đưa task về hàng đợi (DatabaseBackend.requeue_expired)
+	locked_until = models.DateTimeField(null=True, blank=True)
+	duration = models.FloatField(null=True, blank=True)
+	last_error = models.TextField(null=True, blank=True)
+
+	def __str__(self):
+		return f"{self.name} ({self.status})"
+
+
+class TaskMetric(BaseModel):
+	# Thống kê thời gian chạy theo từng loại task, cộng dồn bằng F() nên nhiều worker ghi đồng thời vẫn đúng
+	name = models.CharField(max_length=255, null=False, blank=False, unique=True)
+	runs = models.IntegerField(default=0, editable=False)
+	failures = models.IntegerField(default=0, editable=False)
+	retries = models.IntegerField(default=0, editable=False)
+	total_duration = models.FloatField(default=0, editable=False)
+	max_duration = models.FloatField(default=0, editable=False)
+	last_run = models.DateTimeField(null=True, blank=True, editable=False)
+
+	counter_fields = ("runs", "failures", "retries", "total_duration", "max_duration")
+
+	def __str__(self):
+		return self.name
+
+	@property
+	def average_duration(self):
+		return self.total_duration / self.runs if self.runs else 0
+
+	@classmethod
+	def record(cls, name, duration, failed=False, retried=False):
+		cls.objects.get_or_create(name=name)
+		cls.objects.filter(name=name).update(
+			runs=F("runs") + 1,
+			failures=F("failures") + int(failed and not retried),
+			retries=F("retries") + int(retried),
+			total_duration=F("total_duration") + duration,
+			max_duration=Greatest(F("max_duration"), duration),
+			last_run=timezone.now(),
+		)
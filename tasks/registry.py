@@ -0,0 +1,61 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from tasks import backends
+
+registry = {}
+
+
+class TaskFunction:
+	def __init__(self, func, name, max_retries, retry_backoff, unique_for):
+		self.func = func
+		self.name = name
+		self.max_retries = max_retries
+		self.retry_backoff = retry_backoff
+		self.unique_for = unique_for
+
+	def __call__(self, *args, **kwargs):
+		return self.func(*args, **kwargs)
+
+	def unique_key(self, args, kwargs):
+		arguments = json.dumps([args, kwargs], sort_keys=True, default=str)
+		return f"tasks:unique:{self.name}:{hashlib.sha1(arguments.encode()).hexdigest()}"
+
+	def delay(self, *args, **kwargs):
+		# Đưa task vào hàng đợi sau khi transaction hiện tại commit để worker không đọc dữ liệu chưa ghi.
+		# unique_for: bỏ qua nếu task cùng tên và cùng tham số đã được đưa vào hàng đợi trong số giây này;
+		# khóa chỉ được lấy khi commit nên transaction bị rollback không chặn các lần gọi sau
+		args = list(args)
+
+		def enqueue():
+			if self.unique_for and not cache.add(self.unique_key(args, kwargs), 1, timeout=self.unique_for):
+				return
+
+			if settings.TASK_ALWAYS_EAGER:
+				self.func(*args, **kwargs)
+				return
+
+			job = {"name": self.name, "args": args, "kwargs": kwargs, "attempts": 0, "max_retries": self.max_retries}
+			backends.get_backend().enqueue(job)
+
+		transaction.on_commit(enqueue)
+
+
+def task(name=None, max_retries=None, retry_backoff=None, unique_for=None):
+	def decorator(func):
+		task_function = TaskFunction(
+			func=func,
+			name=name or f"{func.__module__}.{func.__name__}",
+			max_retries=settings.TASK_MAX_RETRIES if max_retries is None else max_retries,
+			retry_backoff=settings.TASK_RETRY_BACKOFF if retry_backoff is None else retry_backoff,
+			unique_for=unique_for,
+		)
+		registry[task_function.name] = task_function
+
+		return task_function
+
+	return decorator
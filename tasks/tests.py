@@ -0,0 +1,188 @@
+import datetime
+import json
+import time
+import unittest
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks import backends, worker
+from tasks.models import Task, TaskMetric
+from tasks.registry import task
+
+try:
+	import fakeredis
+except ImportError:
+	fakeredis = None
+
+calls = []
+
+
+@task(name="tasks.tests.record", max_retries=1, retry_backoff=0)
+def record(value):
+	calls.append(value)
+
+
+class WorkerTestCase(TestCase):
+	def setUp(self):
+		calls.clear()
+		# execute() đóng kết nối DB cũ sau mỗi task, điều đó làm hỏng transaction bao quanh mỗi test
+		patcher = mock.patch.object(worker, "close_old_connections")
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+
+@task(name="tasks.tests.unique", unique_for=60)
+def unique(full=False):
+	pass
+
+
+def make_job(max_retries=1):
+	return {"name": "tasks.tests.record", "args": ["x"], "kwargs": {}, "attempts": 0, "max_retries": max_retries}
+
+
+class DatabaseBackendTests(WorkerTestCase):
+	def setUp(self):
+		super().setUp()
+		self.backend = backends.DatabaseBackend()
+
+	def expire(self, job):
+		Task.objects.filter(pk=job["id"]).update(locked_until=timezone.now() - datetime.timedelta(seconds=1))
+
+	def test_dequeue_leases_task(self):
+		self.backend.enqueue(make_job())
+
+		job = self.backend.dequeue(timeout=0)
+		task_row = Task.objects.get(pk=job["id"])
+		self.assertEqual(task_row.status, Task.Status.RUNNING)
+		self.assertGreater(task_row.locked_until, timezone.now())
+
+		# Hạn thuê còn hiệu lực: không bị đưa lại hàng đợi
+		self.assertEqual(self.backend.requeue_expired(), 0)
+
+		worker.execute(self.backend, job)
+		task_row.refresh_from_db()
+		self.assertEqual(task_row.status, Task.Status.SUCCESS)
+		self.assertIsNone(task_row.locked_until)
+		self.assertEqual(calls, ["x"])
+
+	def test_expired_task_is_requeued_then_failed(self):
+		self.backend.enqueue(make_job(max_retries=1))
+
+		job = self.backend.dequeue(timeout=0)
+		self.expire(job)
+		self.assertEqual(self.backend.requeue_expired(), 1)
+		task_row = Task.objects.get(pk=job["id"])
+		self.assertEqual((task_row.status, task_row.attempts), (Task.Status.PENDING, 1))
+		self.assertEqual(task_row.last_error, backends.LEASE_EXPIRED_ERROR)
+
+		job = self.backend.dequeue(timeout=0)
+		self.expire(job)
+		self.assertEqual(self.backend.requeue_expired(), 0)
+		task_row.refresh_from_db()
+		self.assertEqual((task_row.status, task_row.attempts), (Task.Status.FAILED, 2))
+		self.assertIsNone(task_row.locked_until)
+
+	def test_worker_reaps_before_dequeue(self):
+		self.backend.enqueue(make_job())
+		job = self.backend.dequeue(timeout=0)
+		self.expire(job)
+
+		with mock.patch.object(worker, "get_backend", return_value=self.backend), self.assertLogs("tasks.worker", "WARNING"):
+			self.assertEqual(worker.run_worker(burst=True, poll_timeout=0), 1)
+
+		self.assertEqual(Task.objects.get(pk=job["id"]).status, Task.Status.SUCCESS)
+		self.assertEqual(TaskMetric.objects.get(name="tasks.tests.record").runs, 1)
+
+
+@unittest.skipUnless(fakeredis, "cần fakeredis")
+@override_settings(TASK_VISIBILITY_TIMEOUT=60)
+class RedisBackendTests(WorkerTestCase):
+	def setUp(self):
+		super().setUp()
+		with mock.patch("redis.Redis.from_url", return_value=fakeredis.FakeRedis()):
+			self.backend = backends.RedisBackend("redis://localhost")
+		self.client = self.backend.client
+
+	def expire(self, job):
+		self.client.hset(self.backend.leases_key, job["id"], time.time() - 1)
+
+	def test_dequeue_moves_job_to_processing(self):
+		self.backend.enqueue(make_job())
+
+		job = self.backend.dequeue(timeout=1)
+		self.assertEqual(self.client.llen(self.backend.queue_key), 0)
+		self.assertEqual(self.client.llen(self.backend.processing_key), 1)
+		self.assertIsNotNone(self.client.hget(self.backend.leases_key, job["id"]))
+
+		worker.execute(self.backend, job)
+		self.assertEqual(self.client.llen(self.backend.processing_key), 0)
+		self.assertEqual(self.client.hlen(self.backend.leases_key), 0)
+		self.assertEqual(calls, ["x"])
+
+	def test_retry_leaves_processing_list(self):
+		self.backend.enqueue({**make_job(), "name": "tasks.tests.missing"})
+
+		job = self.backend.dequeue(timeout=1)
+		self.backend.retry(job, "lỗi", run_at=time.time() + 60)
+		self.assertEqual(self.client.llen(self.backend.processing_key), 0)
+		self.assertEqual(self.client.zcard(self.backend.scheduled_key), 1)
+		self.assertNotIn("_data", json.loads(self.client.zrange(self.backend.scheduled_key, 0, -1)[0]))
+
+	def test_expired_job_is_requeued_then_dropped(self):
+		self.backend.enqueue(make_job(max_retries=1))
+
+		job = self.backend.dequeue(timeout=1)
+		self.assertEqual(self.backend.requeue_expired(), 0)
+		self.expire(job)
+		self.assertEqual(self.backend.requeue_expired(), 1)
+		self.assertEqual(self.client.llen(self.backend.processing_key), 0)
+
+		job = self.backend.dequeue(timeout=1)
+		self.assertEqual(job["attempts"], 1)
+		self.expire(job)
+		self.assertEqual(self.backend.requeue_expired(), 0)
+		self.assertEqual(self.client.llen(self.backend.queue_key), 0)
+		self.assertEqual(self.client.llen(self.backend.processing_key), 0)
+
+	def test_missing_lease_gets_grace_period(self):
+		# Worker chết ngay sau BLMOVE, trước khi ghi hạn thuê
+		self.client.lpush(self.backend.processing_key, json.dumps({**make_job(), "id": "lost"}))
+
+		self.assertEqual(self.backend.requeue_expired(), 0)
+		self.assertIsNotNone(self.client.hget(self.backend.leases_key, "lost"))
+		self.client.hset(self.backend.leases_key, "lost", time.time() - 1)
+		self.assertEqual(self.backend.requeue_expired(), 1)
+
+
+@override_settings(TASK_ALWAYS_EAGER=False)
+class UniqueTaskTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		backend = mock.Mock()
+		patcher = mock.patch.object(backends, "get_backend", return_value=backend)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		self.enqueue = backend.enqueue
+
+	def test_rolled_back_delay_does_not_block_later_calls(self):
+		with self.captureOnCommitCallbacks(execute=True):
+			with self.assertRaises(RuntimeError), transaction.atomic():
+				unique.delay()
+				raise RuntimeError()
+		self.enqueue.assert_not_called()
+
+		with self.captureOnCommitCallbacks(execute=True):
+			unique.delay()
+		self.enqueue.assert_called_once()
+
+	def test_uniqueness_includes_arguments(self):
+		with self.captureOnCommitCallbacks(execute=True):
+			unique.delay()
+			unique.delay(full=True)
+			unique.delay()
+
+		self.assertEqual([call.args[0]["kwargs"] for call in self.enqueue.call_args_list], [{}, {"full": True}])
@@ -0,0 +1,72 @@
+import logging
+import time
+
+from django.db import close_old_connections
+
+from tasks.backends import get_backend
+from tasks.models import TaskMetric
+from tasks.registry import registry
+
+logger = logging.getLogger(__name__)
+
+# Chu kỳ (giây) mỗi worker kiểm tra các task hết hạn thuê
+REAP_INTERVAL = 30
+
+
+def execute(backend, job):
+	# Chạy một task, lỗi thì thử lại sau retry_backoff * 2^(lần thử - 1) giây cho đến khi hết số lần thử lại.
+	# Thời gian chạy của mọi lần thử được cộng vào TaskMetric theo tên task
+	close_old_connections()
+
+	task_function = registry.get(job["name"])
+	job["attempts"] += 1
+	started = time.perf_counter()
+
+	try:
+		if task_function is None:
+			raise LookupError(f"Task {job['name']} chưa được đăng ký.")
+		task_function.func(*job["args"], **job["kwargs"])
+	except Exception as exc:
+		duration = time.perf_counter() - started
+		error = f"{type(exc).__name__}: {exc}"
+
+		if task_function is not None and job["attempts"] <= job["max_retries"]:
+			delay = task_function.retry_backoff * 2 ** (job["attempts"] - 1)
+			logger.warning("Task %s lỗi (lần %s), thử lại sau %ss: %s", job["name"], job["attempts"], delay, error)
+			backend.retry(job, error, run_at=time.time() + delay)
+			TaskMetric.record(job["name"], duration, failed=True, retried=True)
+		else:
+			logger.exception("Task %s thất bại sau %s lần thử", job["name"], job["attempts"])
+			backend.fail(job, error, duration)
+			TaskMetric.record(job["name"], duration, failed=True)
+	else:
+		duration = time.perf_counter() - started
+		backend.complete(job, duration)
+		TaskMetric.record(job["name"], duration)
+	finally:
+		close_old_connections()
+
+
+def run_worker(burst=False, poll_timeout=1, stop_event=None):
+	# burst=True: xử lý đến khi hàng đợi rỗng rồi dừng (dùng cho cron hoặc kiểm thử)
+	backend = get_backend()
+	processed = 0
+	reaped_at = None
+
+	while stop_event is None or not stop_event.is_set():
+		if reaped_at is None or time.monotonic() - reaped_at >= REAP_INTERVAL:
+			requeued = backend.requeue_expired()
+			if requeued:
+				logger.warning("Đưa lại %s task hết hạn thuê vào hàng đợi", requeued)
+			reaped_at = time.monotonic()
+
+		job = backend.dequeue(timeout=poll_timeout)
+		if job is None:
+			if burst:
+				break
+			continue
+
+		execute(backend, job)
+		processed += 1
+
+	return processed
@@ -1,11 +1,20 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
 from base.models import BaseModel
 
 
 class User(AbstractUser, BaseModel):
+	class Meta(AbstractUser.Meta):
+		# Index trigram trên UPPER(...) để các truy vấn icontains dùng được index
+		indexes = [
+			GinIndex(OpClass(Upper("full_name"), name="gin_trgm_ops"), name="users_user_full_name_trgm"),
+			GinIndex(OpClass(Upper("email"), name="gin_trgm_ops"), name="users_user_email_trgm"),
+		]
+
 	class Role(models.TextChoices):
 		ADMINISTRATOR = "AD", _("Administrator")
 		SPECIALIST = "SPC", _("Chuyên viên cộng tác sinh viên")
@@ -19,6 +28,7 @@ class User(AbstractUser, BaseModel):
 
 	email = models.EmailField(null=False, blank	=False, unique=True, db_index=True)
 	avatar = models.ImageField(upload_to='', null=True, blank=True)
+	renditions = models.JSONField(default=dict, blank=True, editable=False)
 	full_name = models.CharField(max_length=255, null=False, blank=False)
 	dob = models.DateField(null=False, blank=False)
 	gender = models.CharField(max_length=1, choices=Gender.choices, default=Gender.UNKNOWN)
@@ -84,6 +94,9 @@ class Specialist(BaseModel):
 
 
 class Student(BaseModel):
+	class Meta:
+		indexes = [GinIndex(OpClass(Upper("student_id"), name="gin_trgm_ops"), name="users_student_student_id_trgm")]
+
 	student_id = models.CharField(max_length=10, null=False, blank=False, db_index=True)
 	university = models.CharField(max_length=255, null=False, blank=False)
 	faculty = models.CharField(max_length=255, null=False, blank=False)
@@ -8,6 +8,10 @@ from utils import validations
 
 
 class UserSerializer(BaseSerializer):
+    renditions = serializers.SerializerMethodField()
+
+    image_field = "avatar"
+
     # Cho Manager
     certificate = serializers.CharField(max_length=255, write_only=True, required=False)
     # Cho Specialist
@@ -24,7 +28,7 @@ class UserSerializer(BaseSerializer):
     class Meta:
         model = User
         fields = [
-            "id", "role", "email", "password", "identification", "full_name", "avatar",
+            "id", "role", "email", "password", "identification", "full_name", "avatar", "renditions",
             "dob", "gender", "address", "phone", "date_joined", "last_login", "user_instance",
             "certificate", "degree", "student_id", "university", "faculty", "major", "academic_year",
         ]
@@ -287,3 +291,14 @@ class StudentSerializer(BaseSerializer):
     class Meta:
         model = Student
         exclude = BaseInstanceSerializer.Meta.exclude
+
+
+class StudentSearchSerializer(BaseSerializer):
+    user = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Student
+        fields = ["id", "student_id", "university", "faculty", "major", "academic_year", "user"]
+
+    def get_user(self, student):
+        return UserSerializer(student.user, fields=["id", "email", "full_name", "avatar", "gender", "phone"]).data
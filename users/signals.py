@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from rental.tasks import schedule_renditions
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+def schedule_avatar_renditions(sender, instance, update_fields=None, **kwargs):
+	# Bỏ qua các lần lưu không đụng tới avatar, ví dụ cập nhật last_login khi đăng nhập
+	if update_fields is None or "avatar" in update_fields:
+		schedule_renditions(instance, "avatar")
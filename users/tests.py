@@ -1 +1,107 @@
-# Create your tests here.
+import datetime
+import hashlib
+import itertools
+import os
+import tempfile
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from files.models import Blob
+from files.storage import ContentAddressedStorage
+from users.models import User
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 56
+
+_identifications = itertools.count(200000000000)
+
+
+def create_user(email):
+	return User.objects.create_user(email=email, password="Abc@12345", full_name=email.split("@")[0],
+									dob=datetime.date(2003, 1, 1), address="TP.HCM", phone="0900000000",
+									identification=str(next(_identifications)), role=User.Role.STUDENT,
+									gender=User.Gender.MALE)
+
+
+class AvatarUploadTests(TestCase):
+	# Storage thật được thay bằng FileSystemStorage trong thư mục tạm, đi qua endpoint PUT cục bộ thay cho SAS của Azure
+	def setUp(self):
+		directory = tempfile.TemporaryDirectory()
+		self.addCleanup(directory.cleanup)
+		self.storage = ContentAddressedStorage(backend="django.core.files.storage.FileSystemStorage",
+											   location=directory.name, base_url="/media/")
+		patcher = mock.patch.object(default_storage, "_wrapped", self.storage)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+		self.user = create_user("avatar@ou.edu.vn")
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def upload(self, content, content_type="image/png", declared_type="image/png", **extra):
+		response = self.client.post("/api/v1/users/current-user/avatar/upload-url/",
+									{"content_type": declared_type, "size": len(content), **extra}, format="json")
+		self.assertEqual(response.status_code, 201)
+
+		self.client.put(response.data["upload_url"], data=content, content_type=content_type)
+
+		return response.data
+
+	def confirm(self, token):
+		return self.client.post("/api/v1/users/current-user/avatar/upload-confirm/", {"token": token}, format="json")
+
+	def test_upload_is_hashed_by_server(self):
+		data = self.upload(PNG, sha256="0" * 64)
+		self.assertEqual(Blob.objects.get(name=data["name"]).ref_count, 0)
+
+		response = self.confirm(data["token"])
+		self.assertEqual(response.status_code, 200)
+		self.user.refresh_from_db()
+		self.assertEqual(self.user.avatar.name, data["name"])
+
+		blob = Blob.objects.get(name=data["name"])
+		self.assertEqual((blob.sha256, blob.size, blob.ref_count), (hashlib.sha256(PNG).hexdigest(), len(PNG), 1))
+
+	def test_identical_upload_reuses_blob(self):
+		first = self.upload(PNG)
+		self.confirm(first["token"])
+
+		self.client.force_authenticate(create_user("other@ou.edu.vn"))
+		second = self.upload(PNG)
+		self.assertEqual(self.confirm(second["token"]).status_code, 200)
+
+		self.assertEqual(User.objects.get(email="other@ou.edu.vn").avatar.name, first["name"])
+		self.assertEqual(Blob.objects.get(name=first["name"]).ref_count, 2)
+		self.assertFalse(Blob.objects.filter(name=second["name"]).exists())
+		self.assertFalse(self.storage.exists(second["name"]))
+
+	def test_content_not_matching_type_is_rejected(self):
+		data = self.upload(b"<script>alert(1)</script>")
+
+		response = self.confirm(data["token"])
+		self.assertEqual(response.status_code, 400)
+		self.assertFalse(self.storage.exists(data["name"]))
+		self.assertFalse(Blob.objects.filter(name=data["name"]).exists())
+		self.user.refresh_from_db()
+		self.assertFalse(self.user.avatar)
+
+	def test_size_not_matching_request_is_rejected(self):
+		data = self.upload(PNG)
+		with self.storage.backend.open(data["name"], "ab") as content:
+			content.write(b"\x00")
+
+		self.assertEqual(self.confirm(data["token"]).status_code, 400)
+		self.assertFalse(self.storage.exists(data["name"]))
+
+	def test_unconfirmed_upload_is_collected(self):
+		data = self.upload(PNG)
+		self.assertTrue(self.storage.exists(data["name"]))
+
+		with open(os.devnull, "w") as devnull:
+			call_command("collect_orphan_blobs", grace=0, stdout=devnull)
+
+		self.assertFalse(self.storage.exists(data["name"]))
+		self.assertFalse(Blob.objects.filter(name=data["name"]).exists())
@@ -4,8 +4,9 @@ from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
-from base import perms, paginators
+from base import perms, paginators, uploads
 from base.paginators import UserPagination
+from base.serializers import UploadConfirmSerializer, UploadRequestSerializer
 from rental import serializers as rental_serializers
 from rental.models import RentalContact
 from users import serializers as users_serializers
@@ -16,7 +17,7 @@ from users.serializers import UserSerializer
 class UserViewSet(viewsets.ViewSet):
     queryset = User.objects.filter(is_active=True)
     serializer_class = users_serializers.UserSerializer
-    parser_classes = [parsers.MultiPartParser]
+    parser_classes = [parsers.MultiPartParser, parsers.JSONParser]
 
     def get_queryset(self):
         queryset = self.queryset
@@ -27,10 +28,10 @@ class UserViewSet(viewsets.ViewSet):
         return queryset
 
     def get_permissions(self):
-        if self.action in ["current_user", "update_current_user"]:
+        if self.action in ["current_user", "update_current_user", "avatar_upload_url", "avatar_upload_confirm"]:
             return [permissions.IsAuthenticated()]
 
-        if self.action in ["get_all_rental_contacts", "get_rental_contact_detail"]:
+        if self.action in ["get_all_rental_contacts", "get_rental_contact_detail", "get_all_utility_charges"]:
             return [perms.IsStudent()]
 
         return [permissions.AllowAny()]
@@ -67,6 +68,26 @@ class UserViewSet(viewsets.ViewSet):
 
         return Response(data=response_data, status=status.HTTP_200_OK)
 
+    @action(methods=["post"], detail=False, url_path="current-user/avatar/upload-url",
+            parser_classes=[parsers.JSONParser])
+    def avatar_upload_url(self, request):
+        serializer = UploadRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        data = uploads.issue_upload(request, request.user, "avatar", **serializer.validated_data)
+
+        return Response(data=data, status=status.HTTP_201_CREATED)
+
+    @action(methods=["post"], detail=False, url_path="current-user/avatar/upload-confirm",
+            parser_classes=[parsers.JSONParser])
+    def avatar_upload_confirm(self, request):
+        serializer = UploadConfirmSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        user = uploads.attach_upload(request, request.user, "avatar", serializer.validated_data["token"])
+
+        return Response(data=self.serializer_class(user).data, status=status.HTTP_200_OK)
+
     @action(methods=["get"], detail=False, url_path="students/rental-contacts")
     def get_all_rental_contacts(self, request):
         student = request.user.student
@@ -95,6 +116,25 @@ class UserViewSet(viewsets.ViewSet):
         serializer = rental_serializers.RentalContactSerializer(rental_contact)
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
+    @action(methods=["get"], detail=False, url_path="students/utility-charges")
+    def get_all_utility_charges(self, request):
+        # Lọc theo index (student, status) của UtilityCharge
+        utility_charges = request.user.student.utility_charges.select_related("bill__room").filter(
+            is_active=True).order_by("-id")
+
+        charge_status = request.query_params.get("status")
+        if charge_status:
+            utility_charges = utility_charges.filter(status=charge_status.upper())
+
+        paginator = paginators.UtilityChargePaginators()
+        page = paginator.paginate_queryset(queryset=utility_charges, request=request)
+        if page is not None:
+            serializer = rental_serializers.UtilityChargeSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = rental_serializers.UtilityChargeSerializer(utility_charges, many=True)
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
+
     @action(methods=["get"], detail=False, url_path="specialists-managers")
     def get_all_specialists_and_managers(self, request):
         specialists = Specialist.objects.filter(user__is_active=True)
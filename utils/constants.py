@@ -4,3 +4,10 @@ NUMBER_OF_BED_NORMAL_ROOM = 8
 NUMBER_OF_BED_SERVICE_ROOM = 4
 PRICE_OF_ELECTRICITY = 3500
 PRICE_OF_WATER = 30000
+
+# Cấu hình full-text search của PostgreSQL (simple + unaccent) dùng cho tìm kiếm bài đăng tiếng Việt
+SEARCH_CONFIG = "vietnamese_unaccent"
+
+# Biểu giá bậc thang điện (kWh) và nước (m3): (mức tiêu thụ tối đa của bậc, đơn giá), bậc cuối không giới hạn
+ELECTRICITY_TARIFF_TIERS = ((100, PRICE_OF_ELECTRICITY), (200, 4000), (None, 4500))
+WATER_TARIFF_TIERS = ((10, PRICE_OF_WATER), (20, 35000), (None, 40000))
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
@@ -44,3 +46,24 @@ def get_all_subclasses(cls):
 		all_subclasses.extend(get_all_subclasses(subclass))
 
 	return all_subclasses
+
+
+def get_date_range(request):
+	# Khoảng ngày từ query params start_date/end_date dạng dd-mm-yyyy, bỏ trống thì không giới hạn
+	try:
+		start_date = request.query_params.get("start_date")
+		end_date = request.query_params.get("end_date")
+		start_date = datetime.strptime(start_date, "%d-%m-%Y").date() if start_date else None
+		end_date = datetime.strptime(end_date, "%d-%m-%Y").date() if end_date else None
+	except ValueError:
+		raise ValidationError({"message": "Ngày phải có dạng dd-mm-yyyy."})
+
+	return start_date, end_date
+
+
+def filter_created_date(queryset, request):
+	start_date, end_date = get_date_range(request)
+	queryset = queryset.filter(created_date__date__gte=start_date) if start_date else queryset
+	queryset = queryset.filter(created_date__date__lte=end_date) if end_date else queryset
+
+	return queryset